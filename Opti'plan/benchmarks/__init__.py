@@ -0,0 +1 @@
+"""Mesures de performance et de qualité du planificateur sur instances synthétiques."""
@@ -0,0 +1,124 @@
+"""Temps de bout en bout des scripts (lecture, planification, PDF), avec et sans les tables d'identifiants.
+
+    python benchmarks/bench_registry.py --scale 10k
+    python benchmarks/bench_registry.py --scale medium --scripts source.py
+
+Pour chaque script, l'instance de `--scale` (`benchmarks.instances`, au
+format des fichiers Excel réels) passe par le même chemin que le script :
+`optiplan.cli.run` avec ses réglages (moteur, mise en page du PDF),
+lecture des fichiers (instantané en cache), planification (`Scheduler`,
+amélioration locale comprise) et PDF inclus. Le chemin est exécuté avec les
+tables de `optiplan.registry` (« après »), puis avec des tables résolues
+par parcours linéaire des listes, comme `next(p for p in professors if
+p.id == ...)` (« avant ») : substituées à `by_id`, elles servent aussi bien
+aux heuristiques et à l'amélioration locale qu'au PDF (`Registry`). Le
+meilleur de `--repeat` exécutions alternées est retenu, et les deux
+variantes doivent produire le même planning. L'amélioration locale n'est
+bornée que par son nombre d'itérations : avec une limite de temps, la
+variante la plus lente en ferait moins et les plannings différeraient.
+"""
+import argparse
+import contextlib
+import io
+import math
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.instances import scales, write_instance  # noqa: E402
+from optiplan import greedy, local_search, registry  # noqa: E402
+from optiplan.cli import options, run  # noqa: E402
+
+# Réglages des scripts : moteur et mise en page du PDF
+scripts = {
+    'source.py': {'engine': 'student_major', 'pdf_layout': 'summary'},
+    'test2.py': {'engine': 'slot_major', 'pdf_layout': 'detailed'},
+}
+
+
+class ScanTable:
+    """Même interface que les tables de `by_id`, résolue par parcours linéaire."""
+
+    def __init__(self, items):
+        self._items = list(items)
+
+    def get(self, item_id, default=None):
+        return next((item for item in self._items if item.id == item_id), default)
+
+    def __getitem__(self, item_id):
+        return next(item for item in self._items if item.id == item_id)
+
+    def __contains__(self, item_id):
+        return any(item.id == item_id for item in self._items)
+
+
+registry_by_id = registry.by_id
+
+
+@contextlib.contextmanager
+def linear_scans():
+    # `by_id` est importé par nom dans chaque module : remplacé partout où il est lu
+    modules = (registry, greedy, local_search)
+    for module in modules:
+        module.by_id = ScanTable
+    try:
+        yield
+    finally:
+        for module in modules:
+            module.by_id = registry_by_id
+
+
+variants = {'registry': contextlib.nullcontext, 'linear_scan': linear_scans}
+
+
+def bench_script(script, professors_path, students_path, num_rooms, args):
+    settings = scripts[script]
+    pdf_path = os.path.join(args.workdir, f"{os.path.splitext(script)[0]}-{args.scale}.pdf")
+    arguments = options(
+        professors=professors_path, students=students_path, days=args.days, slots_per_day=args.slots_per_day,
+        rooms=[f"Salle {100 + i}" for i in range(num_rooms)], output=[pdf_path],
+        local_search_iterations=args.local_search_iterations, local_search_time_limit=math.inf, **settings)
+
+    # Meilleur de `repeat` exécutions alternées ; la première lecture des fichiers crée l'instantané
+    timings = dict.fromkeys(variants, math.inf)
+    defenses = {}
+    for _ in range(args.repeat):
+        for label, variant in variants.items():
+            with variant(), contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                scheduler = run(arguments)
+                timings[label] = min(timings[label], time.perf_counter() - start)
+            defenses[label] = scheduler.defenses
+    if defenses['registry'] != defenses['linear_scan']:
+        raise AssertionError(f"{script} : plannings différents avec et sans les tables d'identifiants")
+    return len(defenses['registry']), timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=list(scales), default='small')
+    parser.add_argument('--scripts', nargs='+', choices=list(scripts), default=list(scripts))
+    parser.add_argument('--days', type=int, default=5)
+    parser.add_argument('--slots-per-day', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--local-search-iterations', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3, help='exécutions par variante (meilleur temps retenu)')
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'optiplan-bench'),
+                        help="répertoire des instances générées (réutilisées d'une exécution à l'autre)")
+    args = parser.parse_args()
+
+    num_students, num_professors, num_rooms = scales[args.scale]
+    professors_path, students_path = write_instance(args.workdir, num_students, num_professors,
+                                                    args.slots_per_day, args.seed, num_days=args.days)
+    print(f"{args.scale} : {num_students} étudiants, {num_professors} enseignants, {num_rooms} salles")
+    for script in args.scripts:
+        scheduled, timings = bench_script(script, professors_path, students_path, num_rooms, args)
+        before, after = timings['linear_scan'], timings['registry']
+        print(f"{script:10s} {scheduled} soutenances ; bout en bout avec Registry {after:.2f} s, "
+              f"par parcours linéaires {before:.2f} s (gain {before - after:.2f} s, x{before / after:.1f})")
+
+if __name__ == '__main__':
+    main()
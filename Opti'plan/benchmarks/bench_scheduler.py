@@ -0,0 +1,189 @@
+"""Temps et qualité du planning de bout en bout, à plusieurs échelles.
+
+    python benchmarks/bench_scheduler.py --scales tiny small medium --output bench.json
+    python benchmarks/bench_scheduler.py --scales medium --baseline bench.json
+
+Pour chaque échelle, une instance reproductible (graine `--seed`) est écrite
+au format Excel puis on mesure séparément : le chargement (à froid, puis
+depuis l'instantané en cache), la passe gloutonne, l'amélioration locale et
+l'export PDF. La couverture (`scheduled_students_count`) et `room_utilization`
+sont relevées avec les temps, ainsi que la vérification du planning (violations,
+trous, changements de salle et score, `optiplan.validation`, chronométrée sous
+`validate`), et le tout est écrit en JSON ; `--profile` y joint le détail par
+phase et les rejets par cause, `--baseline` compare le résultat à un fichier
+précédent.
+
+Avec `--campuses N`, étudiants et salles sont répartis sur N campus : le
+planificateur travaille alors campus par campus (`optiplan.sharding`) et seul
+le temps total `schedule` est mesuré.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.instances import campus_name, scales, write_instance  # noqa: E402
+from optiplan import Registry, Room, Scheduler, profiling  # noqa: E402
+from optiplan.greedy import engines  # noqa: E402
+from optiplan.loading import load_professors, load_students  # noqa: E402
+from optiplan.multistart import load_stddev  # noqa: E402
+from optiplan.report import StreamingPDF, planning_tables, table_style  # noqa: E402
+
+
+def _timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def export_pdf(path, defenses, registry, slots_per_day):
+    StreamingPDF(path).build(planning_tables(defenses, registry, slots_per_day, table_style(header_padding=12)))
+
+
+def bench_scale(scale, args):
+    num_students, num_professors, num_rooms = scales[scale]
+    professors_path, students_path = write_instance(args.workdir, num_students, num_professors,
+                                                    args.slots_per_day, args.seed, args.campuses, args.days)
+    timings = {}
+    profiler = profiling.enable() if args.profile else None
+
+    # Chargement à froid, puis deuxième lecture servie par l'instantané
+    (professors, students), timings['load'] = _timed(
+        lambda: (load_professors(professors_path, args.days, args.slots_per_day, cache=False),
+                 load_students(students_path, cache=False)))
+    load_professors(professors_path, args.days, args.slots_per_day)
+    load_students(students_path)
+    _, timings['load_cached'] = _timed(
+        lambda: (load_professors(professors_path, args.days, args.slots_per_day), load_students(students_path)))
+
+    rooms = [Room(i + 1, f"Salle {100 + i}", campus_name(i % args.campuses) if args.campuses > 1 else '')
+             for i in range(num_rooms)]
+    scheduler = Scheduler(professors, students, rooms, args.days, args.slots_per_day, seed=args.seed)
+    if args.campuses > 1:
+        # Passe gloutonne et amélioration locale sont imbriquées campus par campus
+        _, timings['schedule'] = _timed(scheduler.schedule, args.engine,
+                                        local_search_time_limit=args.local_search_time_limit,
+                                        shard_workers=args.workers)
+        scheduled_after_greedy = None
+    else:
+        _, timings['greedy'] = _timed(scheduler.schedule, args.engine, local_search=False)
+        scheduled_after_greedy = len(scheduler.scheduled_students)
+        _, timings['local_search'] = _timed(scheduler.search.run, time_limit=args.local_search_time_limit)
+        timings['schedule'] = timings['greedy'] + timings['local_search']
+
+    defenses = scheduler.defenses
+    validation, timings['validate'] = _timed(scheduler.validate)
+    if not args.no_pdf:
+        registry = Registry(professors, students, rooms)
+        _, timings['pdf'] = _timed(export_pdf, os.path.join(args.workdir, f"planning-{scale}.pdf"), defenses,
+                                   registry, args.slots_per_day)
+
+    room_capacity = args.days * args.slots_per_day * num_rooms
+    result = {
+        'scale': scale,
+        'students': num_students,
+        'professors': num_professors,
+        'rooms': num_rooms,
+        'campuses': args.campuses,
+        'timings': {phase: round(seconds, 4) for phase, seconds in timings.items()},
+        'scheduled_students_count': len(defenses),
+        'scheduled_after_greedy': scheduled_after_greedy,
+        'coverage': round(len(defenses) / num_students * 100, 2),
+        'room_utilization': round(len(defenses) / room_capacity * 100, 2),
+        'load_stddev': round(load_stddev(defenses, professors), 4),
+        'violations': validation.counts,
+        'gaps': validation.metrics['gaps'],
+        'room_changes': validation.metrics['room_changes'],
+        'gaps_per_professor': round(validation.metrics['gaps_per_professor'], 4),
+        'room_changes_per_professor': round(validation.metrics['room_changes_per_professor'], 4),
+        'score': round(validation.score, 2),
+    }
+    if profiler is not None:
+        profiling.disable()
+        result['profile'] = profiler.report()
+    return result
+
+
+def compare(results, baseline):
+    previous = {result['scale']: result for result in baseline['results']}
+    for result in results:
+        before = previous.get(result['scale'])
+        if before is None:
+            continue
+        print(f"{result['scale']} (par rapport à {baseline.get('revision') or 'la référence'}) :")
+        for phase, seconds in result['timings'].items():
+            if phase in before['timings'] and before['timings'][phase] > 0:
+                print(f"  {phase:14s} {before['timings'][phase]:9.3f} s -> {seconds:9.3f} s "
+                      f"(x{seconds / before['timings'][phase]:.2f})")
+        for metric in ('scheduled_students_count', 'room_utilization', 'score'):
+            if metric in before:
+                print(f"  {metric:26s} {before[metric]} -> {result[metric]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', nargs='+', choices=list(scales), default=['tiny', 'small', 'medium'])
+    parser.add_argument('--engine', choices=list(engines), default='student_major')
+    parser.add_argument('--days', type=int, default=5)
+    parser.add_argument('--slots-per-day', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--campuses', type=int, default=1,
+                        help='nombre de campus (salles séparées, enseignants partagés)')
+    parser.add_argument('--workers', type=int, help='processus pour la planification par campus')
+    parser.add_argument('--local-search-time-limit', type=float, default=5)
+    parser.add_argument('--profile', action='store_true',
+                        help='joindre le profil par phase (optiplan.profiling) à chaque échelle')
+    parser.add_argument('--no-pdf', action='store_true', help="ne pas mesurer l'export PDF")
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'optiplan-bench'),
+                        help="répertoire des instances générées (réutilisées d'une exécution à l'autre)")
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', help='résultats précédents à comparer')
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        result = bench_scale(scale, args)
+        results.append(result)
+        timings = '  '.join(f"{phase} {seconds:.2f}s" for phase, seconds in result['timings'].items())
+        print(f"{scale:8s} {result['scheduled_students_count']}/{result['students']} programmés, "
+              f"salles {result['room_utilization']:.1f}%, {sum(result['violations'].values())} violation(s)  "
+              f"{timings}")
+
+    report = {
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'engine': args.engine,
+        'num_days': args.days,
+        'slots_per_day': args.slots_per_day,
+        'seed': args.seed,
+        'local_search_time_limit': args.local_search_time_limit,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as target:
+        json.dump(report, target, indent=2, ensure_ascii=False)
+    print(f"Résultats écrits dans {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as source:
+            compare(results, json.load(source))
+
+
+if __name__ == '__main__':
+    main()
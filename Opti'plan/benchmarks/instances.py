@@ -0,0 +1,127 @@
+"""Instances synthétiques reproductibles, au format des fichiers Excel réels.
+
+Les fichiers produits ont les mêmes colonnes que `enseignants.xlsx` et
+`students_data.xlsx`, si bien que le chargement passe par le même code que
+les scripts. Les distributions imitent les données des départements :
+
+- disponibilités par journées entières (parfois par demi-journées) sur les
+  `num_days` jours de la session, avec une densité propre à chaque
+  enseignant ;
+- grades majoritairement 'Ingénieur' puis 'Docteur', comme dans les fichiers
+  réels, mais assez de 'MA' / 'MC' pour présider les soutenances de Master
+  et celles encadrées par un MC (environ 60 % des enseignants peuvent
+  présider) ;
+- 1 à 4 spécialités par enseignant, les filières les plus demandées étant
+  aussi les plus enseignées ; l'encadreur d'un étudiant est, sauf exception,
+  spécialiste de sa filière ;
+- avec `num_campuses > 1`, chaque enseignant a un campus, les étudiants ont
+  une colonne `Campus` et leur encadreur est, sauf exception (environ 5 %),
+  un enseignant de leur campus.
+
+Les échelles (`scales`) gardent le rapport des fichiers réels, de l'ordre
+de 4 étudiants par enseignant, et assez de salles pour la session par
+défaut (5 jours de 8 créneaux) : une planification de référence y
+programme la plupart des étudiants, et les débits mesurés portent sur des
+plannings réussis.
+"""
+import os
+import random
+from typing import Dict, Tuple
+
+import pandas as pd
+
+fields = ['GL', 'IA', 'SIRI', 'SEIoT', 'IM']
+field_weights = [0.35, 0.25, 0.2, 0.12, 0.08]
+grades = ['Ingénieur', 'Docteur', 'MA', 'Professeur', 'MC']
+grade_weights = [0.35, 0.3, 0.2, 0.08, 0.07]
+cycle_weights = [0.8, 0.2]  # Licence, Master
+
+# Échelles prédéfinies : (étudiants, enseignants, salles)
+scales: Dict[str, Tuple[int, int, int]] = {
+    'tiny': (100, 25, 4),
+    'small': (1000, 250, 32),
+    'medium': (5000, 1250, 160),
+    '10k': (10000, 2500, 320),  # Taille des plus grandes sessions réelles (banc de Registry)
+    'large': (20000, 5000, 640),
+    'huge': (50000, 12500, 1600),
+}
+
+
+def _availability(rng: random.Random, num_days: int, slots_per_day: int) -> str:
+    density = rng.uniform(0.5, 0.95)
+    half = slots_per_day // 2
+    days = []
+    for _ in range(num_days):
+        draw = rng.random()
+        if draw < density:
+            day = [True] * slots_per_day
+        elif draw < density + 0.1:
+            morning = rng.random() < 0.5
+            day = [morning] * half + [not morning] * (slots_per_day - half)
+        else:
+            day = [False] * slots_per_day
+        days.append(day)
+    return str(days)
+
+
+def campus_name(i: int) -> str:
+    return f"Campus {chr(65 + i)}"
+
+
+def generate(num_students: int, num_professors: int, slots_per_day: int = 8, seed: int = 42,
+             num_campuses: int = 1, num_days: int = 5) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Tables des enseignants et des étudiants (colonnes des fichiers Excel)."""
+    rng = random.Random(seed)
+    # Tirages propres aux campus : l'instance à un campus reste celle des versions précédentes
+    campus_rng = random.Random(seed + 1)
+    professors = []
+    specialists = {field: [] for field in fields}
+    for i in range(num_professors):
+        specialties = set()
+        while len(specialties) < rng.choices([1, 2, 3, 4], [0.3, 0.35, 0.25, 0.1])[0]:
+            specialties.add(rng.choices(fields, field_weights)[0])
+        for field in specialties:
+            specialists[field].append(i)
+        professors.append({
+            'Numéro': i,
+            'Nom': f"NOM{i}",
+            'Prénoms': f"Prénom{i}",
+            'Grade': rng.choices(grades, grade_weights)[0],
+            'Disponibilité': _availability(rng, num_days, slots_per_day),
+            'Speciality': ', '.join(sorted(specialties, key=fields.index)),
+        })
+
+    students = []
+    for i in range(num_students):
+        field = rng.choices(fields, field_weights)[0]
+        candidates = specialists[field] if specialists[field] and rng.random() < 0.9 else range(num_professors)
+        student = {'Numéro': i, 'Nom': f"Étudiant {i}"}
+        if num_campuses > 1:
+            campus = campus_rng.randrange(num_campuses)
+            student['Campus'] = campus_name(campus)
+            local = [prof for prof in candidates if prof % num_campuses == campus]
+            if local and campus_rng.random() >= 0.05:
+                candidates = local
+        student.update({
+            'Cycle': rng.choices(['Licence', 'Master'], cycle_weights)[0],
+            'Filière': field,
+            'MM': rng.choice(candidates),
+        })
+        students.append(student)
+    return pd.DataFrame(professors), pd.DataFrame(students)
+
+
+def write_instance(directory: str, num_students: int, num_professors: int, slots_per_day: int = 8,
+                   seed: int = 42, num_campuses: int = 1, num_days: int = 5) -> Tuple[str, str]:
+    """Écrit (ou réutilise) les deux fichiers Excel de l'instance et renvoie leurs chemins."""
+    os.makedirs(directory, exist_ok=True)
+    stem = f"{num_students}x{num_professors}-{num_days}x{slots_per_day}-{seed}"
+    if num_campuses > 1:
+        stem += f"-{num_campuses}c"
+    professors_path = os.path.join(directory, f"professors-{stem}.xlsx")
+    students_path = os.path.join(directory, f"students-{stem}.xlsx")
+    if not (os.path.exists(professors_path) and os.path.exists(students_path)):
+        professors, students = generate(num_students, num_professors, slots_per_day, seed, num_campuses, num_days)
+        professors.to_excel(professors_path, index=False)
+        students.to_excel(students_path, index=False)
+    return professors_path, students_path
@@ -0,0 +1,4 @@
+from .models import Professor, Student, Room, Session, Defense, grade_mapping, rank_values, max_defenses_per_day
+from .availability import AvailabilityIndex, CandidateQueues, RoomSchedule
+from .registry import Registry
+from .scheduler import Scheduler, ScheduleDiff
@@ -0,0 +1,480 @@
+"""Index des disponibilités et des occupations sur la grille des créneaux.
+
+Chaque enseignant et chaque salle occupe une ligne d'une matrice booléenne
+NumPy de largeur `total_slots`. Les tests d'appartenance sont en O(1) et la
+question « qui est libre au créneau s » se calcule en une seule opération
+vectorisée au lieu d'un parcours des listes `availability`.
+
+`RoomSchedule` tient l'occupation des salles dans une matrice d'entiers
+(salle x créneau) d'indices de soutenances, au lieu d'un dictionnaire de
+dictionnaires contenant `None` pour chaque salle libre.
+
+`CandidateQueues` ajoute, pour des groupes ordonnés d'enseignants (les
+présidents possibles par grade minimal requis), une file par créneau des
+candidats disponibles : le premier candidat libre s'obtient en retirant de la
+tête les enseignants devenus indisponibles, sans parcourir tout le groupe.
+`BalancedQueues` fait de même en classant d'abord les candidats par charge
+(nombre de soutenances, `AvailabilityIndex.load`).
+
+Les règles d'occupation (`constraints.SlotRule`) sont compilées : le
+plafond journalier par le compteur `day_count`, les autres (créneaux
+consécutifs…) dans la matrice `blocked`, recalculée pour le jour et les
+enseignants de chaque soutenance placée ou retirée. Un enseignant est libre
+s'il est disponible, pas déjà pris, sous le plafond et pas bloqué, quel que
+soit le nombre de règles.
+"""
+import copy
+import heapq
+import weakref
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .constraints import RuleSet
+from .models import Defense, Professor, Room, max_defenses_per_day
+
+_free_room = -1
+_no_rows = np.zeros(0, dtype=np.intp)  # Campus sans salle
+
+
+class AvailabilityIndex:
+    def __init__(self, professors: List[Professor], rooms: List[Room], num_days: int, slots_per_day: int,
+                 max_per_day: int = max_defenses_per_day, rules: Optional[RuleSet] = None):
+        self.num_days = num_days
+        self.slots_per_day = slots_per_day
+        self.total_slots = num_days * slots_per_day
+        # Règles dures (registre `constraints.rules` par défaut) ; sans plafond journalier, aucun jour ne
+        # peut dépasser ses `slots_per_day` créneaux
+        self.rules = RuleSet(professors) if rules is None else rules
+        self.max_per_day = max_per_day if self.rules.daily_cap else slots_per_day
+
+        self.prof_ids = np.array([prof.id for prof in professors])
+        self.prof_row = {prof.id: i for i, prof in enumerate(professors)}
+        self.room_ids = np.array([room.id for room in rooms])
+        self.room_row = {room.id: i for i, room in enumerate(rooms)}
+        # Lignes des salles par campus ; None pour une session à un seul campus
+        campus_rooms: Dict[str, List[int]] = {}
+        for i, room in enumerate(rooms):
+            campus_rooms.setdefault(room.campus, []).append(i)
+        self.campus_room_rows = ({campus: np.array(rows, dtype=np.intp) for campus, rows in campus_rooms.items()}
+                                 if len(campus_rooms) > 1 else None)
+
+        # Disponibilités déclarées ; les créneaux hors de la grille sont ignorés
+        self.available = np.zeros((len(professors), self.total_slots), dtype=bool)
+        for i, prof in enumerate(professors):
+            slots = [slot for slot in prof.availability if 0 <= slot < self.total_slots]
+            self.available[i, slots] = True
+
+        # Occupations, mises à jour en place à chaque soutenance planifiée
+        self.busy = np.zeros((len(professors), self.total_slots), dtype=bool)
+        self.day_count = np.zeros((len(professors), num_days), dtype=np.int32)
+        self.load = np.zeros(len(professors), dtype=np.int32)  # Soutenances sur la session, tous rôles
+        self.room_busy = np.zeros((len(rooms), self.total_slots), dtype=bool)
+        # Salles ouvertes (une salle fermée n'est jamais proposée)
+        self.room_open = np.ones((len(rooms), self.total_slots), dtype=bool)
+        # Créneaux interdits par les autres règles d'occupation (une soutenance de plus les violerait)
+        self.blocked = np.zeros((len(professors), self.total_slots), dtype=bool)
+        # Motif d'occupation de chaque enseignant pour chaque jour (bit s : s-ième créneau du jour pris), qui
+        # indexe la table des créneaux bloqués compilée par `RuleSet.pattern_table`
+        self._patterns = self.rules.pattern_table(slots_per_day, self.max_per_day)
+        self.day_pattern = np.zeros((len(professors), num_days), dtype=np.int32)
+        self._unblocked: Dict[Tuple[int, int], List[int]] = {}  # (motif avant, après) -> créneaux débloqués
+        if self.rules.pattern_rules:
+            all_rows = np.arange(len(professors))
+            for day in range(num_days):
+                if self._patterns is None:
+                    self._refresh(all_rows, day)
+                else:
+                    self.blocked[:, day * slots_per_day:(day + 1) * slots_per_day] = self._patterns[0]
+        # Files de candidats à prévenir quand un enseignant est libéré
+        self.queues = weakref.WeakSet()
+
+    def copy(self) -> 'AvailabilityIndex':
+        """Copie indépendante des matrices ; les tables d'identifiants, jamais modifiées, sont partagées."""
+        clone = copy.copy(self)
+        for name in ('available', 'busy', 'day_count', 'load', 'blocked', 'day_pattern', 'room_busy', 'room_open'):
+            setattr(clone, name, getattr(self, name).copy())
+        clone.queues = weakref.WeakSet()  # Les files de la copie s'y inscrivent à leur création
+        return clone
+
+    def rows(self, prof_ids: Iterable[int]) -> np.ndarray:
+        """Indices de lignes des enseignants, dans l'ordre donné."""
+        return np.array([self.prof_row[prof_id] for prof_id in prof_ids], dtype=np.intp)
+
+    def room_rows(self, room_ids: Iterable[int]) -> np.ndarray:
+        return np.array([self.room_row[room_id] for room_id in room_ids], dtype=np.intp)
+
+    def campus_rows(self, campus: str) -> Optional[np.ndarray]:
+        """Lignes des salles du campus (aucune s'il n'en a pas) ; None pour une session à un seul campus."""
+        if self.campus_room_rows is None:
+            return None
+        return self.campus_room_rows.get(campus, _no_rows)
+
+    def limit_daily(self, prof_id: int, caps: Sequence[int]) -> None:
+        """Plafond propre à l'enseignant pour chaque jour (part d'un enseignant partagé entre campus).
+
+        La capacité au-delà de `caps` est comptée comme déjà prise : à appeler avant toute soutenance.
+        """
+        caps = np.minimum(np.asarray(caps, dtype=np.int32), self.max_per_day)
+        row = self.prof_row[prof_id]
+        self.day_count[row] += self.max_per_day - caps
+
+    def is_available(self, prof_id: int, slot: int) -> bool:
+        return bool(self.available[self.prof_row[prof_id], slot])
+
+    def is_free(self, prof_id: int, slot: int) -> bool:
+        """Disponible, pas déjà pris à ce créneau, sous le plafond journalier et sans autre règle violée."""
+        i = self.prof_row[prof_id]
+        day = slot // self.slots_per_day
+        return bool(self.available[i, slot] and not self.busy[i, slot]
+                    and self.day_count[i, day] < self.max_per_day and not self.blocked[i, slot])
+
+    def is_row_free(self, i: int, slot: int) -> bool:
+        return bool(self.available[i, slot] and not self.busy[i, slot]
+                    and self.day_count[i, slot // self.slots_per_day] < self.max_per_day
+                    and not self.blocked[i, slot])
+
+    def busy_cause(self, prof_id: int, slot: int) -> str:
+        """Pourquoi `is_free` est faux : 'unavailable' (indisponible ou pris), 'daily_cap' ou la règle violée."""
+        i = self.prof_row[prof_id]
+        if not self.available[i, slot] or self.busy[i, slot]:
+            return 'unavailable'
+        day, position = divmod(slot, self.slots_per_day)
+        if self.day_count[i, day] >= self.max_per_day:
+            return 'daily_cap'
+        days = slice(day * self.slots_per_day, (day + 1) * self.slots_per_day)
+        busy = self.busy[i:i + 1, days]
+        for rule in self.rules.pattern_rules:
+            if rule.blocked(busy, busy.sum(axis=1), self.max_per_day)[0, position]:
+                return rule.name
+        return 'unavailable'
+
+    def free_mask(self, slot: int) -> np.ndarray:
+        """Masque booléen (un élément par enseignant) des enseignants libres au créneau."""
+        day = slot // self.slots_per_day
+        return (self.available[:, slot] & ~self.busy[:, slot] & (self.day_count[:, day] < self.max_per_day)
+                & ~self.blocked[:, slot])
+
+    def free_among(self, rows: np.ndarray, slot: int, exclude: Iterable[int] = ()) -> np.ndarray:
+        """Identifiants des enseignants libres parmi `rows`, en conservant leur ordre."""
+        mask = self.free_mask(slot)
+        for prof_id in exclude:
+            mask[self.prof_row[prof_id]] = False
+        return self.prof_ids[rows[mask[rows]]]
+
+    def first_free(self, rows: np.ndarray, slot: int, exclude: Iterable[int] = ()) -> Optional[int]:
+        free = self.free_among(rows, slot, exclude)
+        return int(free[0]) if free.size else None
+
+    def is_room_free(self, room_id: int, slot: int) -> bool:
+        i = self.room_row[room_id]
+        return bool(self.room_open[i, slot] and not self.room_busy[i, slot])
+
+    def free_rooms(self, slot: int) -> np.ndarray:
+        return self.room_ids[self.room_open[:, slot] & ~self.room_busy[:, slot]]
+
+    def first_free_room(self, slot: int, rows: Optional[np.ndarray] = None) -> Optional[int]:
+        """Première salle libre, parmi les lignes `rows` (salles d'un campus) si elles sont données."""
+        if rows is None:
+            free = np.flatnonzero(self.room_open[:, slot] & ~self.room_busy[:, slot])
+        else:
+            free = rows[self.room_open[rows, slot] & ~self.room_busy[rows, slot]]
+        return int(self.room_ids[free[0]]) if free.size else None
+
+    def commit(self, defense: Defense) -> None:
+        self._update(defense, True, 1)
+
+    def release(self, defense: Defense) -> None:
+        self._update(defense, False, -1)
+
+    def _refresh(self, rows: np.ndarray, day: int) -> np.ndarray:
+        # Recalcul direct des créneaux bloqués du jour (journées de plus de 16 créneaux, sans table) ; renvoie
+        # ceux qui viennent d'être débloqués
+        days = slice(day * self.slots_per_day, (day + 1) * self.slots_per_day)
+        previous = self.blocked[rows, days]
+        blocked = self.rules.blocked(self.busy[rows, days], self.max_per_day)
+        self.blocked[rows, days] = blocked
+        return previous & ~blocked
+
+    def _update(self, defense: Defense, busy: bool, delta: int) -> None:
+        slot = defense.time_slot
+        day = slot // self.slots_per_day
+        rows = [self.prof_row[prof_id] for prof_id in (defense.supervisor_id, defense.president_id,
+                                                       defense.examiner_id)]
+        for i in rows:
+            self.busy[i, slot] = busy
+            self.day_count[i, day] += delta
+            self.load[i] += delta
+        self.room_busy[self.room_row[defense.room_id], slot] = busy
+        reopened = [()] * len(rows)
+        if self.rules.pattern_rules:
+            first = day * self.slots_per_day
+            days = slice(first, first + self.slots_per_day)
+            if self._patterns is None:
+                unblocked = self._refresh(np.array(rows), day)
+                if delta < 0 and unblocked.any():
+                    reopened = [(first + np.flatnonzero(row)).tolist() for row in unblocked]
+            else:
+                # Un bit du motif change par ligne : la mise à jour est une lecture de table
+                bit = 1 << (slot - first)
+                for position, i in enumerate(rows):
+                    previous = int(self.day_pattern[i, day])
+                    pattern = previous ^ bit
+                    self.day_pattern[i, day] = pattern
+                    self.blocked[i, days] = self._patterns[pattern]
+                    if delta < 0:
+                        offsets = self._unblocked.get((previous, pattern))
+                        if offsets is None:
+                            offsets = self._unblocked[previous, pattern] = np.flatnonzero(
+                                self._patterns[previous] & ~self._patterns[pattern]).tolist()
+                        if offsets:
+                            reopened[position] = [first + offset for offset in offsets]
+        if delta < 0:
+            restored = [(i, self._restored_slots(i, slot, extra)) for i, extra in zip(rows, reopened)]
+            for queues in self.queues:
+                queues.restore(restored)
+
+    def _restored_slots(self, i: int, slot: int, unblocked: Sequence[int]) -> Sequence[int]:
+        """Créneaux où l'enseignant de la ligne `i`, libéré au créneau `slot`, peut redevenir candidat.
+
+        `unblocked` : créneaux du jour débloqués par la libération (règles d'occupation). Un créneau rendu
+        alors qu'il est encore bloqué est écarté paresseusement par les files.
+        """
+        day = slot // self.slots_per_day
+        count = self.day_count[i, day]
+        if count >= self.max_per_day:
+            return ()
+        # Juste sous le plafond : les autres créneaux du jour, retirés au plafond, redeviennent possibles
+        if count == self.max_per_day - 1:
+            return range(day * self.slots_per_day, (day + 1) * self.slots_per_day)
+        return (slot, *unblocked)
+
+
+class RoomSchedule:
+    """Soutenance de chaque salle à chaque créneau.
+
+    `occupant[salle, créneau]` est l'indice de la soutenance dans `defenses`
+    (-1 : salle libre) ; les indices libérés sont réutilisés. `get` et
+    `as_dict` rendent les `Defense` pour le rapport.
+    """
+
+    def __init__(self, rooms: List[Room], total_slots: int):
+        self.room_ids = [room.id for room in rooms]
+        self.room_row = {room.id: i for i, room in enumerate(rooms)}
+        self.occupant = np.full((len(rooms), total_slots), _free_room, dtype=np.int32)
+        self.defenses: List[Optional[Defense]] = []
+        self._released: List[int] = []
+
+    def copy(self) -> 'RoomSchedule':
+        clone = copy.copy(self)
+        clone.occupant = self.occupant.copy()
+        clone.defenses = list(self.defenses)  # Les `Defense` ne sont jamais modifiées : partagées
+        clone._released = list(self._released)
+        return clone
+
+    def get(self, room_id: int, slot: int) -> Optional[Defense]:
+        position = self.occupant[self.room_row[room_id], slot]
+        return self.defenses[position] if position != _free_room else None
+
+    def is_free(self, room_id: int, slot: int) -> bool:
+        return self.occupant[self.room_row[room_id], slot] == _free_room
+
+    def place(self, defense: Defense) -> None:
+        if self._released:
+            position = self._released.pop()
+            self.defenses[position] = defense
+        else:
+            position = len(self.defenses)
+            self.defenses.append(defense)
+        self.occupant[self.room_row[defense.room_id], defense.time_slot] = position
+
+    def clear(self, room_id: int, slot: int) -> Optional[Defense]:
+        """Libère la salle au créneau et renvoie la soutenance qui l'occupait."""
+        row = self.room_row[room_id]
+        position = int(self.occupant[row, slot])
+        if position == _free_room:
+            return None
+        self.occupant[row, slot] = _free_room
+        defense, self.defenses[position] = self.defenses[position], None
+        self._released.append(position)
+        return defense
+
+    def occupants(self, slot: int, rows: Optional[np.ndarray] = None) -> List[Defense]:
+        """Soutenances du créneau, dans toutes les salles ou dans les lignes `rows`."""
+        positions = self.occupant[:, slot] if rows is None else self.occupant[rows, slot]
+        return [self.defenses[position] for position in positions[positions != _free_room].tolist()]
+
+    def free_slots(self, room_id: int) -> List[int]:
+        return np.flatnonzero(self.occupant[self.room_row[room_id]] == _free_room).tolist()
+
+    def used_count(self) -> int:
+        return int(np.count_nonzero(self.occupant != _free_room))
+
+    def as_dict(self) -> Dict[int, Dict[int, Optional[Defense]]]:
+        """Vue salle -> créneau -> soutenance (ou None), la forme historique de `room_schedule`."""
+        return {room_id: {slot: self.defenses[position] if position != _free_room else None
+                          for slot, position in enumerate(self.occupant[row].tolist())}
+                for row, room_id in enumerate(self.room_ids)}
+
+
+class CandidateQueues:
+    """Candidats libres par (groupe, créneau), dans l'ordre de préférence de chaque groupe.
+
+    Chaque file est un tas des positions dans le groupe des enseignants
+    disponibles au créneau. Les enseignants occupés ou bloqués par une règle
+    d'occupation (plafond journalier…) sont retirés paresseusement quand ils
+    arrivent en tête ; une libération (`AvailabilityIndex.release`) les y remet.
+    """
+
+    def __init__(self, index: AvailabilityIndex, groups: Dict[Hashable, np.ndarray]):
+        self.index = index
+        self.groups: Dict[Hashable, List[int]] = {}
+        self.heaps: Dict[Hashable, List[List[int]]] = {}
+        self.queued: Dict[Hashable, np.ndarray] = {}  # position x créneau : présent dans la file
+        self.positions: Dict[Hashable, Dict[int, int]] = {}  # ligne -> position dans le groupe
+        for key, rows in groups.items():
+            self.add(key, rows)
+        index.queues.add(self)
+
+    def add(self, key: Hashable, rows: np.ndarray) -> None:
+        """Ajoute un groupe (étudiant d'un profil encore inconnu)."""
+        index = self.index
+        rows = self.groups[key] = np.asarray(rows, dtype=np.intp).tolist()
+        queued = index.available[np.asarray(rows, dtype=np.intp)].reshape(len(rows), index.total_slots)
+        # Positions croissantes : chaque liste est déjà un tas
+        self.heaps[key] = [np.flatnonzero(queued[:, slot]).tolist() for slot in range(index.total_slots)]
+        self.queued[key] = queued
+        self.positions[key] = {int(row): position for position, row in enumerate(rows)}
+
+    def free(self, key: Hashable, slot: int, exclude: Iterable[int] = (), limit: int = 1) -> List[int]:
+        """Identifiants des `limit` premiers candidats libres du groupe au créneau."""
+        index = self.index
+        heap = self.heaps[key][slot]
+        rows = self.groups[key]
+        queued = self.queued[key]
+        excluded = {index.prof_row[prof_id] for prof_id in exclude}
+        found, kept = [], []
+        while heap and len(found) < limit:
+            position = heap[0]
+            row = rows[position]
+            if not index.is_row_free(row, slot):
+                heapq.heappop(heap)
+                queued[position, slot] = False
+                continue
+            kept.append(heapq.heappop(heap))
+            if row not in excluded:
+                found.append(int(index.prof_ids[row]))
+        for position in kept:
+            heapq.heappush(heap, position)
+        return found
+
+    def first_free(self, key: Hashable, slot: int, exclude: Iterable[int] = ()) -> Optional[int]:
+        found = self.free(key, slot, exclude)
+        return found[0] if found else None
+
+    def restore(self, restored: Iterable[Tuple[int, Sequence[int]]]) -> None:
+        # Enseignants libérés (ligne, créneaux) : ils redeviennent candidats là où ils sont libres
+        index = self.index
+        for row, slots in restored:
+            for key, positions in self.positions.items():
+                position = positions.get(row)
+                if position is None:
+                    continue
+                queued = self.queued[key]
+                for slot in slots:
+                    if not queued[position, slot] and index.available[row, slot] and not index.busy[row, slot]:
+                        heapq.heappush(self.heaps[key][slot], position)
+                        queued[position, slot] = True
+
+
+class BalancedQueues:
+    """Candidats libres par (groupe, créneau), les moins chargés d'abord.
+
+    Même interface que `CandidateQueues`, mais chaque file est un tas de
+    couples (charge, position dans le groupe) : la charge est le nombre de
+    soutenances de l'enseignant sur la session (`AvailabilityIndex.load`) et,
+    à charge égale, l'ordre du groupe (grade décroissant) décide. Une
+    soutenance n'augmente la charge que de trois enseignants : au lieu de
+    corriger leurs entrées dans toutes les files, une entrée dont la charge est
+    périmée est réinsérée avec la charge courante quand elle arrive en tête,
+    d'où un coût amorti en O(log n) par choix. Une libération (recherche
+    locale) fait baisser la charge : l'enseignant est réinséré avec sa nouvelle
+    charge dans chacune de ses files.
+    """
+
+    def __init__(self, index: AvailabilityIndex, groups: Dict[Hashable, np.ndarray]):
+        self.index = index
+        self.groups = {key: np.asarray(rows, dtype=np.intp).tolist() for key, rows in groups.items()}
+        self.heaps: Dict[Hashable, List[List[Tuple[int, int]]]] = {}
+        # position x créneau : charge de l'entrée en vigueur dans la file, -1 si l'enseignant n'y est pas
+        self.queued: Dict[Hashable, np.ndarray] = {}
+        self.positions: Dict[Hashable, Dict[int, int]] = {}
+        for key, rows in self.groups.items():
+            rows_array = np.asarray(rows, dtype=np.intp)
+            available = index.available[rows_array].reshape(len(rows), index.total_slots)
+            load = index.load[rows_array]
+            heaps = []
+            for slot in range(index.total_slots):
+                positions = np.flatnonzero(available[:, slot])
+                heap = list(zip(load[positions].tolist(), positions.tolist()))
+                heapq.heapify(heap)
+                heaps.append(heap)
+            self.heaps[key] = heaps
+            self.queued[key] = np.where(available, load[:, None], -1).astype(np.int32)
+            self.positions[key] = {int(row): position for position, row in enumerate(rows)}
+        index.queues.add(self)
+
+    def free(self, key: Hashable, slot: int, exclude: Iterable[int] = (), limit: int = 1) -> List[int]:
+        """Identifiants des `limit` candidats libres les moins chargés du groupe au créneau."""
+        index = self.index
+        load = index.load
+        heap = self.heaps[key][slot]
+        rows = self.groups[key]
+        queued = self.queued[key]
+        excluded = {index.prof_row[prof_id] for prof_id in exclude}
+        found, kept = [], []
+        while heap and len(found) < limit:
+            entry_load, position = heap[0]
+            if queued[position, slot] != entry_load:
+                heapq.heappop(heap)  # Entrée remplacée par une plus récente
+                continue
+            row = rows[position]
+            if not index.is_row_free(row, slot):
+                heapq.heappop(heap)
+                queued[position, slot] = -1
+                continue
+            current = int(load[row])
+            if current != entry_load:
+                heapq.heapreplace(heap, (current, position))
+                queued[position, slot] = current
+                continue
+            kept.append(heapq.heappop(heap))
+            if row not in excluded:
+                found.append(int(index.prof_ids[row]))
+        for entry in kept:
+            heapq.heappush(heap, entry)
+        return found
+
+    def first_free(self, key: Hashable, slot: int, exclude: Iterable[int] = ()) -> Optional[int]:
+        found = self.free(key, slot, exclude)
+        return found[0] if found else None
+
+    def restore(self, restored: Iterable[Tuple[int, Sequence[int]]]) -> None:
+        # Enseignants libérés (ligne, créneaux) : charge en baisse dans toutes leurs files, et de retour sur
+        # ces créneaux là où ils sont libres
+        index = self.index
+        for row, slots in restored:
+            current = int(index.load[row])
+            for key, positions in self.positions.items():
+                position = positions.get(row)
+                if position is None:
+                    continue
+                queued = self.queued[key]
+                heaps = self.heaps[key]
+                for other in np.flatnonzero(queued[position] > current).tolist():
+                    heapq.heappush(heaps[other], (current, position))
+                    queued[position, other] = current
+                for slot in slots:
+                    if queued[position, slot] < 0 and index.available[row, slot] and not index.busy[row, slot]:
+                        heapq.heappush(heaps[slot], (current, position))
+                        queued[position, slot] = current
@@ -0,0 +1,271 @@
+"""Ligne de commande : lecture des fichiers, planification et écriture des résultats.
+
+    python -m optiplan --professors enseignants.xlsx --students students_data.xlsx -o planning.pdf -o planning.json
+
+Le calendrier et les salles viennent de `--session` (fichier JSON décrit dans
+`optiplan.loading`) ou de `--days`, `--slots-per-day` et `--rooms`. Le format
+de chaque sortie `-o` est déduit de son extension (`writers`) : PDF, JSON
+(avec le diagnostic des étudiants non programmés, `optiplan.diagnosis`, et la
+vérification du planning, `optiplan.validation`), ou
+exports CSV, JSON Lines, Excel et agendas iCalendar par enseignant
+(`optiplan.export`) ; `--personal-pdfs DOSSIER` ajoute un PDF par membre
+de jury et par salle (`optiplan.personal`). Les sorties sont écrites en
+parallèle et chacune est annoncée dès qu'elle est prête ; les PDF
+personnels, rendus par leur propre pool de processus, viennent ensuite,
+hors du pool de threads :
+
+    python -m optiplan ... -o planning.csv -o planning.jsonl -o agendas/jury.ics --start-date 2025-06-02
+
+Avec `--serve PORT`, les données restent en mémoire derrière une API
+HTTP/JSON (`optiplan.server`). Les imports lourds sont différés : pandas n'est
+chargé que si un fichier Excel doit être lu (pas quand l'instantané en cache
+est à jour), ReportLab que si un PDF est demandé. `run()` renvoie le
+`Scheduler`, pour un usage depuis Python :
+
+    scheduler = run(options(professors='enseignants.xlsx', students='students_data.xlsx', output=[]))
+"""
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict
+from datetime import date, time
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import constraints, profiling
+from .diagnosis import Diagnosis, cause_labels, diagnose, summary
+from .export import Clock, exporters, write_all
+from .greedy import engines, selections
+from .models import Professor, Session, Student
+from .registry import Registry
+from .scheduler import Scheduler
+
+default_rooms = [f"Salle {100 + i}" for i in range(5)]
+
+
+def _write_pdf(path: str, scheduler: Scheduler, args: argparse.Namespace) -> None:
+    from .report import pdf_layouts
+
+    pdf_layouts[args.pdf_layout](path, scheduler, Registry(scheduler.professors, scheduler.students,
+                                                           scheduler.rooms))
+
+
+def _write_json(path: str, scheduler: Scheduler, args: argparse.Namespace) -> None:
+    with open(path, 'w', encoding='utf-8') as target:
+        json.dump({
+            'num_days': scheduler.num_days,
+            'slots_per_day': scheduler.slots_per_day,
+            'engine': args.engine,
+            'statistics': scheduler.statistics(),
+            'defenses': [asdict(defense) for defense in scheduler.defenses],
+            'diagnoses': [_diagnosis_dict(diagnosis) for diagnosis in diagnose(scheduler)],
+            'validation': scheduler.validate().summary(),
+        }, target, indent=1, ensure_ascii=False)
+
+
+def _write_personal_pdfs(directory: str, scheduler: Scheduler, args: argparse.Namespace) -> None:
+    from .personal import render_personal_pdfs
+
+    render_personal_pdfs(directory, scheduler.defenses, Registry(scheduler.professors, scheduler.students,
+                                                                 scheduler.rooms),
+                         scheduler.slots_per_day, args.workers)
+
+
+def _diagnosis_dict(diagnosis: Diagnosis) -> Dict:
+    return {
+        'student_id': diagnosis.student_id,
+        'blocking': sorted(diagnosis.blocking),
+        'slots': diagnosis.slots,
+        'counts': diagnosis.counts,
+        'relaxations': [dict(asdict(relaxation), cost=relaxation.cost) for relaxation in diagnosis.relaxations],
+        'cost': diagnosis.cost,
+    }
+
+
+def _clock(args: argparse.Namespace) -> Optional[Clock]:
+    return Clock(args.start_date, args.day_start, args.slot_minutes) if args.start_date else None
+
+
+def _export(path: str, scheduler: Scheduler, args: argparse.Namespace) -> None:
+    exporters[os.path.splitext(path)[1].lower()](
+        path, scheduler.defenses, Registry(scheduler.professors, scheduler.students, scheduler.rooms),
+        scheduler.slots_per_day, _clock(args))
+
+
+# Extension -> écriture d'une sortie
+writers: Dict[str, Callable[[str, Scheduler, argparse.Namespace], None]] = {
+    '.pdf': _write_pdf,
+    '.json': _write_json,
+    **dict.fromkeys(exporters, _export),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='optiplan', description="Planification des soutenances.")
+    inputs = parser.add_argument_group('données')
+    inputs.add_argument('--professors', help='fichier Excel des enseignants')
+    inputs.add_argument('--students', help='fichier Excel des étudiants')
+    inputs.add_argument('--no-cache', action='store_true', help="relire les fichiers Excel sans l'instantané")
+    inputs.add_argument('-v', '--verbose', action='store_true',
+                        help='afficher les enseignants lus et les causes des étudiants non programmés')
+
+    calendar = parser.add_argument_group('calendrier et salles')
+    calendar.add_argument('--session', help='fichier JSON de session (calendrier et salles par campus)')
+    calendar.add_argument('--days', type=int, default=5)
+    calendar.add_argument('--slots-per-day', type=int, default=8)
+    calendar.add_argument('--rooms', nargs='+', default=default_rooms, metavar='SALLE')
+
+    planning = parser.add_argument_group('planification')
+    planning.add_argument('--engine', choices=list(engines), default='student_major',
+                          help="heuristique gloutonne : 'student_major' (source.py), 'slot_major' (test2.py)…")
+    planning.add_argument('--selection', choices=list(selections), default='rank',
+                          help="choix des jurys : 'rank' (premier libre par grade), 'balanced' (moins chargé)")
+    planning.add_argument('--relax-rule', dest='relaxed_rules', action='append', choices=list(constraints.rules),
+                          metavar='RÈGLE', help="ne pas appliquer cette règle (optiplan.constraints) ; répétable")
+    planning.add_argument('--mode', choices=['greedy', 'cpsat'], default='greedy')
+    planning.add_argument('--solver-time-limit', type=float, default=60)
+    planning.add_argument('--no-local-search', dest='local_search', action='store_false')
+    planning.add_argument('--local-search-iterations', type=int, default=10000)
+    planning.add_argument('--local-search-time-limit', type=float, default=5)
+    planning.add_argument('--multistart-runs', type=int, default=1)
+    planning.add_argument('--workers', type=int,
+                          help='processus (multi-départs, campus, PDF personnels) et fils de CP-SAT ; '
+                               'tous les cœurs par défaut')
+    planning.add_argument('--seed', type=int, default=0)
+
+    outputs = parser.add_argument_group('sorties')
+    outputs.add_argument('-o', '--output', action='append', default=None, metavar='FICHIER',
+                         help=f"fichier à écrire, format selon l'extension ({', '.join(writers)}) ; "
+                              "répétable, planning_soutenances.pdf par défaut")
+    outputs.add_argument('--pdf-layout', choices=['summary', 'detailed'], default='detailed',
+                         help="'summary' : paysage, planning et statistiques ; 'detailed' : avec étudiants "
+                              "non programmés et créneaux libres")
+    outputs.add_argument('--start-date', type=date.fromisoformat, metavar='AAAA-MM-JJ',
+                         help="premier jour de la session : heures dans les exports, requis pour .ics")
+    outputs.add_argument('--day-start', type=time.fromisoformat, default=time(8, 0), metavar='HH:MM',
+                         help='heure du premier créneau de chaque jour')
+    outputs.add_argument('--slot-minutes', type=int, default=60, help="durée d'un créneau")
+    outputs.add_argument('--personal-pdfs', metavar='DOSSIER',
+                         help="un PDF par membre de jury et par salle dans ce dossier (optiplan.personal)")
+    outputs.add_argument('--profile', metavar='FICHIER', help='écrire le profil par phase (JSON)')
+
+    service = parser.add_argument_group('service')
+    service.add_argument('--serve', type=int, metavar='PORT',
+                         help="garder les données en mémoire et répondre en HTTP/JSON (voir optiplan.server)")
+    service.add_argument('--host', default='127.0.0.1')
+    return parser
+
+
+def options(**values) -> argparse.Namespace:
+    """Options par défaut de la ligne de commande, modifiées par `values`."""
+    args = build_parser().parse_args([])
+    for name, value in values.items():
+        if not hasattr(args, name):
+            raise TypeError(f"option inconnue : {name}")
+        setattr(args, name, value)
+    return args
+
+
+def session_of(args: argparse.Namespace) -> Session:
+    if args.session:
+        from .loading import load_session
+
+        return load_session(args.session)
+    return Session(args.days, args.slots_per_day, {'': list(args.rooms)})
+
+
+def load(args: argparse.Namespace) -> Tuple[Session, List[Professor], List[Student]]:
+    """Session, enseignants et étudiants décrits par les options."""
+    from .loading import load_professors, load_students
+
+    session = session_of(args)
+    professors = load_professors(args.professors, session.num_days, session.slots_per_day, cache=not args.no_cache)
+    if args.verbose:
+        for prof in professors:
+            print(prof)
+    students = load_students(args.students, cache=not args.no_cache)
+    return session, professors, students
+
+
+def run(args: argparse.Namespace) -> Scheduler:
+    profiler = profiling.enable() if args.profile else profiling.active
+    session, professors, students = load(args)
+
+    scheduler = Scheduler(professors, students, session.rooms(), session.num_days, session.slots_per_day,
+                          seed=args.seed, relaxed_rules=args.relaxed_rules or ())
+    scheduler.schedule(args.engine, multistart_runs=args.multistart_runs, multistart_workers=args.workers,
+                       local_search=args.local_search, local_search_iterations=args.local_search_iterations,
+                       local_search_time_limit=args.local_search_time_limit, mode=args.mode,
+                       solver_time_limit=args.solver_time_limit, solver_workers=args.workers,
+                       shard_workers=args.workers, selection=args.selection)
+    if scheduler.shard_plan is not None:
+        plan = scheduler.shard_plan
+        print(f"Planification par campus : {len(plan.shards)} campus, {len(plan.components)} composante(s), "
+              f"{len(plan.shared_professors)} enseignant(s) partagé(s)")
+    if scheduler.best_start is not None:
+        print(f"Multi-départs : meilleur planning obtenu au départ {scheduler.best_start}")
+    if scheduler.solve_result is not None:
+        result = scheduler.solve_result
+        print(f"CP-SAT : {result.status}, {len(result.defenses)} soutenances (borne {result.upper_bound})")
+    with profiler.phase('statistics'):
+        stats = scheduler.statistics()
+    print(f"{stats['scheduled_students_count']} étudiant(s) programmé(s) sur {stats['total_students']}, "
+          f"salles occupées à {stats['room_utilization']:.2f}%, charge des jurys : max "
+          f"{stats['max_professor_load']}, écart-type {stats['professor_load_stddev']:.2f}")
+    with profiler.phase('validation'):
+        validation = scheduler.validate()
+    metrics = validation.metrics
+    print("Vérification : "
+          + (', '.join(f"{name} ({count})" for name, count in validation.describe()) or "aucune violation")
+          + f", {metrics['gaps']} trou(s) ({metrics['gaps_per_professor']:.2f} par enseignant), "
+            f"{metrics['room_changes']} changement(s) de salle ({metrics['room_changes_per_professor']:.2f} par "
+            f"enseignant), score {validation.score:.2f}")
+    if args.verbose and stats['unscheduled_students_count']:
+        causes = summary(diagnose(scheduler))
+        print("Causes bloquantes des étudiants non programmés : "
+              + ', '.join(f"{cause_labels[cause]} ({count})" for cause, count in causes.most_common()))
+
+    # Sorties écrites en parallèle, annoncées dès qu'elles sont prêtes
+    paths = args.output if args.output is not None else ['planning_soutenances.pdf']
+    jobs = [(path, partial(writers[os.path.splitext(path)[1].lower()], path, scheduler, args)) for path in paths]
+    for path in write_all(jobs):
+        print(f"Planning écrit dans '{path}'.")
+    if args.personal_pdfs:
+        # Après le pool de threads : le pool de processus ne part pas d'un thread d'écriture
+        _write_personal_pdfs(args.personal_pdfs, scheduler, args)
+        print(f"PDF personnels écrits dans '{args.personal_pdfs}'.")
+
+    if args.profile:
+        profiler.write(args.profile)
+        profiling.disable()
+        print(f"Profil d'exécution écrit dans '{args.profile}'.")
+    return scheduler
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.professors or not args.students:
+        parser.error("--professors et --students sont obligatoires")
+    if args.serve is not None:
+        from .server import serve
+
+        try:
+            serve(args)
+        except (OSError, ValueError) as exc:
+            print(f"optiplan : {exc}", file=sys.stderr)
+            return 1
+        return 0
+    for path in args.output or ():
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in writers:
+            parser.error(f"format de sortie non reconnu : {path} (extensions : {', '.join(writers)})")
+        if extension == '.ics' and args.start_date is None:
+            parser.error("--start-date est requis pour les agendas iCalendar (.ics)")
+    try:
+        run(args)
+    except (OSError, ValueError) as exc:
+        print(f"optiplan : {exc}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,297 @@
+"""Registre déclaratif des règles de planification, compilées en masques NumPy.
+
+Chaque règle porte un nom (clé du registre `rules`), un statut (`hard` :
+appliquée par la planification ; sinon règle souple, seulement évaluée avec
+son poids `weight`) et se compile une fois, au lieu d'être testée candidat
+par candidat :
+
+- `RoleRule` : l'enseignant peut-il tenir un rôle du jury ('president',
+  'examiner') ? La règle ramène l'étudiant et son encadreur à une clé (niveau,
+  grade de l'encadreur, filière normalisée…) et sa réponse ne dépend que de
+  l'enseignant et de la clé : un masque (un booléen par enseignant) par clé.
+  `RuleSet.group()` combine par ET les masques des règles du rôle ; les
+  étudiants de même profil partagent le groupe de candidats obtenu, et les
+  heuristiques ne voient plus que des lignes d'enseignants.
+- `SlotRule` : limite posée par les soutenances d'un enseignant dans la
+  journée (plafond journalier, créneaux consécutifs). La règle rend, pour des
+  lignes d'enseignants et un jour, les créneaux où une soutenance de plus la
+  violerait. Le plafond journalier est tenu par le compteur
+  `AvailabilityIndex.day_count` ; les autres règles ne dépendent que des
+  créneaux occupés du jour et sont compilées ensemble en une table (motif
+  d'occupation du jour -> créneaux interdits, `RuleSet.pattern_table`).
+  `AvailabilityIndex.blocked` réunit leurs masques et n'est relu dans la
+  table que pour le jour et les enseignants d'une soutenance placée ou
+  retirée : « enseignant libre » reste une lecture de matrice, et la mise à
+  jour une lecture de table, quel que soit le nombre de règles.
+
+Une règle `relaxable` est levée par la passe de rattrapage des heuristiques
+créneau par créneau (examinateur non spécialiste). `relaxed` retire des
+règles nommées d'une planification (`Scheduler(..., relaxed_rules=...)`,
+`--relax-rule` en ligne de commande). Ajouter une règle :
+
+    register(MaxConsecutive(limit=2))  # Pas plus de deux soutenances d'affilée
+
+Le registre est lu à la construction de chaque `RuleSet` : une règle ajoutée
+vaut pour les planifications suivantes. Les processus de calcul (multi-départs,
+planification par campus, service HTTP) ne l'héritent pas forcément : avec les
+méthodes de démarrage 'spawn' et 'forkserver' (macOS, Windows, Linux à partir
+de Python 3.14), ils réimportent le paquet et ne verraient que les règles
+intégrées. Le registre du processus parent leur est donc transmis par
+l'initialisation du pool (`install`).
+"""
+from dataclasses import dataclass
+from typing import ClassVar, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .models import Professor, Student, rank_values
+from .rules import level_min_rank
+from .specialties import normalize
+
+roles = ('president', 'examiner')
+
+
+@dataclass
+class Rule:
+    name: ClassVar[str] = ''
+    label: ClassVar[str] = ''  # Libellé des rapports
+    hard: bool = True
+    weight: float = 1.0  # Pénalité par violation d'une règle souple
+    relaxable: bool = False
+
+
+@dataclass
+class RoleRule(Rule):
+    role: ClassVar[str] = 'president'
+
+    def key(self, student: Student, supervisor: Professor) -> Hashable:
+        return None
+
+    def allows(self, prof: Professor, key: Hashable) -> bool:
+        raise NotImplementedError
+
+    def mask(self, professors: Sequence[Professor], key: Hashable) -> np.ndarray:
+        """Enseignants admis pour la clé, dans l'ordre de `professors`."""
+        return np.fromiter((self.allows(prof, key) for prof in professors), dtype=bool, count=len(professors))
+
+
+@dataclass
+class SlotRule(Rule):
+    def blocked(self, busy: np.ndarray, count: np.ndarray, cap: int) -> np.ndarray:
+        """Créneaux du jour (lignes x créneaux) où une soutenance de plus violerait la règle.
+
+        `busy` : occupations du jour des lignes ; `count` : leurs soutenances du jour ; `cap` : plafond
+        journalier de l'index.
+        """
+        raise NotImplementedError
+
+    def constrain(self, model, loads: List[list], cap: int) -> None:
+        """Contraintes CP-SAT d'un enseignant sur un jour ; `loads[s]` : ses rôles possibles au s-ième créneau."""
+        raise NotImplementedError(f"règle sans formulation CP-SAT : {self.name}")
+
+
+@dataclass
+class PresidentNotProfessor(RoleRule):
+    name: ClassVar[str] = 'president_not_professor'
+    label: ClassVar[str] = "président de grade autre que 'Professeur'"
+
+    def allows(self, prof: Professor, key: Hashable) -> bool:
+        return prof.rank != 'Professeur'
+
+
+@dataclass
+class PresidentLevelRank(RoleRule):
+    name: ClassVar[str] = 'president_level_rank'
+    label: ClassVar[str] = "grade du président selon le niveau (Master : MC)"
+
+    def key(self, student: Student, supervisor: Professor) -> Hashable:
+        return level_min_rank(student.level)
+
+    def allows(self, prof: Professor, key: Hashable) -> bool:
+        return rank_values[prof.rank] >= key
+
+
+@dataclass
+class PresidentSupervisorRank(RoleRule):
+    name: ClassVar[str] = 'president_supervisor_rank'
+    label: ClassVar[str] = "président de grade au moins égal à celui de l'encadreur"
+
+    def key(self, student: Student, supervisor: Professor) -> Hashable:
+        return rank_values[supervisor.rank]
+
+    def allows(self, prof: Professor, key: Hashable) -> bool:
+        return rank_values[prof.rank] >= key
+
+
+@dataclass
+class SpecialistExaminer(RoleRule):
+    name: ClassVar[str] = 'examiner_specialist'
+    label: ClassVar[str] = "examinateur spécialiste de la filière"
+    role: ClassVar[str] = 'examiner'
+    relaxable: bool = True
+
+    def key(self, student: Student, supervisor: Professor) -> Hashable:
+        return normalize(student.field)
+
+    def allows(self, prof: Professor, key: Hashable) -> bool:
+        return any(normalize(specialty) == key for specialty in prof.specialties)
+
+
+@dataclass
+class DailyCap(SlotRule):
+    name: ClassVar[str] = 'daily_cap'
+    label: ClassVar[str] = "plafond de soutenances par jour"
+
+    def blocked(self, busy: np.ndarray, count: np.ndarray, cap: int) -> np.ndarray:
+        return np.broadcast_to((count >= cap)[:, np.newaxis], busy.shape)
+
+    def constrain(self, model, loads: List[list], cap: int) -> None:
+        day = [var for load in loads for var in load]
+        if len(day) > cap:
+            model.Add(sum(day) <= cap)
+
+
+@dataclass
+class MaxConsecutive(SlotRule):
+    """Au plus `limit` soutenances sur des créneaux consécutifs d'un même jour (non enregistrée par défaut)."""
+    name: ClassVar[str] = 'max_consecutive'
+    label: ClassVar[str] = "soutenances consécutives"
+    limit: int = 2
+
+    def blocked(self, busy: np.ndarray, count: np.ndarray, cap: int) -> np.ndarray:
+        width = self.limit + 1
+        slots = busy.shape[1]
+        blocked = np.zeros(busy.shape, dtype=bool)
+        if slots < width:
+            return blocked
+        # Fenêtres de `width` créneaux déjà pleines à une place près : chacune interdit sa place libre
+        sums = np.zeros((busy.shape[0], slots + 1), dtype=np.int32)
+        np.cumsum(busy, axis=1, out=sums[:, 1:])
+        full = sums[:, width:] - sums[:, :-width] >= self.limit
+        for offset in range(width):
+            blocked[:, offset:offset + slots - self.limit] |= full
+        return blocked & ~busy
+
+    def constrain(self, model, loads: List[list], cap: int) -> None:
+        for start in range(len(loads) - self.limit):
+            window = [var for load in loads[start:start + self.limit + 1] for var in load]
+            if len(window) > self.limit:
+                model.Add(sum(window) <= self.limit)
+
+
+# Nom -> règle ; l'ordre d'enregistrement est l'ordre d'évaluation
+rules: Dict[str, Rule] = {}
+
+
+def register(rule: Rule) -> Rule:
+    """Ajoute la règle au registre (ou remplace celle de même nom)."""
+    rules[rule.name] = rule
+    return rule
+
+
+def install(registry: Dict[str, Rule]) -> None:
+    """Remplace le contenu du registre par `registry` (registre du parent, dans un processus de calcul)."""
+    if registry is not rules:
+        registry = dict(registry)
+        rules.clear()
+        rules.update(registry)
+
+
+for _rule in (PresidentNotProfessor(), PresidentLevelRank(), PresidentSupervisorRank(), SpecialistExaminer(),
+              DailyCap()):
+    register(_rule)
+
+
+class RuleSet:
+    """Règles dures du registre, hors `relaxed`, compilées pour une liste d'enseignants (lignes de l'index).
+
+    Avec `soft`, les règles souples sont compilées aussi (évaluation d'un planning, `optiplan.validation`).
+    """
+
+    def __init__(self, professors: Sequence[Professor], relaxed: Iterable[str] = (),
+                 registry: Optional[Dict[str, Rule]] = None, soft: bool = False):
+        registry = rules if registry is None else registry
+        self.relaxed = frozenset(relaxed)
+        unknown = self.relaxed - set(registry)
+        if unknown:
+            raise ValueError(f"règles inconnues : {', '.join(sorted(unknown))} ({', '.join(registry)})")
+        self.professors = list(professors)
+        self.registry = registry
+        self.soft = soft
+        active = [rule for name, rule in registry.items() if (rule.hard or soft) and name not in self.relaxed]
+        self.role_rules: Dict[str, List[RoleRule]] = {
+            role: [rule for rule in active if isinstance(rule, RoleRule) and rule.role == role] for role in roles}
+        self._names = {role: (role, *(rule.name for rule in role_rules))
+                       for role, role_rules in self.role_rules.items()}
+        self.slot_rules: List[SlotRule] = [rule for rule in active if isinstance(rule, SlotRule)]
+        # Le plafond journalier est tenu par l'index lui-même (compteur `day_count`, sans recalcul de masque)
+        self.daily_cap = any(isinstance(rule, DailyCap) for rule in self.slot_rules)
+        self.pattern_rules = [rule for rule in self.slot_rules if not isinstance(rule, DailyCap)]
+        # Tables partagées avec les ensembles dérivés (`without`) : un groupe y garde le même identifiant
+        self.masks: Dict[Tuple[str, int], np.ndarray] = {}  # Groupe -> enseignants admis
+        self._rule_masks: Dict[Tuple[str, Hashable], np.ndarray] = {}
+        self._groups: Dict[tuple, Tuple[str, int]] = {}  # ((rôle, règles), clés) -> groupe
+        self._canonical: Dict[Tuple[str, bytes], Tuple[str, int]] = {}
+        self._fallback: Optional['RuleSet'] = None
+        self._tables: Dict[Tuple[int, int], np.ndarray] = {}
+
+    def without(self, names: Iterable[str]) -> 'RuleSet':
+        derived = RuleSet(self.professors, self.relaxed | set(names), self.registry, self.soft)
+        derived.masks, derived._rule_masks = self.masks, self._rule_masks
+        derived._groups, derived._canonical = self._groups, self._canonical
+        return derived
+
+    @property
+    def fallback(self) -> 'RuleSet':
+        """Les mêmes règles sans les règles `relaxable` (passe de rattrapage)."""
+        if self._fallback is None:
+            self._fallback = self.without(name for name, rule in self.registry.items() if rule.relaxable)
+        return self._fallback
+
+    def group(self, role: str, student: Student, supervisor: Professor) -> Tuple[str, int]:
+        """Groupe de candidats au rôle pour l'étudiant ; un même groupe pour des masques identiques."""
+        role_rules = self.role_rules[role]
+        keys = tuple(rule.key(student, supervisor) for rule in role_rules)
+        group = self._groups.get((self._names[role], keys))
+        if group is None:
+            mask = np.ones(len(self.professors), dtype=bool)
+            for rule, key in zip(role_rules, keys):
+                mask &= self.rule_mask(rule, key)
+            group = self._groups[self._names[role], keys] = self._canonical.setdefault(
+                (role, mask.tobytes()), (role, len(self._canonical)))
+            self.masks.setdefault(group, mask)
+        return group
+
+    def rule_mask(self, rule: RoleRule, key: Hashable) -> np.ndarray:
+        """Masque de la règle pour la clé, compilé à la première demande."""
+        mask = self._rule_masks.get((rule.name, key))
+        if mask is None:
+            mask = self._rule_masks[rule.name, key] = rule.mask(self.professors, key)
+        return mask
+
+    def rows(self, group: Tuple[str, int], order: np.ndarray) -> np.ndarray:
+        """Lignes du groupe, dans l'ordre de préférence `order` (lignes de l'index)."""
+        return order[self.masks[group][order]]
+
+    def blocked(self, busy: np.ndarray, cap: int) -> np.ndarray:
+        """Réunion des masques des règles d'occupation autres que le plafond journalier."""
+        blocked = np.zeros(busy.shape, dtype=bool)
+        count = busy.sum(axis=1)
+        for rule in self.pattern_rules:
+            blocked |= rule.blocked(busy, count, cap)
+        return blocked
+
+    def pattern_table(self, slots_per_day: int, cap: int) -> Optional[np.ndarray]:
+        """`blocked` pour chaque motif d'occupation d'un jour (bit s : créneau s occupé).
+
+        Lignes de la table : 2 ** slots_per_day motifs ; colonnes : créneaux du jour. None au-delà de
+        16 créneaux par jour (les masques sont alors recalculés à chaque soutenance).
+        """
+        if slots_per_day > 16:
+            return None
+        table = self._tables.get((slots_per_day, cap))
+        if table is None:
+            patterns = np.arange(1 << slots_per_day)
+            busy = (patterns[:, np.newaxis] >> np.arange(slots_per_day) & 1).astype(bool)
+            table = self._tables[slots_per_day, cap] = self.blocked(busy, cap)
+        return table
@@ -0,0 +1,365 @@
+"""Diagnostic des étudiants non programmés : contraintes bloquantes et relâchement suggéré.
+
+Sur l'état final du planning, chaque enseignant et chaque salle est résumé
+par des ensembles de créneaux codés en bits d'un entier (disponible, pris,
+au plafond journalier, libre). Pour un groupe de candidats (présidents ou
+examinateurs possibles d'après les règles de `index.rules`, leur union), on
+précalcule une fois les créneaux où au moins 1, 2 ou 3 membres sont libres :
+exclure l'encadreur revient alors à une opération de bits, et les causes
+d'échec d'un étudiant sur tous les créneaux s'obtiennent par quelques
+intersections, sans reparcourir les enseignants.
+
+Causes (`cause_labels`) : encadreur indisponible, déjà pris ou au plafond
+journalier (ou bloqué par une autre règle d'occupation), aucun président ou
+examinateur spécialiste libre, président et examinateur réduits à un seul
+enseignant libre, aucune salle libre. Pour
+chaque étudiant :
+
+- `blocking` est le plus petit ensemble de causes qui bloque à lui seul un
+  créneau (ensemble bloquant minimal ; vide si l'étudiant est plaçable en
+  l'état). Si aucun créneau bloqué par si peu de causes n'a de relâchement
+  simple, c'est le plus petit ensemble dont un créneau en a un ;
+- `relaxations` est le relâchement le moins coûteux qui lève `blocking` sur
+  l'un de ses créneaux : un créneau de disponibilité de plus pour un
+  enseignant donné (coût 1), la réouverture d'une salle fermée (1), le
+  remplacement d'un enseignant dans un jury où il n'est pas encadreur (2),
+  un examinateur non spécialiste (2) ou une salle supplémentaire (3).
+
+    for diagnosis in diagnose(scheduler):
+        print(diagnosis.student_id, diagnosis.blocking, diagnosis.cost)
+"""
+import itertools
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import profiling
+from .models import Student
+from .registry import Registry
+from .scheduler import Scheduler
+
+cause_labels = {
+    'unknown_supervisor': "encadreur inconnu",
+    'supervisor_unavailable': "encadreur indisponible",
+    'supervisor_busy': "encadreur déjà pris",
+    'supervisor_daily_cap': "encadreur au plafond journalier ou bloqué par une règle",
+    'no_president': "aucun président libre",
+    'no_examiner': "aucun examinateur spécialiste libre",
+    'jury_overlap': "un seul enseignant libre pour présider et examiner",
+    'no_room': "aucune salle libre",
+}
+
+relaxation_costs = {'extra_slot': 1, 'open_room': 1, 'release': 2, 'non_specialist_examiner': 2, 'extra_room': 3}
+
+
+@dataclass
+class Relaxation:
+    kind: str  # Clé de `relaxation_costs`
+    slot: int
+    professor_id: Optional[int] = None
+    room_id: Optional[int] = None
+    student_id: Optional[int] = None  # 'release' : étudiant dont le jury est à modifier
+
+    @property
+    def cost(self) -> int:
+        return relaxation_costs[self.kind]
+
+    def describe(self, registry: Registry, slots_per_day: int) -> str:
+        when = f"jour {self.slot // slots_per_day + 1}, créneau {self.slot % slots_per_day + 1}"
+        prof = registry.professors[self.professor_id].name if self.professor_id is not None else None
+        if self.kind == 'extra_slot':
+            return f"disponibilité de {prof} ({when})"
+        if self.kind == 'release':
+            return f"remplacer {prof} dans le jury de {registry.students[self.student_id].name} ({when})"
+        if self.kind == 'non_specialist_examiner':
+            return f"examinateur non spécialiste : {prof} ({when})"
+        if self.kind == 'open_room':
+            return f"rouvrir {registry.rooms[self.room_id].name} ({when})"
+        return f"une salle de plus ({when})"
+
+
+@dataclass
+class Diagnosis:
+    student_id: int
+    blocking: FrozenSet[str]  # Ensemble bloquant minimal, relâchable de préférence (vide : plaçable)
+    slots: List[int]  # Créneaux bloqués exactement par `blocking`
+    counts: Dict[str, int] = field(default_factory=dict)  # Cause -> nombre de créneaux qu'elle bloque
+    relaxations: List[Relaxation] = field(default_factory=list)  # Relâchement le moins coûteux
+
+    @property
+    def cost(self) -> Optional[int]:
+        """Coût du relâchement suggéré ; None si aucun relâchement simple ne suffit."""
+        if not self.blocking:
+            return 0
+        return sum(relaxation.cost for relaxation in self.relaxations) if self.relaxations else None
+
+    def describe(self, registry: Registry, slots_per_day: int) -> Tuple[str, str]:
+        """(causes, suggestion) en clair, pour le rapport."""
+        causes = ', '.join(cause_labels[cause] for cause in sorted(self.blocking)) or "plaçable en l'état"
+        if not self.blocking:
+            return causes, "relancer l'amélioration locale"
+        if not self.relaxations:
+            return causes, "aucun relâchement simple"
+        return causes, ' ; '.join(relaxation.describe(registry, slots_per_day) for relaxation in self.relaxations)
+
+
+def _bits(matrix: np.ndarray) -> List[int]:
+    # Une ligne booléenne -> entier dont le bit s vaut la colonne s
+    packed = np.packbits(matrix, axis=1, bitorder='little')
+    return [int.from_bytes(row.tobytes(), 'little') for row in packed]
+
+
+def _lowest(bits: int) -> int:
+    return (bits & -bits).bit_length() - 1
+
+
+def _slots(bits: int) -> List[int]:
+    slots = []
+    while bits:
+        low = bits & -bits
+        slots.append(low.bit_length() - 1)
+        bits ^= low
+    return slots
+
+
+def _at_least(members: Iterable[int], free: Sequence[int]) -> Tuple[int, int, int]:
+    # Créneaux où au moins 1, 2, 3 membres du groupe sont libres
+    one = two = three = 0
+    for row in members:
+        bits = free[row]
+        three |= two & bits
+        two |= one & bits
+        one |= bits
+    return one, two, three
+
+
+class _Diagnoser:
+    def __init__(self, scheduler: Scheduler):
+        self.scheduler = scheduler
+        index = self.index = scheduler.index
+        self.full = (1 << index.total_slots) - 1
+        day_of = np.arange(index.total_slots) // index.slots_per_day
+        capped = (index.day_count >= index.max_per_day)[:, day_of] | index.blocked
+        free = index.available & ~index.busy & ~capped
+        addable = ~index.available & ~index.busy & ~capped
+
+        # Par enseignant, ses créneaux ; par créneau, ses enseignants, numérotés par charge croissante (le bit le
+        # plus faible d'un ensemble est l'enseignant le moins chargé)
+        self.available = _bits(index.available)
+        self.busy = _bits(index.busy)
+        self.capped = _bits(capped)
+        self.free = _bits(free)
+        self.order = np.argsort(index.load, kind='stable')
+        self.position = np.empty_like(self.order)
+        self.position[self.order] = np.arange(self.order.size)
+        self.free_at = _bits(free[self.order].T)
+        self.addable_at = _bits(addable[self.order].T)
+        self.busy_at = _bits(index.busy[self.order].T)
+
+        # Salles libres (et salles fermées mais inoccupées) par campus ; une seule entrée (None) pour un seul campus
+        campus_rooms: Dict[Optional[str], List[int]] = {}
+        for room in scheduler.rooms:
+            campus_rooms.setdefault(room.campus, []).append(room.id)
+        self.multi_campus = len(campus_rooms) > 1
+        if not self.multi_campus:
+            campus_rooms = {None: [room.id for room in scheduler.rooms]}
+        room_free = index.room_open & ~index.room_busy
+        room_closed = ~index.room_open & ~index.room_busy
+        self.room_rows = {campus: index.room_rows(room_ids) for campus, room_ids in campus_rooms.items()}
+        self.room_free = {campus: _bits(room_free[rows].any(axis=0, keepdims=True))[0]
+                          for campus, rows in self.room_rows.items()}
+        self.room_closed = {campus: _bits(room_closed[rows].any(axis=0, keepdims=True))[0]
+                            for campus, rows in self.room_rows.items()}
+
+        # Groupes de candidats (`RuleSet.group`) : lignes, ensemble d'enseignants et créneaux où au moins 1, 2, 3
+        # d'entre eux sont libres, calculés à la première demande
+        self.rules = index.rules
+        self.groups: Dict[tuple, Tuple[List[int], int, Tuple[int, int, int]]] = {}
+
+    def _group(self, key: tuple, rows: List[int]) -> Tuple[List[int], int, Tuple[int, int, int]]:
+        group = self.groups.get(key)
+        if group is None:
+            members = np.zeros(self.order.size, dtype=bool)
+            members[self.position[rows]] = True
+            mask = _bits(members[np.newaxis])[0] if rows else 0
+            group = self.groups[key] = (rows, mask, _at_least(rows, self.free))
+        return group
+
+    def _candidates(self, group: tuple) -> Tuple[List[int], int, Tuple[int, int, int]]:
+        if group in self.groups:
+            return self.groups[group]
+        return self._group(group, np.flatnonzero(self.rules.masks[group]).tolist())
+
+    @staticmethod
+    def _excluding(counts: Tuple[int, int, int], k: int, member_free: int) -> int:
+        # Au moins k membres libres sans compter l'encadreur (libre sur `member_free`)
+        return (counts[k - 1] & ~member_free) | (counts[k] & member_free) if k < 3 else counts[k - 1] & ~member_free
+
+    def diagnose(self, student: Student) -> Diagnosis:
+        supervisor = self.scheduler.search.professors.get(student.supervisor_id)
+        if supervisor is None:
+            return Diagnosis(student.id, frozenset({'unknown_supervisor'}), [])
+        sup_row = self.index.prof_row[supervisor.id]
+        sup_bit = 1 << int(self.position[sup_row])
+        sup_free = self.free[sup_row]
+        president_group = self.rules.group('president', student, supervisor)
+        examiner_group = self.rules.group('examiner', student, supervisor)
+        presidents, pres_mask, pres_counts = self._candidates(president_group)
+        specialists, spec_mask, exam_counts = self._candidates(examiner_group)
+        _, _, union_counts = self._group(('union', president_group, examiner_group),
+                                         sorted(set(presidents) | set(specialists)))
+        pres_ok = self._excluding(pres_counts, 1, sup_free if pres_mask & sup_bit else 0)
+        exam_ok = self._excluding(exam_counts, 1, sup_free if spec_mask & sup_bit else 0)
+        union_ok = self._excluding(union_counts, 2, sup_free if (pres_mask | spec_mask) & sup_bit else 0)
+        campus = student.campus if self.multi_campus else None
+
+        full = self.full
+        causes = {
+            'supervisor_unavailable': ~self.available[sup_row] & full,
+            'supervisor_busy': self.busy[sup_row],
+            'supervisor_daily_cap': self.capped[sup_row] & self.available[sup_row] & ~self.busy[sup_row],
+            'no_president': ~pres_ok & full,
+            'no_examiner': ~exam_ok & full,
+            'jury_overlap': pres_ok & exam_ok & ~union_ok & full,
+            'no_room': ~self.room_free.get(campus, 0) & full,
+        }
+        causes = {cause: bits for cause, bits in causes.items() if bits}
+        counts = {cause: bits.bit_count() for cause, bits in causes.items()}
+
+        # Ensembles bloquants minimaux : par taille croissante, les combinaisons de causes qui bloquent seules
+        # au moins un créneau (créneaux où elles s'appliquent toutes, et aucune autre)
+        blocked = 0
+        for bits in causes.values():
+            blocked |= bits
+        if blocked != full:
+            return Diagnosis(student.id, frozenset(), _slots(full & ~blocked), counts)
+        # Le relâchement est cherché d'abord sur ces créneaux, puis sur ceux bloqués par plus de causes ; l'ensemble
+        # renvoyé est celui des créneaux du relâchement
+        names = sorted(causes)
+        minimal = None
+        for size in range(1, len(names) + 1):
+            candidates = []
+            for combination in itertools.combinations(names, size):
+                bits = full
+                for cause in names:
+                    bits &= causes[cause] if cause in combination else ~causes[cause]
+                if bits:
+                    candidates.append((frozenset(combination), bits))
+            if not candidates:
+                continue
+            minimal = minimal or candidates[0]
+            best = self._cheapest(sup_row, sup_bit, pres_mask, spec_mask, campus, candidates)
+            if best is not None:
+                blocking, bits, relaxations = best
+                return Diagnosis(student.id, blocking, _slots(bits), counts, relaxations)
+        return Diagnosis(student.id, minimal[0], _slots(minimal[1]), counts)
+
+    def _cheapest(self, sup_row: int, sup_bit: int, pres_mask: int, spec_mask: int, campus: Optional[str],
+                  candidates: List[Tuple[FrozenSet[str], int]]
+                  ) -> Optional[Tuple[FrozenSet[str], int, List[Relaxation]]]:
+        # Créneau le moins coûteux à débloquer ; chaque cause demande au moins un relâchement de coût 1
+        best, best_cost = None, None
+        for blocking, bits in candidates:
+            for slot in _slots(bits):
+                relaxations = self._relax(sup_row, sup_bit, pres_mask, spec_mask, campus, slot)
+                if relaxations is None:
+                    continue
+                cost = sum(relaxation.cost for relaxation in relaxations)
+                if best_cost is None or cost < best_cost:
+                    best, best_cost = (blocking, bits, relaxations), cost
+                    if cost == len(blocking):
+                        return best
+        return best
+
+    def _relax(self, sup_row: int, sup_bit: int, pres_mask: int, spec_mask: int, campus: Optional[str],
+               slot: int) -> Optional[List[Relaxation]]:
+        """Relâchements levant toutes les causes au créneau, ou None si l'une d'elles n'en a pas de simple."""
+        bit = 1 << slot
+        relaxations = []
+        if not self.free[sup_row] & bit:
+            if self.busy[sup_row] & bit:
+                fix = self._release(sup_row, slot, only_slot=True)
+            elif self.capped[sup_row] & bit:
+                fix = self._release(sup_row, slot, only_slot=False)
+            else:
+                fix = Relaxation('extra_slot', slot, int(self.index.prof_ids[sup_row]))
+            if fix is None:
+                return None
+            relaxations.append(fix)
+
+        # Président puis examinateur : un enseignant libre s'il y en a (le président de préférence hors des
+        # spécialistes, pour leur laisser l'examen), sinon le relâchement le moins cher
+        used = sup_bit
+        for role, mask in (('president', pres_mask), ('examiner', spec_mask)):
+            free = self.free_at[slot] & mask & ~used
+            if free:
+                if role == 'president' and free & ~spec_mask:
+                    free &= ~spec_mask
+                used |= free & -free
+                continue
+            fix = self._professor_fix('extra_slot', self.addable_at[slot] & mask & ~used, slot)
+            if fix is None and role == 'examiner':
+                fix = self._professor_fix('non_specialist_examiner', self.free_at[slot] & ~used, slot)
+            if fix is None:
+                busy = self.busy_at[slot] & mask & ~used
+                while busy and fix is None:
+                    position = _lowest(busy)
+                    busy &= ~(1 << position)
+                    fix = self._release(int(self.order[position]), slot, only_slot=True)
+            if fix is None:
+                return None
+            used |= 1 << int(self.position[self.index.prof_row[fix.professor_id]])
+            relaxations.append(fix)
+
+        if not self.room_free.get(campus, 0) & bit:
+            room_id = self._closed_room(campus, slot)
+            relaxations.append(Relaxation('open_room', slot, room_id=room_id) if room_id is not None
+                               else Relaxation('extra_room', slot))
+        return relaxations
+
+    def _professor_fix(self, kind: str, candidates: int, slot: int) -> Optional[Relaxation]:
+        # Le moins chargé des candidats (bit le plus faible)
+        if not candidates:
+            return None
+        return Relaxation(kind, slot, int(self.index.prof_ids[self.order[_lowest(candidates)]]))
+
+    def _release(self, row: int, slot: int, only_slot: bool) -> Optional[Relaxation]:
+        # Jury (au créneau, ou le même jour) où l'enseignant n'est pas encadreur : il peut y être remplacé
+        prof_id = int(self.index.prof_ids[row])
+        professor_slots = self.scheduler.search.professor_slots
+        slots_per_day = self.index.slots_per_day
+        day = slot // slots_per_day
+        for other in ([slot] if only_slot else range(day * slots_per_day, (day + 1) * slots_per_day)):
+            defense = professor_slots.get((prof_id, other))
+            if defense is not None and defense.supervisor_id != prof_id:
+                return Relaxation('release', slot, prof_id, student_id=defense.student_id)
+        return None
+
+    def _closed_room(self, campus: Optional[str], slot: int) -> Optional[int]:
+        index = self.index
+        rows = self.room_rows[campus] if campus in self.room_rows else None
+        if rows is None or not self.room_closed[campus] & (1 << slot):
+            return None
+        closed = rows[~index.room_open[rows, slot] & ~index.room_busy[rows, slot]]
+        return int(index.room_ids[closed[0]]) if closed.size else None
+
+
+def diagnose(scheduler: Scheduler, students: Optional[Iterable[Student]] = None) -> List[Diagnosis]:
+    """Diagnostic des étudiants donnés (par défaut, ceux qui ne sont pas programmés)."""
+    profiler = profiling.active
+    with profiler.phase('diagnosis'):
+        diagnoser = _Diagnoser(scheduler)
+        students = scheduler.unscheduled_students if students is None else list(students)
+        diagnoses = [diagnoser.diagnose(student) for student in students]
+    if profiler.enabled:
+        for diagnosis in diagnoses:
+            for cause in diagnosis.blocking:
+                profiler.count(f"diagnosis.blocking.{cause}")
+    return diagnoses
+
+
+def summary(diagnoses: Iterable[Diagnosis]) -> Counter:
+    """Nombre d'étudiants par cause de l'ensemble bloquant minimal."""
+    return Counter(cause for diagnosis in diagnoses for cause in diagnosis.blocking)
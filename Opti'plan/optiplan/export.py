@@ -0,0 +1,206 @@
+"""Exports lisibles par machine du planning : CSV, JSON Lines, iCalendar et Excel.
+
+Chaque écriture parcourt les soutenances triées par créneau puis par salle
+et écrit ligne à ligne, sans document intermédiaire ; seul Excel passe par
+openpyxl, en mode `write_only` (lignes écrites au fil de l'eau, sans garder
+les cellules en mémoire). Les colonnes (`columns`) sont les mêmes en CSV,
+JSON Lines et Excel ; jours et créneaux sont numérotés à partir de 1, comme
+dans le PDF.
+
+Les heures ne sont connues que si un calendrier (`Clock`) est donné : date
+du premier jour, heure du premier créneau et durée d'un créneau, les jours
+suivants étant les jours ouvrés qui suivent. Les agendas iCalendar en ont
+besoin ; ailleurs, `start` et `end` restent vides. Un agenda est écrit par
+enseignant, avec ses soutenances dans tous ses rôles : `agendas/jury.ics`
+donne `agendas/jury-<identifiant>.ics`.
+
+    write_csv('planning.csv', scheduler.defenses, registry, scheduler.slots_per_day)
+    write_icalendar('agendas/jury.ics', scheduler.defenses, registry, scheduler.slots_per_day,
+                    Clock(date(2025, 6, 2)))
+
+`write_all` lance plusieurs écritures en parallèle dans un pool de threads
+et rend la main écriture par écriture, dans l'ordre où elles se terminent :
+un CSV est disponible sans attendre la fin d'un PDF.
+"""
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .models import Defense
+from .registry import Registry
+
+columns = ['day', 'slot', 'time_slot', 'start', 'end', 'room', 'campus', 'student_id', 'student', 'level', 'field',
+           'president_id', 'president', 'examiner_id', 'examiner', 'supervisor_id', 'supervisor']
+
+
+@dataclass
+class Clock:
+    """Heures des créneaux : jours ouvrés à partir de `first_day`, créneaux consécutifs de `slot_minutes`."""
+    first_day: date
+    day_start: time = time(8, 0)
+    slot_minutes: int = 60
+
+    def bounds(self, slot: int, slots_per_day: int) -> Tuple[datetime, datetime]:
+        day = self.first_day
+        for _ in range(slot // slots_per_day):
+            day += timedelta(days=1)
+            while day.weekday() >= 5:
+                day += timedelta(days=1)
+        start = datetime.combine(day, self.day_start) + timedelta(minutes=slot % slots_per_day * self.slot_minutes)
+        return start, start + timedelta(minutes=self.slot_minutes)
+
+
+def _ordered(defenses: Iterable[Defense]) -> List[Defense]:
+    return sorted(defenses, key=attrgetter('time_slot', 'room_id'))
+
+
+def records(defenses: Iterable[Defense], registry: Registry, slots_per_day: int,
+            clock: Optional[Clock] = None) -> Iterator[List]:
+    """Valeurs des `columns` pour chaque soutenance, par créneau puis par salle."""
+    times: Dict[int, list] = {}  # Créneau -> jour, créneau du jour, début, fin (calculés une fois par créneau)
+    professors = registry.professors
+    for defense in _ordered(defenses):
+        slot = defense.time_slot
+        when = times.get(slot)
+        if when is None:
+            start, end = clock.bounds(slot, slots_per_day) if clock is not None else (None, None)
+            when = times[slot] = [slot // slots_per_day + 1, slot % slots_per_day + 1, slot,
+                                  start and start.isoformat(timespec='minutes'),
+                                  end and end.isoformat(timespec='minutes')]
+        student = registry.students[defense.student_id]
+        room = registry.rooms[defense.room_id]
+        yield when + [
+            room.name,
+            room.campus,
+            student.id,
+            student.name,
+            student.level,
+            student.field,
+            defense.president_id,
+            professors[defense.president_id].name,
+            defense.examiner_id,
+            professors[defense.examiner_id].name,
+            defense.supervisor_id,
+            professors[defense.supervisor_id].name,
+        ]
+
+
+def write_csv(path: str, defenses: Iterable[Defense], registry: Registry, slots_per_day: int,
+              clock: Optional[Clock] = None) -> None:
+    with open(path, 'w', encoding='utf-8', newline='') as target:
+        writer = csv.writer(target)
+        writer.writerow(columns)
+        writer.writerows(records(defenses, registry, slots_per_day, clock))  # None s'écrit vide
+
+
+def write_jsonl(path: str, defenses: Iterable[Defense], registry: Registry, slots_per_day: int,
+                clock: Optional[Clock] = None) -> None:
+    with open(path, 'w', encoding='utf-8') as target:
+        for record in records(defenses, registry, slots_per_day, clock):
+            target.write(json.dumps(dict(zip(columns, record)), ensure_ascii=False))
+            target.write('\n')
+
+
+def write_xlsx(path: str, defenses: Iterable[Defense], registry: Registry, slots_per_day: int,
+               clock: Optional[Clock] = None) -> None:
+    try:
+        from openpyxl import Workbook
+    except ImportError as exc:
+        raise ImportError("L'export Excel nécessite openpyxl : pip install openpyxl") from exc
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Planning')
+    sheet.append(columns)
+    for record in records(defenses, registry, slots_per_day, clock):
+        sheet.append(record)
+    workbook.save(path)
+
+
+def _escape(text: str) -> str:
+    # Texte d'une propriété iCalendar (RFC 5545, 3.3.11)
+    return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _fold(line: str) -> str:
+    # Lignes de 75 octets au plus, suites précédées d'une espace (RFC 5545, 3.1), sans couper un caractère
+    if len(line) <= 18 or len(line.encode('utf-8')) <= 75:  # 4 octets au plus par caractère
+        return line
+    parts, current, size = [], '', 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        if size + width > 75:
+            parts.append(current)
+            current, size = ' ', 1
+        current += char
+        size += width
+    parts.append(current)
+    return '\r\n'.join(parts)
+
+
+def _ical_time(moment: datetime) -> str:
+    return moment.strftime('%Y%m%dT%H%M%S')
+
+
+def write_icalendar(path: str, defenses: Iterable[Defense], registry: Registry, slots_per_day: int,
+                    clock: Optional[Clock] = None) -> None:
+    """Un agenda par enseignant du jury : `<chemin sans extension>-<identifiant>.ics`."""
+    if clock is None:
+        raise ValueError("les agendas iCalendar demandent la date du premier jour (--start-date)")
+    stem, extension = os.path.splitext(path)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    roles = (('president_id', 'président'), ('examiner_id', 'examinateur'), ('supervisor_id', 'encadreur'))
+    events: Dict[int, List[str]] = {}
+    stamp = _ical_time(datetime.now(timezone.utc)) + 'Z'
+    for defense in _ordered(defenses):
+        student = registry.students[defense.student_id]
+        room = registry.rooms[defense.room_id]
+        start, end = clock.bounds(defense.time_slot, slots_per_day)
+        for attribute, role in roles:
+            prof_id = getattr(defense, attribute)
+            events.setdefault(prof_id, []).extend([
+                'BEGIN:VEVENT',
+                f"UID:soutenance-{defense.student_id}-{prof_id}@optiplan",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART:{_ical_time(start)}",
+                f"DTEND:{_ical_time(end)}",
+                f"SUMMARY:{_escape(f'Soutenance de {student.name} ({role})')}",
+                f"LOCATION:{_escape(room.name)}",
+                f"DESCRIPTION:{_escape(f'{student.level} {student.field}')}",
+                'END:VEVENT',
+            ])
+    for prof_id, lines in events.items():
+        with open(f"{stem}-{prof_id}{extension}", 'w', encoding='utf-8', newline='') as target:
+            name = _escape(registry.professors[prof_id].name)
+            calendar = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//optiplan//soutenances//FR',
+                        f"X-WR-CALNAME:Soutenances - {name}", *lines, 'END:VCALENDAR']
+            target.write(''.join(_fold(line) + '\r\n' for line in calendar))
+
+
+# Extension -> écriture d'un export
+exporters: Dict[str, Callable[..., None]] = {
+    '.csv': write_csv,
+    '.jsonl': write_jsonl,
+    '.xlsx': write_xlsx,
+    '.ics': write_icalendar,
+}
+
+
+def write_all(jobs: Sequence[Tuple[str, Callable[[], None]]], workers: Optional[int] = None) -> Iterator[str]:
+    """Exécute les écritures `(chemin, fonction)` dans un pool de threads ; chemins dans l'ordre d'achèvement."""
+    if len(jobs) <= 1:
+        for path, write in jobs:
+            write()
+            yield path
+        return
+    with ThreadPoolExecutor(max_workers=workers or len(jobs)) as executor:
+        futures = {executor.submit(write): path for path, write in jobs}
+        for future in as_completed(futures):
+            future.result()
+            yield futures[future]
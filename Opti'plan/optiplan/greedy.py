@@ -0,0 +1,435 @@
+"""Heuristiques gloutonnes de planification.
+
+- `schedule_student_major` : étudiant par étudiant, premier créneau réalisable (source.py) ;
+- `schedule_slot_major` : créneau par créneau et salle par salle, avec règles de grade
+  du président puis passe de rattrapage à examinateur non spécialiste (test2.py) ;
+- `schedule_slot_matching` : mêmes règles et mêmes deux passes, mais chaque créneau est
+  rempli d'un bloc par couplage des rôles du jury (`matching.SlotMatching`).
+
+Sélection des jurys (`selection`) : 'rank' prend le premier candidat libre dans
+l'ordre des grades (président) ou de la liste des enseignants (examinateur) ;
+'balanced' prend le candidat libre le moins chargé sur la session, à égalité
+le plus gradé (`availability.BalancedQueues`, O(log n) amorti par choix), ce
+qui répartit les jurys au lieu de saturer les premiers MC jusqu'au plafond
+journalier. Pour `schedule_slot_matching`, 'balanced' classe les candidats
+par charge sur la session plutôt que par charge du jour.
+
+Les règles de composition du jury (grade du président, examinateur
+spécialiste…) viennent de `index.rules` (`optiplan.constraints`) : chaque
+étudiant est ramené une fois à ses groupes de présidents et d'examinateurs
+possibles, partagés par les étudiants de même profil, et la passe de
+rattrapage prend les groupes de `rules.fallback`, sans les règles
+`relaxable`.
+
+Sans `rng`, les heuristiques sont déterministes. Avec un `random.Random`,
+l'ordre des étudiants à égalité est tiré au hasard et le président et
+l'examinateur sont choisis parmi les `choice_width` premiers candidats libres
+(utilisé par le mode multi-départs).
+
+Avec un profileur actif (`optiplan.profiling`), chaque pré-calcul et chaque
+passe est chronométré, et les candidats examinés ainsi que les rejets par
+cause (`supervisor_unavailable`, `supervisor_daily_cap`, `no_president`,
+`no_examiner`, `no_room`) sont comptés.
+"""
+import random
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import profiling
+from .availability import AvailabilityIndex, BalancedQueues, CandidateQueues, RoomSchedule
+from .constraints import RuleSet
+from .matching import SlotMatching
+from .models import Defense, Professor, Room, Student, rank_values
+from .registry import by_id
+from .specialties import SpecialtyIndex
+
+selections = ('rank', 'balanced')
+
+
+def build_schedule_state(professors: List[Professor], rooms: List[Room], num_days: int, slots_per_day: int,
+                         defenses: Sequence[Defense] = (), relaxed: Iterable[str] = (),
+                         closed_rooms: Optional[Dict[int, Iterable[int]]] = None
+                         ) -> Tuple[AvailabilityIndex, RoomSchedule]:
+    """Index des occupations et `room_schedule`, vides ou reconstruits à partir de `defenses`.
+
+    `relaxed` : règles du registre `constraints.rules` à ne pas appliquer ; `closed_rooms` : créneaux fermés
+    par salle (salles absentes de `rooms` ignorées).
+    """
+    index = AvailabilityIndex(professors, rooms, num_days, slots_per_day, rules=RuleSet(professors, relaxed))
+    for room_id, slots in (closed_rooms or {}).items():
+        if room_id in index.room_row:
+            slots = [slot for slot in slots if 0 <= slot < index.total_slots]
+            index.room_open[index.room_row[room_id], slots] = False
+    room_schedule = RoomSchedule(rooms, index.total_slots)
+    for defense in defenses:
+        room_schedule.place(defense)
+        index.commit(defense)
+    return index, room_schedule
+
+
+def order_students(students: List[Student], specialties: SpecialtyIndex,
+                   rng: Optional[random.Random] = None) -> List[Student]:
+    # Priorité aux étudiants avec moins d'examinateurs possibles ; égalités tirées au hasard si rng
+    if rng is None:
+        return sorted(students, key=specialties.examiner_count)
+    return sorted(students, key=lambda x: (specialties.examiner_count(x), rng.random()))
+
+
+def jury_groups(rules: RuleSet, students: List[Student],
+                professors_by_id: Dict[int, Professor]) -> Dict[int, Tuple[tuple, tuple, tuple]]:
+    """Groupes de présidents, d'examinateurs et d'examinateurs de rattrapage de chaque étudiant à encadreur connu."""
+    fallback = rules.fallback
+    juries = {}
+    for student in students:
+        supervisor = professors_by_id.get(student.supervisor_id)
+        if supervisor is not None:
+            juries[student.id] = (rules.group('president', student, supervisor),
+                                  rules.group('examiner', student, supervisor),
+                                  fallback.group('examiner', student, supervisor))
+    return juries
+
+
+def _group_rows(rules: RuleSet, groups: Iterable[tuple], order: np.ndarray) -> Dict[tuple, np.ndarray]:
+    # Lignes de chaque groupe dans l'ordre de préférence `order` (l'encadreur est exclu au choix)
+    return {group: rules.rows(group, order) for group in groups}
+
+
+def _queues(index: AvailabilityIndex, groups: Dict, selection: str):
+    if selection not in selections:
+        raise ValueError(f"sélection inconnue : {selection} ({', '.join(selections)})")
+    return BalancedQueues(index, groups) if selection == 'balanced' else CandidateQueues(index, groups)
+
+
+def _pick(index: AvailabilityIndex, rows: np.ndarray, slot: int, exclude: Tuple[int, ...],
+          rng: Optional[random.Random], choice_width: int) -> Optional[int]:
+    if rng is None or choice_width <= 1:
+        return index.first_free(rows, slot, exclude)
+    free = index.free_among(rows, slot, exclude)
+    if not free.size:
+        return None
+    return int(free[rng.randrange(min(choice_width, free.size))])
+
+
+def _pick_queued(queues: CandidateQueues, key, slot: int, exclude: Tuple[int, ...],
+                 rng: Optional[random.Random], choice_width: int) -> Optional[int]:
+    if rng is None or choice_width <= 1:
+        return queues.first_free(key, slot, exclude)
+    free = queues.free(key, slot, exclude, limit=choice_width)
+    if not free:
+        return None
+    return free[rng.randrange(len(free))]
+
+
+def _commit(defense: Defense, defenses: List[Defense], index: AvailabilityIndex,
+            room_schedule: RoomSchedule) -> None:
+    defenses.append(defense)
+    room_schedule.place(defense)
+    index.commit(defense)
+
+
+def schedule_student_major(professors: List[Professor], students: List[Student], rooms: List[Room],
+                           index: AvailabilityIndex, room_schedule: RoomSchedule,
+                           rng: Optional[random.Random] = None, choice_width: int = 1,
+                           selection: str = 'rank') -> List[Defense]:
+    profiler = profiling.active
+    counting = profiler.enabled
+    professors_by_id = by_id(professors)
+    rules = index.rules
+    with profiler.phase('student_major.presidents'):
+        professors_sorted = sorted(professors, key=lambda x: rank_values[x.rank], reverse=True)
+        president_order = index.rows(prof.id for prof in professors_sorted)
+        juries = jury_groups(rules, students, professors_by_id)
+        presidents = _queues(index, _group_rows(rules, {jury[0] for jury in juries.values()}, president_order),
+                             selection)
+    with profiler.phase('student_major.examiner_options'):
+        specialties = SpecialtyIndex(professors)
+        examiner_groups = {jury[1] for jury in juries.values()}
+        if selection == 'balanced':
+            examiners = BalancedQueues(index, _group_rows(rules, examiner_groups, president_order))
+        else:
+            examiners = None
+            examiner_rows = _group_rows(rules, examiner_groups, index.rows(prof.id for prof in professors))
+    with profiler.phase('student_major.order_students'):
+        students_sorted = order_students(students, specialties, rng)
+
+    defenses: List[Defense] = []
+    with profiler.phase('student_major.slot_loop'):
+        for student in students_sorted:
+            supervisor = professors_by_id.get(student.supervisor_id)
+            if supervisor is None:
+                continue
+            president_group, examiner_group, _ = juries[student.id]
+
+            examined = 0
+            for slot in range(index.total_slots):
+                examined += 1
+                # Vérifier que le superviseur est libre et n'a pas plus de 4 soutenances ce jour-là
+                if not index.is_free(supervisor.id, slot):
+                    if counting:
+                        profiler.count(f"student_major.rejected.supervisor_{index.busy_cause(supervisor.id, slot)}")
+                    continue
+
+                president_id = _pick_queued(presidents, president_group, slot, (supervisor.id,), rng, choice_width)
+                if president_id is None:
+                    if counting:
+                        profiler.count('student_major.rejected.no_president')
+                    continue
+
+                if examiners is None:
+                    examiner_id = _pick(index, examiner_rows[examiner_group], slot, (supervisor.id, president_id),
+                                        rng, choice_width)
+                else:
+                    examiner_id = _pick_queued(examiners, examiner_group, slot, (supervisor.id, president_id), rng,
+                                               choice_width)
+                if examiner_id is None:
+                    if counting:
+                        profiler.count('student_major.rejected.no_examiner')
+                    continue
+
+                room_id = index.first_free_room(slot, index.campus_rows(student.campus))
+                if room_id is None:
+                    if counting:
+                        profiler.count('student_major.rejected.no_room')
+                    continue
+
+                _commit(Defense(student.id, slot, room_id, president_id, examiner_id, supervisor.id),
+                        defenses, index, room_schedule)
+                break
+            if counting:
+                profiler.observe('student_major.candidates_per_student', examined)
+    return defenses
+
+
+def schedule_slot_major(professors: List[Professor], students: List[Student], rooms: List[Room],
+                        index: AvailabilityIndex, room_schedule: RoomSchedule,
+                        rng: Optional[random.Random] = None, choice_width: int = 1,
+                        selection: str = 'rank') -> List[Defense]:
+    profiler = profiling.active
+    counting = profiler.enabled
+    professors_by_id = by_id(professors)
+    rules = index.rules
+
+    # Présidents possibles par profil (grade minimal requis, président d'un autre grade que 'Professeur')
+    with profiler.phase('slot_major.presidents'):
+        professors_sorted = sorted(professors, key=lambda x: rank_values[x.rank], reverse=True)
+        president_order = index.rows(prof.id for prof in professors_sorted)
+        juries = jury_groups(rules, students, professors_by_id)
+        presidents = _queues(index, _group_rows(rules, {jury[0] for jury in juries.values()}, president_order),
+                             selection)
+    with profiler.phase('slot_major.examiner_options'):
+        specialties = SpecialtyIndex(professors)
+    with profiler.phase('slot_major.examiner_rows'):
+        # Examinateurs de la passe principale (spécialistes) et du rattrapage
+        examiner_groups = {group for jury in juries.values() for group in jury[1:]}
+        if selection == 'balanced':
+            examiners = BalancedQueues(index, _group_rows(rules, examiner_groups, president_order))
+        else:
+            examiners = None
+            examiner_rows = _group_rows(rules, examiner_groups, index.rows(prof.id for prof in professors))
+    with profiler.phase('slot_major.order_students'):
+        students_sorted = order_students(students, specialties, rng)
+
+    defenses: List[Defense] = []
+    scheduled_students = set()
+    multi_campus = index.campus_room_rows is not None  # Chaque étudiant dans une salle de son campus
+    candidates = Counter()  # Tentatives par étudiant, avec un profileur actif
+
+    def try_schedule(student, slot, room, specialist_only):
+        if student.id in scheduled_students:
+            return False  # Étudiant déjà programmé
+
+        supervisor = professors_by_id.get(student.supervisor_id)
+        if supervisor is None or (multi_campus and room.campus != student.campus):
+            return False
+        president_group, examiner_group, fallback_group = juries[student.id]
+
+        stage = 'slot_loop' if specialist_only else 'fallback_pass'
+        if counting:
+            candidates[student.id] += 1
+
+        # Encadreur disponible, libre et sous le plafond de 4 soutenances par jour
+        if not index.is_free(supervisor.id, slot):
+            if counting:
+                profiler.count(f"slot_major.{stage}.rejected.supervisor_{index.busy_cause(supervisor.id, slot)}")
+            return False
+
+        president_id = _pick_queued(presidents, president_group, slot, (supervisor.id,), rng, choice_width)
+        if president_id is None:
+            if counting:
+                profiler.count(f"slot_major.{stage}.rejected.no_president")
+            return False  # Le plus gradé disponible, sinon aucun
+
+        # Examinateur spécialiste du domaine, ou n'importe quel enseignant pendant le rattrapage
+        group = examiner_group if specialist_only else fallback_group
+        if examiners is None:
+            examiner_id = _pick(index, examiner_rows[group], slot, (supervisor.id, president_id), rng, choice_width)
+        else:
+            examiner_id = _pick_queued(examiners, group, slot, (supervisor.id, president_id), rng, choice_width)
+        if examiner_id is None:
+            if counting:
+                profiler.count(f"slot_major.{stage}.rejected.no_examiner")
+            return False
+
+        _commit(Defense(
+            student_id=student.id,
+            time_slot=slot,
+            room_id=room.id,
+            president_id=president_id,
+            examiner_id=examiner_id,
+            supervisor_id=supervisor.id
+        ), defenses, index, room_schedule)
+        scheduled_students.add(student.id)
+        return True
+
+    # Passe principale : la recherche reprend après le dernier étudiant programmé
+    student_index = 0
+    with profiler.phase('slot_major.slot_loop'):
+        for slot in range(index.total_slots):
+            for room in rooms:
+                if not index.is_room_free(room.id, slot):
+                    continue  # Créneau déjà utilisé ou salle fermée
+                for i in range(len(students_sorted)):
+                    if try_schedule(students_sorted[(student_index + i) % len(students_sorted)], slot, room, True):
+                        student_index = (student_index + 1) % len(students_sorted)
+                        break  # Passer au créneau suivant après avoir planifié une soutenance
+
+    # Rattrapage sur les créneaux encore libres, examinateur même non spécialiste
+    with profiler.phase('slot_major.unused_slots'):
+        unused_slots = sorted({slot for slot in range(index.total_slots) for room in rooms
+                               if index.is_room_free(room.id, slot)})
+    with profiler.phase('slot_major.fallback_pass'):
+        for slot in unused_slots:
+            for room in rooms:
+                if not index.is_room_free(room.id, slot):
+                    continue
+                for student in students_sorted:
+                    if try_schedule(student, slot, room, False):
+                        break
+    if counting:
+        for student in students_sorted:
+            profiler.observe('slot_major.candidates_per_student', candidates[student.id])
+    return defenses
+
+
+def _least_loaded(rows: np.ndarray, load: np.ndarray, rank_order: Optional[np.ndarray] = None) -> List[int]:
+    # Moins chargés d'abord (charge du jour ou de la session), puis (pour les présidents) par grade décroissant
+    keys = (load[rows],) if rank_order is None else (load[rows], rank_order[rows])
+    return rows[np.lexsort(keys)].tolist()
+
+
+def _shuffled_head(candidates: List[int], rng: Optional[random.Random], choice_width: int) -> List[int]:
+    if rng is not None and choice_width > 1:
+        head = candidates[:choice_width]
+        rng.shuffle(head)
+        candidates[:choice_width] = head
+    return candidates
+
+
+def schedule_slot_matching(professors: List[Professor], students: List[Student], rooms: List[Room],
+                           index: AvailabilityIndex, room_schedule: RoomSchedule,
+                           rng: Optional[random.Random] = None, choice_width: int = 1,
+                           selection: str = 'rank', patience: int = 100) -> List[Defense]:
+    """Remplit chaque créneau par couplage ; `patience` échecs consécutifs closent le créneau.
+
+    Avec `rng`, les `choice_width` premiers candidats de chaque liste de préférence sont mélangés à chaque
+    créneau : le couplage prend le premier candidat sans rôle, donc l'un d'eux au hasard.
+    """
+    if selection not in selections:
+        raise ValueError(f"sélection inconnue : {selection} ({', '.join(selections)})")
+    profiler = profiling.active
+    professors_by_id = by_id(professors)
+    rules = index.rules
+    with profiler.phase('slot_matching.presidents'):
+        professors_sorted = sorted(professors, key=lambda x: rank_values[x.rank], reverse=True)
+        juries = jury_groups(rules, students, professors_by_id)
+        president_rows = _group_rows(rules, {jury[0] for jury in juries.values()},
+                                     index.rows(prof.id for prof in professors_sorted))
+    with profiler.phase('slot_matching.examiner_options'):
+        specialties = SpecialtyIndex(professors)
+        # Examinateurs (spécialistes, puis ceux du rattrapage) ; l'encadreur est exclu au moment du couplage
+        all_rows = index.rows(prof.id for prof in professors)
+        examiner_rows = [_group_rows(rules, {jury[1] for jury in juries.values()}, all_rows),
+                         _group_rows(rules, {jury[2] for jury in juries.values()}, all_rows)]
+    rank_order = np.array([-rank_values[prof.rank] for prof in professors])
+    with profiler.phase('slot_matching.order_students'):
+        pending = [student for student in order_students(students, specialties, rng)
+                   if student.supervisor_id in professors_by_id]
+
+    defenses: List[Defense] = []
+    for specialist_only in (True, False):
+        stage = 'slot_loop' if specialist_only else 'fallback_pass'
+        stage_rows = examiner_rows[not specialist_only]
+        with profiler.phase(f"slot_matching.{stage}"):
+            for slot in range(index.total_slots):
+                free_rooms = index.free_rooms(slot).tolist()
+                if not pending or not free_rooms:
+                    continue
+                # Salles libres par campus, attribuées dans l'ordre d'acceptation des étudiants
+                campus_free = {None: list(free_rooms)}
+                if index.campus_room_rows is not None:
+                    campus_free = {campus: index.room_ids[rows[index.room_open[rows, slot]
+                                                               & ~index.room_busy[rows, slot]]].tolist()
+                                   for campus, rows in index.campus_room_rows.items()}
+                free = index.free_mask(slot)
+                free_count = int(free.sum())
+                load = index.load if selection == 'balanced' else index.day_count[:, slot // index.slots_per_day]
+                presidents = {key: _shuffled_head(_least_loaded(rows[free[rows]], load, rank_order), rng,
+                                                  choice_width)
+                              for key, rows in president_rows.items()}
+                examiners = {group: _shuffled_head(_least_loaded(rows[free[rows]], load), rng, choice_width)
+                             for group, rows in stage_rows.items()}
+
+                matching = SlotMatching()
+                accepted = []
+                supervising = set()
+                # Un échec est définitif pour le créneau (le couplage ne fait que s'étendre) : les
+                # étudiants de même encadreur et de mêmes groupes de candidats échoueraient de même
+                failed = set()
+                failures = 0
+                for student in pending:
+                    # Trois enseignants sans rôle sont nécessaires pour un jury de plus
+                    if (len(accepted) == len(free_rooms) or failures >= patience
+                            or free_count - len(matching.owner) < 3):
+                        break
+                    campus = None if index.campus_room_rows is None else student.campus
+                    if not campus_free.get(campus):
+                        continue
+                    supervisor = professors_by_id[student.supervisor_id]
+                    supervisor_row = index.prof_row[supervisor.id]
+                    if not free[supervisor_row] or supervisor_row in supervising:
+                        continue
+                    president_group, examiner_group, fallback_group = juries[student.id]
+                    examiner_group = examiner_group if specialist_only else fallback_group
+                    signature = (supervisor_row, president_group, examiner_group)
+                    if signature in failed:
+                        continue
+                    roles = [([supervisor_row], None),
+                             (presidents[president_group], supervisor_row),
+                             (examiners[examiner_group], supervisor_row)]
+                    if matching.add(student.id, roles):
+                        accepted.append((student, campus_free[campus].pop(0)))
+                        supervising.add(supervisor_row)
+                        failures = 0
+                    else:
+                        failed.add(signature)
+                        failures += 1
+                        profiler.count(f"slot_matching.{stage}.rejected")
+
+                for student, room_id in accepted:
+                    supervisor_row, president_row, examiner_row = matching.jury(student.id)
+                    _commit(Defense(student.id, slot, room_id, int(index.prof_ids[president_row]),
+                                    int(index.prof_ids[examiner_row]), int(index.prof_ids[supervisor_row])),
+                            defenses, index, room_schedule)
+                if accepted:
+                    placed = {student.id for student, _ in accepted}
+                    pending = [student for student in pending if student.id not in placed]
+    return defenses
+
+
+engines = {
+    'student_major': schedule_student_major,
+    'slot_major': schedule_slot_major,
+    'slot_matching': schedule_slot_matching,
+}
@@ -0,0 +1,193 @@
+"""Chargement des enseignants et des étudiants depuis les fichiers Excel.
+
+Seules les colonnes utiles sont lues et les objets sont construits colonne
+par colonne, sans `iterrows()`. Le moteur `calamine` est utilisé s'il est
+installé (`pip install python-calamine`), sinon openpyxl.
+
+Le résultat est mis en cache dans un instantané JSON, colonne par colonne,
+associé à la date de modification, à la taille et à l'empreinte SHA-256 du
+fichier : tant que `enseignants.xlsx` / `students_data.xlsx` ne changent pas,
+les exécutions suivantes rechargent l'instantané sans pandas (une soixantaine
+de millisecondes pour 20 000 étudiants). pandas n'est importé que si un
+fichier doit réellement être lu. Les instantanés sont rangés dans le cache de
+l'utilisateur (`$XDG_CACHE_HOME/optiplan`, `~/.cache/optiplan` par défaut, ou
+`cache_dir`), pas à côté des fichiers lus, et ne contiennent que des
+données : les lire n'exécute jamais de code.
+
+La colonne `Campus` des étudiants est facultative (un seul campus si elle est
+absente). Le calendrier et les salles de chaque campus se décrivent dans un
+fichier JSON lu par `load_session` :
+
+    {"num_days": 5, "slots_per_day": 8,
+     "campuses": {"FSA": ["Batiment ISA/FSA", "Batiment RESBIO/FSA"], "EPAC": ["Amphi 1"]}}
+"""
+import hashlib
+import importlib.util
+import json
+import os
+from dataclasses import fields
+from typing import TYPE_CHECKING, Callable, List, Optional, Sequence
+
+from . import profiling
+from .models import Professor, Session, Student, grade_mapping
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+professor_columns = ['Numéro', 'Nom', 'Prénoms', 'Grade', 'Disponibilité', 'Speciality']
+student_columns = ['Numéro', 'Nom', 'Cycle', 'Filière', 'MM']
+student_optional_columns = ['Campus']
+
+_snapshot_version = 5
+
+
+def read_excel(path: str, columns: List[str], optional: Sequence[str] = ()) -> 'pd.DataFrame':
+    import pandas as pd
+
+    engine = 'calamine' if importlib.util.find_spec('python_calamine') else None
+    with profiling.active.phase('load.read_excel'):
+        if not optional:
+            return pd.read_excel(path, usecols=columns, engine=engine)
+        wanted = set(columns) | set(optional)
+        df = pd.read_excel(path, usecols=lambda column: column in wanted, engine=engine)
+    missing = [column for column in columns if column not in df.columns]
+    if missing:
+        raise ValueError(f"{path} : colonne(s) manquante(s) {', '.join(missing)}")
+    return df
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_cache_dir() -> str:
+    """Répertoire des instantanés de l'utilisateur courant."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'optiplan')
+
+
+def _snapshot_path(cache_dir: str, path: str, kind: str) -> str:
+    # Chemin absolu condensé : deux fichiers homonymes de dossiers différents ne partagent pas d'instantané
+    source = os.path.abspath(path)
+    key = hashlib.sha256(source.encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.basename(source)}.{key}.{kind}.json")
+
+
+def _columns(data: list, cls: type) -> list:
+    return [[getattr(item, column.name) for item in data] for column in fields(cls)] if data else []
+
+
+def _read_snapshot(snapshot_path: str, params: list, cls: type) -> Optional[dict]:
+    try:
+        with open(snapshot_path, encoding='utf-8') as source:
+            snapshot = json.load(source)
+        if snapshot['version'] != _snapshot_version or snapshot['params'] != params:
+            return None
+        columns = snapshot['columns']
+        # Chaînes répétées (grade, filière, campus) partagées comme à la lecture du fichier
+        columns = [_shared(column) if column and isinstance(column[0], str) else column for column in columns]
+        snapshot['data'] = list(map(cls, *columns)) if columns else []
+        return snapshot
+    except (OSError, ValueError, KeyError, TypeError):
+        # Instantané absent, tronqué ou d'un autre format : reconstruit
+        return None
+
+
+def _cached(path: str, kind: str, params: list, cls: type, build: Callable[[], list], cache: bool,
+            cache_dir: Optional[str]) -> list:
+    if not cache:
+        return build()
+    profiler = profiling.active
+
+    cache_dir = cache_dir or default_cache_dir()
+    snapshot_path = _snapshot_path(cache_dir, path, kind)
+    stat = os.stat(path)
+    snapshot = _read_snapshot(snapshot_path, params, cls)
+
+    if snapshot is not None and (snapshot['mtime_ns'], snapshot['size']) == (stat.st_mtime_ns, stat.st_size):
+        profiler.count(f"load.{kind}.snapshot_hits")
+        return snapshot['data']
+
+    # Date ou taille modifiée : l'empreinte tranche (fichier simplement touché ou réellement modifié)
+    with profiler.phase('load.sha256'):
+        digest = _file_digest(path)
+    if snapshot is not None and snapshot['sha256'] == digest:
+        profiler.count(f"load.{kind}.snapshot_hits")
+        data = snapshot['data']
+    else:
+        data = build()
+
+    temporary_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        with open(temporary_path, 'w', encoding='utf-8') as target:
+            json.dump({'version': _snapshot_version, 'params': params, 'mtime_ns': stat.st_mtime_ns,
+                       'size': stat.st_size, 'sha256': digest, 'columns': _columns(data, cls)}, target,
+                      ensure_ascii=False, separators=(',', ':'))
+        os.replace(temporary_path, snapshot_path)
+    except OSError:
+        # Cache non inscriptible : les données lues restent valables, seul l'instantané manque
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    return data
+
+
+def _shared(values: list) -> list:
+    # Un seul objet par valeur distincte (grade, filière, campus) au lieu d'une chaîne par cellule lue
+    pool = {}
+    return [pool.setdefault(value, value) for value in values]
+
+
+def professors_from_frame(df: 'pd.DataFrame', num_days: int, slots_per_day: int) -> List[Professor]:
+    from .parsing import availability_slots, parse_availability
+
+    profiler = profiling.active
+    with profiler.phase('load.professors.names'):
+        names = (df['Nom'].astype(str) + ' ' + df['Prénoms'].astype(str)).tolist()
+    # Par défaut, considérer comme 'Professeur' si le grade n'est pas reconnu
+    with profiler.phase('load.professors.ranks'):
+        ranks = df['Grade'].map(grade_mapping).fillna('Professeur').tolist()
+    with profiler.phase('load.professors.availability'):
+        availability = availability_slots(parse_availability(df['Disponibilité'], num_days, slots_per_day))
+    with profiler.phase('load.professors.specialties'):
+        # Cellule vide : aucune spécialité (et non la spécialité 'nan')
+        pool = {}
+        specialties = [[pool.setdefault(s.strip(), s.strip()) for s in cell if s.strip()]
+                       for cell in df['Speciality'].fillna('').astype(str).str.split(',')]
+    with profiler.phase('load.professors.objects'):
+        return list(map(Professor, df['Numéro'].tolist(), names, ranks, specialties, availability))
+
+
+def students_from_frame(df: 'pd.DataFrame') -> List[Student]:
+    with profiling.active.phase('load.students.objects'):
+        columns = [df['Numéro'].tolist(), df['Nom'].tolist(), _shared(df['Cycle'].tolist()),
+                   _shared(df['Filière'].tolist()), df['MM'].tolist()]
+        if 'Campus' in df.columns:
+            columns.append(_shared(df['Campus'].fillna('').astype(str).str.strip().tolist()))
+        return list(map(Student, *columns))
+
+
+def load_professors(path: str, num_days: int, slots_per_day: int, cache: bool = True,
+                    cache_dir: Optional[str] = None) -> List[Professor]:
+    with profiling.active.phase('load.professors'):
+        return _cached(path, 'professors', [num_days, slots_per_day], Professor,
+                       lambda: professors_from_frame(read_excel(path, professor_columns), num_days, slots_per_day),
+                       cache, cache_dir)
+
+
+def load_students(path: str, cache: bool = True, cache_dir: Optional[str] = None) -> List[Student]:
+    with profiling.active.phase('load.students'):
+        return _cached(path, 'students', [], Student,
+                       lambda: students_from_frame(read_excel(path, student_columns, student_optional_columns)),
+                       cache, cache_dir)
+
+
+def load_session(path: str) -> Session:
+    with open(path, encoding='utf-8') as source:
+        config = json.load(source)
+    return Session(int(config.get('num_days', 5)), int(config.get('slots_per_day', 8)),
+                   {str(campus): [str(name) for name in names] for campus, names in config['campuses'].items()})
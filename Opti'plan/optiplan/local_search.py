@@ -0,0 +1,258 @@
+"""Phase d'amélioration locale après la passe gloutonne.
+
+Pour chaque étudiant non programmé, on tente successivement :
+  - une insertion directe sur un créneau libre ;
+  - une chaîne d'éjection de profondeur 1 : on retire une soutenance qui bloque
+    l'étudiant sur un créneau (salle, encadreur, président ou examinateur),
+    on place l'étudiant à sa place puis on réinsère la soutenance retirée
+    ailleurs ; en cas d'échec tout est annulé.
+Quand plus rien ne progresse, un « kick » déplace une soutenance au hasard
+vers un autre créneau réalisable pour diversifier l'état.
+
+Chaque mouvement est évalué par différence (+1 soutenance ou 0) à partir de
+l'index des occupations, sans recompter le planning. La recherche est bornée
+par un nombre d'itérations et par une durée.
+
+Quand les salles relèvent de plusieurs campus, chaque étudiant n'est placé
+que dans les salles de son campus.
+"""
+import copy
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from . import profiling
+from .availability import AvailabilityIndex, CandidateQueues, RoomSchedule
+from .models import Defense, Professor, Room, Student, rank_values
+from .registry import by_id
+
+
+class LocalSearch:
+    def __init__(self, professors: List[Professor], students: List[Student], rooms: List[Room],
+                 index: AvailabilityIndex, room_schedule: RoomSchedule,
+                 defenses: List[Defense], seed: int = 0, tabu_tenure: int = 10):
+        self.index = index
+        self.room_schedule = room_schedule
+        self.rooms = rooms
+        self.rng = random.Random(seed)
+        self.tabu_tenure = tabu_tenure
+
+        self.professors = by_id(professors)
+        self.students = by_id(students)
+        self.placed: Dict[int, Defense] = {}
+        self.professor_slots: Dict[Tuple[int, int], Defense] = {}
+        for defense in defenses:
+            self._track(defense)
+        self.pending = [student.id for student in students
+                        if student.id not in self.placed and student.supervisor_id in self.professors]
+
+        # Groupes de candidats des règles de `index.rules` : files des présidents par groupe (ordre des grades),
+        # lignes des examinateurs spécialistes par groupe (ordre des enseignants), partagées par les étudiants
+        self.rules = index.rules
+        professors_sorted = sorted(professors, key=lambda x: rank_values[x.rank], reverse=True)
+        self.president_order = index.rows(prof.id for prof in professors_sorted)
+        self.examiner_order = index.rows(prof.id for prof in professors)
+        self.presidents = CandidateQueues(index, {})
+        self.examiner_rows = {}
+        self.juries: Dict[int, Tuple[tuple, tuple]] = {}
+        for student in students:
+            self._add_jury(student)
+        self.tabu: Dict[int, int] = {}
+        self.iteration = 0
+        # Journal des mouvements (('+' | '-', soutenance)), activé par qui veut en déduire un diff
+        self.journal: Optional[List[Tuple[str, Defense]]] = None
+
+    def fork(self, index: AvailabilityIndex, room_schedule: RoomSchedule) -> 'LocalSearch':
+        """Copie de la recherche sur les copies `index` et `room_schedule` de son état.
+
+        Les tables modifiables sont dupliquées (dictionnaires plats), les tables en lecture seule partagées ;
+        seules les files des présidents sont reconstruites, sur les disponibilités de `index`.
+        """
+        clone = copy.copy(self)
+        clone.index = index
+        clone.room_schedule = room_schedule
+        clone.rng = random.Random()
+        clone.rng.setstate(self.rng.getstate())
+        clone.professors = dict(self.professors)
+        clone.students = dict(self.students)
+        clone.placed = dict(self.placed)
+        clone.professor_slots = dict(self.professor_slots)
+        clone.pending = list(self.pending)
+        clone.presidents = CandidateQueues(index, self.presidents.groups)
+        clone.examiner_rows = dict(self.examiner_rows)
+        clone.juries = dict(self.juries)
+        clone.tabu = dict(self.tabu)
+        clone.journal = None
+        return clone
+
+    def add_student(self, student: Student) -> None:
+        self.students[student.id] = student
+        self._add_jury(student)
+        if student.id not in self.placed and student.supervisor_id in self.professors:
+            self.pending.append(student.id)
+
+    def _add_jury(self, student: Student) -> None:
+        supervisor = self.professors.get(student.supervisor_id)
+        if supervisor is None:
+            return
+        president_group = self.rules.group('president', student, supervisor)
+        examiner_group = self.rules.group('examiner', student, supervisor)
+        if president_group not in self.presidents.groups:
+            self.presidents.add(president_group, self.rules.rows(president_group, self.president_order))
+        if examiner_group not in self.examiner_rows:
+            self.examiner_rows[examiner_group] = self.rules.rows(examiner_group, self.examiner_order)
+        self.juries[student.id] = president_group, examiner_group
+
+    def remove(self, student_id: int) -> Defense:
+        """Retire la soutenance de l'étudiant, qui repasse en attente."""
+        defense = self.placed[student_id]
+        self._release(defense)
+        self.pending.append(student_id)
+        return defense
+
+    def repair(self, student_id: int) -> bool:
+        """Insertion directe, sinon chaîne d'éjection ; l'étudiant reste en attente en cas d'échec."""
+        if student_id in self.placed:
+            return True
+        if self.insert(student_id) is not None or self.eject(student_id):
+            if student_id in self.pending:
+                self.pending.remove(student_id)
+            return True
+        if student_id not in self.pending:
+            self.pending.append(student_id)
+        return False
+
+    def place(self, student_id: int, slot: int) -> Optional[Defense]:
+        """Place l'étudiant au créneau si un jury et une salle sont libres ; met l'état à jour."""
+        student = self.students[student_id]
+        supervisor = self.professors[student.supervisor_id]
+        index = self.index
+        if not index.is_free(supervisor.id, slot):
+            return None
+        president_group, examiner_group = self.juries[student_id]
+        president_id = self.presidents.first_free(president_group, slot, exclude=(supervisor.id,))
+        if president_id is None:
+            return None
+        examiner_id = index.first_free(self.examiner_rows[examiner_group], slot,
+                                       exclude=(supervisor.id, president_id))
+        if examiner_id is None:
+            return None
+        # Salles du campus de l'étudiant (mêmes lignes dans l'index et dans `room_schedule`)
+        room_id = index.first_free_room(slot, index.campus_rows(student.campus))
+        if room_id is None:
+            return None
+        defense = Defense(student_id, slot, room_id, president_id, examiner_id, supervisor.id)
+        self._commit(defense)
+        return defense
+
+    def insert(self, student_id: int, exclude_slot: Optional[int] = None) -> Optional[Defense]:
+        for slot in range(self.index.total_slots):
+            if slot != exclude_slot:
+                defense = self.place(student_id, slot)
+                if defense is not None:
+                    return defense
+        return None
+
+    def eject(self, student_id: int) -> bool:
+        """Chaîne d'éjection : libère un créneau pour l'étudiant en déplaçant une soutenance bloquante."""
+        student = self.students[student_id]
+        supervisor_id = student.supervisor_id
+        slots_per_day = self.index.slots_per_day
+        room_rows = self.index.campus_rows(student.campus)
+        slots = [slot for slot in range(self.index.total_slots) if self.index.is_available(supervisor_id, slot)]
+        self.rng.shuffle(slots)
+        for slot in slots:
+            day = slot // slots_per_day
+            blockers = self.room_schedule.occupants(slot, room_rows)
+            # Soutenances du même jour occupant l'encadreur (plafond journalier)
+            blockers += [self.professor_slots.get((supervisor_id, other))
+                         for other in range(day * slots_per_day, (day + 1) * slots_per_day) if other != slot]
+            blockers = [defense for defense in blockers
+                        if defense is not None and self.tabu.get(defense.student_id, -1) < self.iteration]
+            self.rng.shuffle(blockers)
+            for blocker in blockers:
+                self._release(blocker)
+                defense = self.place(student_id, slot)
+                if defense is not None:
+                    moved = self.insert(blocker.student_id, exclude_slot=blocker.time_slot)
+                    if moved is not None:
+                        self.tabu[blocker.student_id] = self.iteration + self.tabu_tenure
+                        return True
+                    self._release(defense)
+                self._commit(blocker)
+        return False
+
+    def kick(self) -> None:
+        """Déplace une soutenance au hasard vers un autre créneau réalisable."""
+        if not self.placed:
+            return
+        defense = self.placed[self.rng.choice(list(self.placed))]
+        self._release(defense)
+        slots = list(range(self.index.total_slots))
+        self.rng.shuffle(slots)
+        for slot in slots:
+            if slot != defense.time_slot and self.place(defense.student_id, slot) is not None:
+                return
+        self._commit(defense)
+
+    def run(self, max_iterations: int = 10000, time_limit: float = 10.0, patience: int = 50) -> List[Defense]:
+        """Arrêt après `max_iterations` itérations de cet appel, `time_limit` secondes ou `patience` kicks sans
+        amélioration.
+
+        `iteration` n'est jamais remis à zéro (il date les tabous) : le budget se compte à partir de sa valeur au
+        début de l'appel, si bien qu'une recherche copiée par `fork()` dispose de tout son budget.
+        """
+        deadline = time.perf_counter() + time_limit
+        stalled = 0
+        kicks = 0
+        moves = Counter()
+        start_iteration = self.iteration
+        while (self.pending and kicks < patience and self.iteration - start_iteration < max_iterations
+               and time.perf_counter() < deadline):
+            self.iteration += 1
+            student_id = self.pending.pop(0)
+            if self.insert(student_id) is not None:
+                moves['insertions'] += 1
+                stalled = 0
+                kicks = 0
+                continue
+            if self.eject(student_id):
+                moves['ejection_chains'] += 1
+                stalled = 0
+                kicks = 0
+                continue
+            self.pending.append(student_id)
+            stalled += 1
+            if stalled >= len(self.pending):
+                self.kick()
+                moves['kicks'] += 1
+                kicks += 1
+                stalled = 0
+
+        profiler = profiling.active
+        profiler.count('local_search.iterations', self.iteration - start_iteration)
+        for move, n in moves.items():
+            profiler.count(f"local_search.{move}", n)
+        return list(self.placed.values())
+
+    def _commit(self, defense: Defense) -> None:
+        if self.journal is not None:
+            self.journal.append(('+', defense))
+        self.index.commit(defense)
+        self.room_schedule.place(defense)
+        self._track(defense)
+
+    def _release(self, defense: Defense) -> None:
+        if self.journal is not None:
+            self.journal.append(('-', defense))
+        self.index.release(defense)
+        self.room_schedule.clear(defense.room_id, defense.time_slot)
+        del self.placed[defense.student_id]
+        for prof_id in (defense.supervisor_id, defense.president_id, defense.examiner_id):
+            del self.professor_slots[prof_id, defense.time_slot]
+
+    def _track(self, defense: Defense) -> None:
+        self.placed[defense.student_id] = defense
+        for prof_id in (defense.supervisor_id, defense.president_id, defense.examiner_id):
+            self.professor_slots[prof_id, defense.time_slot] = defense
@@ -0,0 +1,106 @@
+"""Couplage des jurys d'un créneau par chemins augmentants.
+
+Dans un créneau, chaque enseignant libre tient au plus un rôle. Chaque
+étudiant apporte trois rôles à pourvoir (encadreur, président, examinateur),
+chacun relié aux enseignants qui peuvent le tenir : c'est un graphe biparti
+rôles / enseignants. Un étudiant est ajouté si ses trois rôles peuvent être
+couverts en même temps, quitte à réaffecter les jurys déjà formés le long
+de chemins augmentants (algorithme de Kuhn, à la base de Hopcroft–Karp) ;
+sinon ses modifications sont annulées et le couplage reste celui d'avant.
+
+Le choix simultané des étudiants et des jurys est un problème de couplage
+tridimensionnel (NP-difficile) : les étudiants sont donc ajoutés un à un par
+ordre de priorité, chaque ajout étant polynomial.
+"""
+from typing import Dict, Hashable, Iterator, List, Optional, Sequence, Set, Tuple
+
+Node = Tuple[Hashable, int]  # (étudiant, rôle)
+Role = Tuple[List[int], Optional[int]]  # (candidats par ordre de préférence, candidat exclu)
+
+
+class SlotMatching:
+    def __init__(self):
+        self.owner: Dict[int, Node] = {}  # enseignant -> rôle tenu
+        self.assigned: Dict[Node, int] = {}  # rôle -> enseignant
+        self.roles: Dict[Node, Role] = {}
+        # Par liste de candidats : tous ceux qui précèdent cette position tiennent déjà un rôle
+        self._first_unowned: Dict[int, int] = {}
+        self._journal: List[Tuple[int, Optional[Node], Node, Optional[int]]] = []
+
+    def add(self, key: Hashable, roles: Sequence[Role]) -> bool:
+        """Pourvoit tous les rôles de `key`, ou n'en pourvoit aucun."""
+        self._journal = []
+        nodes = [(key, role) for role in range(len(roles))]
+        for node, role in zip(nodes, roles):
+            self.roles[node] = role
+        for node in nodes:
+            if not self._augment(node):
+                self._rollback(nodes)
+                return False
+        return True
+
+    def jury(self, key: Hashable, num_roles: int = 3) -> List[int]:
+        return [self.assigned[key, role] for role in range(num_roles)]
+
+    def _unowned(self, node: Node) -> Optional[int]:
+        """Premier candidat du rôle (ordre de préférence) qui ne tient encore aucun rôle."""
+        candidates, excluded = self.roles[node]
+        position = self._first_unowned.get(id(candidates), 0)
+        while position < len(candidates) and candidates[position] in self.owner:
+            position += 1
+        self._first_unowned[id(candidates)] = position
+        for prof in candidates[position:]:
+            if prof not in self.owner and prof != excluded:
+                return prof
+        return None
+
+    def _owned(self, node: Node, visited: Set[int]) -> Iterator[int]:
+        candidates, excluded = self.roles[node]
+        return (prof for prof in candidates if prof in self.owner and prof not in visited and prof != excluded)
+
+    def _augment(self, start: Node) -> bool:
+        # Recherche en profondeur itérative d'un chemin alterné vers un enseignant sans rôle ; à chaque
+        # rôle, un candidat libre est pris directement avant de déplacer le titulaire d'un autre rôle
+        visited: Set[int] = set()
+        stack: List[Tuple[Node, Optional[Iterator[int]]]] = [(start, None)]
+        chosen: List[int] = []
+        while stack:
+            node, candidates = stack[-1]
+            if candidates is None:
+                prof = self._unowned(node)
+                if prof is not None:
+                    for (path_node, _), path_prof in zip(stack, chosen + [prof]):
+                        self._assign(path_node, path_prof)
+                    return True
+                candidates = self._owned(node, visited)
+                stack[-1] = (node, candidates)
+            prof = next(candidates, None)
+            if prof is None:
+                stack.pop()
+                if chosen:
+                    chosen.pop()
+                continue
+            visited.add(prof)
+            chosen.append(prof)
+            stack.append((self.owner[prof], None))
+        return False
+
+    def _assign(self, node: Node, prof: int) -> None:
+        self._journal.append((prof, self.owner.get(prof), node, self.assigned.get(node)))
+        self.owner[prof] = node
+        self.assigned[node] = prof
+
+    def _rollback(self, nodes: List[Node]) -> None:
+        for prof, previous_owner, node, previous_prof in reversed(self._journal):
+            if previous_prof is None:
+                del self.assigned[node]
+            else:
+                self.assigned[node] = previous_prof
+            if previous_owner is None:
+                del self.owner[prof]
+            else:
+                self.owner[prof] = previous_owner
+        self._journal = []
+        self._first_unowned.clear()  # Des enseignants ont pu perdre leur rôle et les listes retirées disparaître
+        for node in nodes:
+            del self.roles[node]
@@ -0,0 +1,77 @@
+"""Objets du domaine.
+
+Classes de données à `__slots__` : sans dictionnaire par instance, une
+cohorte de plusieurs dizaines de milliers d'étudiants et de soutenances reste
+compacte en mémoire. Les occupations elles-mêmes sont tenues dans des
+matrices NumPy (`availability.AvailabilityIndex`, `availability.RoomSchedule`).
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+@dataclass(slots=True)
+class Professor:
+    id: int
+    name: str
+    rank: str  # 'MC', 'Docteur', 'Professeur'
+    specialties: List[str]
+    availability: List[int]  # Liste des créneaux disponibles
+
+
+@dataclass(slots=True)
+class Student:
+    id: int
+    name: str
+    level: str  # 'Licence' ou 'Master'
+    field: str
+    supervisor_id: int
+    campus: str = ''  # Faculté / site de la session (un seul campus par défaut)
+
+
+@dataclass(slots=True)
+class Room:
+    id: int
+    name: str
+    campus: str = ''  # Les soutenances d'un campus n'ont lieu que dans ses salles
+
+
+@dataclass(slots=True)
+class Session:
+    """Calendrier et salles d'une session ; `campuses` associe à chaque campus ses noms de salles."""
+    num_days: int = 5
+    slots_per_day: int = 8
+    campuses: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def total_slots(self) -> int:
+        return self.num_days * self.slots_per_day
+
+    def rooms(self) -> List[Room]:
+        # Identifiants consécutifs à partir de 1, campus par campus
+        names = [(campus, name) for campus, names in self.campuses.items() for name in names]
+        return [Room(i + 1, name, campus) for i, (campus, name) in enumerate(names)]
+
+
+@dataclass(slots=True)
+class Defense:
+    student_id: int
+    time_slot: int
+    room_id: int
+    president_id: int
+    examiner_id: int
+    supervisor_id: int
+
+
+# Définition des grades et mapping
+grade_mapping = {
+    'Docteur': 'Docteur',
+    'Ingénieur': 'Professeur',
+    'Professeur': 'Professeur',
+    'MA': 'MC',
+    'MC': 'MC'
+}
+
+rank_values = {'MC': 3, 'Docteur': 2, 'Professeur': 1}
+
+# Nombre maximal de soutenances par jour pour un enseignant
+max_defenses_per_day = 4
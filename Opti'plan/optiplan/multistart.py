@@ -0,0 +1,73 @@
+"""Mode multi-départs : plusieurs exécutions perturbées de l'heuristique gloutonne en parallèle.
+
+Le départ 0 est l'exécution déterministe habituelle ; les suivants tirent au
+hasard l'ordre des étudiants à égalité et le choix du président et de
+l'examinateur parmi les premiers candidats libres. Chaque départ a sa graine,
+dérivée de `seed`, si bien qu'un même `seed` redonne le même planning quel que
+soit le nombre de processus. On garde le meilleur planning selon la
+couverture, puis selon l'équilibre des charges (écart-type du nombre de
+soutenances par enseignant), puis le plus petit numéro de départ.
+"""
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from . import constraints
+from .greedy import build_schedule_state, engines
+from .models import Defense, Professor, Room, Student
+
+_instance = None
+
+
+def _init_worker(instance, registry=None):
+    # Les données sont transmises une seule fois par processus, avec le registre des règles du parent
+    global _instance
+    _instance = instance
+    if registry is not None:
+        constraints.install(registry)
+
+
+def load_stddev(defenses: List[Defense], professors: List[Professor]) -> float:
+    load = {prof.id: 0 for prof in professors}
+    for defense in defenses:
+        load[defense.supervisor_id] += 1
+        load[defense.president_id] += 1
+        load[defense.examiner_id] += 1
+    return float(np.std(list(load.values()))) if load else 0.0
+
+
+def _run_start(start: int, start_seed: int) -> Tuple[Tuple[int, float, int], List[Defense]]:
+    engine, professors, students, rooms, num_days, slots_per_day, choice_width, selection, relaxed, closed = _instance
+    index, room_schedule = build_schedule_state(professors, rooms, num_days, slots_per_day, relaxed=relaxed,
+                                                closed_rooms=closed)
+    rng = random.Random(start_seed) if start > 0 else None
+    defenses = engines[engine](professors, students, rooms, index, room_schedule, rng=rng,
+                               choice_width=choice_width, selection=selection)
+    return (-len(defenses), load_stddev(defenses, professors), start), defenses
+
+
+def multistart(engine: str, professors: List[Professor], students: List[Student], rooms: List[Room],
+               num_days: int, slots_per_day: int, starts: int = 32, workers: Optional[int] = None,
+               seed: int = 0, choice_width: int = 3, selection: str = 'rank',
+               relaxed: Iterable[str] = (),
+               closed_rooms: Optional[Dict[int, Iterable[int]]] = None) -> Tuple[List[Defense], int]:
+    """Retourne le meilleur planning et le numéro du départ qui l'a produit."""
+    rng = random.Random(seed)
+    start_seeds = [rng.getrandbits(64) for _ in range(starts)]
+    instance = (engine, professors, students, rooms, num_days, slots_per_day, choice_width, selection, tuple(relaxed),
+                closed_rooms)
+    workers = min(workers or os.cpu_count() or 1, starts)
+
+    if workers <= 1:
+        _init_worker(instance)
+        results = [_run_start(start, start_seed) for start, start_seed in enumerate(start_seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(instance, constraints.rules)) as executor:
+            results = list(executor.map(_run_start, range(starts), start_seeds))
+
+    score, defenses = min(results, key=lambda result: result[0])
+    return defenses, score[2]
@@ -0,0 +1,83 @@
+"""Lecture de la colonne `Disponibilité` sans `eval`.
+
+Chaque cellule est une liste de jours, chaque jour une liste de booléens
+(`True`/`False` ou `1`/`0`), par exemple `[[True, False, ...], ...]`.
+
+Le traitement est vectorisé sur toute la colonne : les cellules sont
+normalisées (espaces retirés, `True`/`False` réduits à `T`/`F`), une expression
+régulière linéaire valide la forme (exactement `slots_per_day` valeurs par
+jour, au moins `num_days` jours), puis chaque cellule est réduite à une chaîne
+compacte d'un caractère par créneau convertie d'un seul bloc en matrice
+booléenne NumPy. Les jours au-delà de `num_days` (semaine complète saisie
+par les départements) sont ignorés. Les lignes mal formées sont toutes
+signalées ensemble dans une `AvailabilityFormatError`.
+"""
+import ast
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+_strip_whitespace = str.maketrans('', '', ' \t\r\n')
+_strip_structure = str.maketrans('', '', '[],')
+
+
+class AvailabilityFormatError(ValueError):
+    def __init__(self, errors: List[Tuple[int, str]]):
+        self.errors = errors
+        details = '\n'.join(f"  ligne {row} : {reason}" for row, reason in errors)
+        super().__init__(f"{len(errors)} disponibilité(s) mal formée(s) :\n{details}")
+
+
+def _day_pattern(slots_per_day: int) -> str:
+    return rf'\[[TF01](?:,[TF01]){{{slots_per_day - 1}}},?\]'
+
+
+def _diagnose(raw, num_days: int, slots_per_day: int) -> str:
+    # Explication détaillée d'une cellule rejetée (chemin lent, lignes fautives uniquement)
+    if not isinstance(raw, str):
+        return f"valeur manquante ou non textuelle ({raw!r})"
+    try:
+        days = ast.literal_eval(raw)
+    except (ValueError, SyntaxError):
+        return "syntaxe invalide"
+    if not isinstance(days, (list, tuple)):
+        return "une liste de jours est attendue"
+    if len(days) < num_days:
+        return f"{len(days)} jour(s) au lieu d'au moins {num_days}"
+    for day_index, day_slots in enumerate(days):
+        if not isinstance(day_slots, (list, tuple)):
+            return f"jour {day_index + 1} : une liste de créneaux est attendue"
+        if len(day_slots) != slots_per_day:
+            return f"jour {day_index + 1} : {len(day_slots)} créneau(x) au lieu de {slots_per_day}"
+        if any(value not in (True, False) for value in day_slots):
+            return f"jour {day_index + 1} : valeurs booléennes attendues"
+    return "format non reconnu"
+
+
+def parse_availability(column: Iterable, num_days: int, slots_per_day: int) -> np.ndarray:
+    """Matrice booléenne (une ligne par cellule, `num_days * slots_per_day` colonnes)."""
+    column = pd.Series(column, dtype=object).reset_index(drop=True)
+    total_slots = num_days * slots_per_day
+    day = _day_pattern(slots_per_day)
+    pattern = rf'\[{day}(?:,{day}){{{num_days - 1},}},?\]'
+
+    # Forme normalisée : sans espaces, True/False réduits à T/F
+    text = column.where(column.map(lambda value: isinstance(value, str)), '')
+    text = text.str.translate(_strip_whitespace).str.replace('True', 'T').str.replace('False', 'F')
+    valid = text.str.fullmatch(pattern).to_numpy(dtype=bool)
+    if not valid.all():
+        raise AvailabilityFormatError([(int(row), _diagnose(column[row], num_days, slots_per_day))
+                                       for row in np.flatnonzero(~valid)])
+
+    # Un caractère par créneau
+    compact = text.str.translate(_strip_structure).str.slice(0, total_slots)
+    if compact.empty:
+        return np.zeros((0, total_slots), dtype=bool)
+    codes = np.frombuffer(''.join(compact).encode('ascii'), dtype=np.uint8).reshape(len(compact), total_slots)
+    return (codes == ord('T')) | (codes == ord('1'))
+
+
+def availability_slots(matrix: np.ndarray) -> List[List[int]]:
+    """Listes de créneaux disponibles (indices `day * slots_per_day + slot`) par ligne."""
+    return [np.flatnonzero(row).tolist() for row in matrix]
@@ -0,0 +1,143 @@
+"""PDF personnels : un document par membre de jury et un par salle.
+
+Les soutenances sont réparties en une seule passe (triées par créneau puis
+par salle) entre les enseignants qu'elles mobilisent, dans leurs trois rôles,
+et la salle qui les accueille. Les documents, souvent des centaines, sont
+rendus par un pool de processus (`workers`) : chaque processus reçoit une
+fois les tables de correspondance et prépare une fois les styles et les
+polices, puis rend les documents par paquets. Les processus sont lancés par
+un serveur dédié (`forkserver`) plutôt que par `fork` : l'appelant peut avoir
+des threads actifs (pool d'écriture de `optiplan.export`, serveur HTTP) et un
+`fork` pris pendant qu'un autre thread tient un verrou peut bloquer l'enfant.
+
+    paths = render_personal_pdfs('pdf_personnels', scheduler.defenses, registry, scheduler.slots_per_day)
+
+Fichiers écrits (A4 paysage) : `enseignant-<identifiant>.pdf` et
+`salle-<identifiant>.pdf`, une table par jour, par créneau.
+"""
+import multiprocessing
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.platypus import Paragraph, Spacer
+
+from .models import Defense
+from .registry import Registry
+from .report import StreamingPDF, table_chunks, table_style
+
+roles = (('president_id', 'Président'), ('examiner_id', 'Examinateur'), ('supervisor_id', 'Encadreur'))
+professor_header = ['Créneau', 'Rôle', 'Étudiant', 'Niveau', 'Domaine', 'Salle', 'Autres membres du jury']
+room_header = ['Créneau', 'Étudiant', 'Niveau', 'Domaine', 'Président', 'Examinateur', 'Encadreur']
+
+# Document à rendre : ('professor', identifiant, [(rôle, soutenance)]) ou ('room', identifiant, [soutenance])
+Task = Tuple[str, int, list]
+
+
+def group_defenses(defenses: Iterable[Defense]
+                   ) -> Tuple[Dict[int, List[Tuple[str, Defense]]], Dict[int, List[Defense]]]:
+    """Soutenances par enseignant (avec son rôle) et par salle, en une passe, par créneau puis par salle."""
+    by_professor = defaultdict(list)
+    by_room = defaultdict(list)
+    for defense in sorted(defenses, key=attrgetter('time_slot', 'room_id')):
+        for attribute, role in roles:
+            by_professor[getattr(defense, attribute)].append((role, defense))
+        by_room[defense.room_id].append(defense)
+    return by_professor, by_room
+
+
+_instance: Optional[Tuple[Registry, int, str]] = None
+_styles = None
+
+
+def _init_worker(instance):
+    # Tables transmises une fois par processus ; styles et polices préparés une fois
+    global _instance, _styles
+    _instance = instance
+    for font in ('Helvetica', 'Helvetica-Bold'):
+        pdfmetrics.getFont(font)
+    _styles = getSampleStyleSheet(), table_style(header_padding=8)
+
+
+def _name(registry: Registry, prof_id: int) -> str:
+    prof = registry.professors[prof_id]
+    return f"{prof.name} ({prof.rank})"
+
+
+def _write(path: str, title: str, header: List[str], days: Iterable[Tuple[int, Iterable[List[str]]]],
+           count: int) -> str:
+    styles, style = _styles
+    margins = dict(leftMargin=30, rightMargin=30, topMargin=30, bottomMargin=30)
+
+    def flowables():
+        yield Paragraph(title, styles['Heading1'])
+        yield Paragraph(f"{count} soutenance(s)", styles['Normal'])
+        for day, rows in days:
+            yield Spacer(1, 12)
+            yield Paragraph(f"Jour {day + 1}", styles['Heading3'])
+            yield from table_chunks(header, rows, style)
+
+    StreamingPDF(path, pagesize=landscape(A4), **margins).build(flowables())
+    return path
+
+
+def _professor_pdf(prof_id: int, entries: List[Tuple[str, Defense]]) -> str:
+    registry, slots_per_day, directory = _instance
+
+    def rows(day_entries):
+        for role, defense in day_entries:
+            student = registry.students[defense.student_id]
+            others = [_name(registry, getattr(defense, attribute)) for attribute, _ in roles
+                      if getattr(defense, attribute) != prof_id]
+            yield [f"Créneau {defense.time_slot % slots_per_day + 1}", role, student.name, student.level,
+                   student.field, registry.rooms[defense.room_id].name, ', '.join(others)]
+
+    days = ((day, rows(day_entries))
+            for day, day_entries in groupby(entries, key=lambda entry: entry[1].time_slot // slots_per_day))
+    return _write(os.path.join(directory, f"enseignant-{prof_id}.pdf"),
+                  f"Soutenances de {_name(registry, prof_id)}", professor_header, days, len(entries))
+
+
+def _room_pdf(room_id: int, defenses: List[Defense]) -> str:
+    registry, slots_per_day, directory = _instance
+
+    def rows(day_defenses):
+        for defense in day_defenses:
+            student = registry.students[defense.student_id]
+            yield [f"Créneau {defense.time_slot % slots_per_day + 1}", student.name, student.level, student.field,
+                   _name(registry, defense.president_id), _name(registry, defense.examiner_id),
+                   _name(registry, defense.supervisor_id)]
+
+    days = ((day, rows(day_defenses))
+            for day, day_defenses in groupby(defenses, key=lambda defense: defense.time_slot // slots_per_day))
+    return _write(os.path.join(directory, f"salle-{room_id}.pdf"),
+                  f"Soutenances en salle {registry.rooms[room_id].name}", room_header, days, len(defenses))
+
+
+def _render(task: Task) -> str:
+    kind, key, entries = task
+    return (_professor_pdf if kind == 'professor' else _room_pdf)(key, entries)
+
+
+def render_personal_pdfs(directory: str, defenses: Iterable[Defense], registry: Registry, slots_per_day: int,
+                         workers: Optional[int] = None) -> List[str]:
+    """Rend les PDF de chaque membre de jury et de chaque salle occupée ; chemins écrits, dans l'ordre des tâches."""
+    os.makedirs(directory, exist_ok=True)
+    by_professor, by_room = group_defenses(defenses)
+    tasks: List[Task] = ([('professor', prof_id, entries) for prof_id, entries in by_professor.items()]
+                         + [('room', room_id, entries) for room_id, entries in by_room.items()])
+    instance = (registry, slots_per_day, directory)
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        _init_worker(instance)
+        return list(map(_render, tasks))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('forkserver'),
+                             initializer=_init_worker, initargs=(instance,)) as executor:
+        # Par paquets : quelques échanges par processus plutôt qu'un par document
+        return list(executor.map(_render, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
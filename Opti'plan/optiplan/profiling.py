@@ -0,0 +1,119 @@
+"""Instrumentation par phase : chronomètres, compteurs et causes de rejet.
+
+Le profileur actif est une variable du module, désactivée par défaut : elle
+vaut alors un profileur nul dont les méthodes ne font rien, et les boucles
+chaudes ne testent qu'un booléen (`profiler.enabled`) avant de compter.
+
+    profiler = profiling.enable()
+    ...  # chargement, planification, PDF
+    profiler.write('profil.json')
+    profiling.disable()
+
+Le rapport JSON contient, par phase, le nombre d'appels et le temps cumulé,
+les compteurs (candidats examinés, rejets par cause, mouvements de la
+recherche locale), des statistiques par étudiant et la trace chronologique
+des phases au format Chrome (`traceEvents`, lisible dans chrome://tracing ou
+Perfetto).
+"""
+import json
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List
+
+_null_phase = nullcontext()
+
+
+class Profiler:
+    enabled = True
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.phases: Dict[str, List[float]] = {}  # nom -> [appels, secondes]
+        self.counters: Counter = Counter()
+        self.stats: Dict[str, List[float]] = {}  # nom -> [effectif, somme, min, max]
+        self.events: List[dict] = []
+        self._depth = 0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            elapsed = time.perf_counter() - start
+            totals = self.phases.setdefault(name, [0, 0.0])
+            totals[0] += 1
+            totals[1] += elapsed
+            self.events.append({'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': self._depth,
+                                'ts': round((start - self.origin) * 1e6, 1), 'dur': round(elapsed * 1e6, 1)})
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+
+    def observe(self, name: str, value: float) -> None:
+        stat = self.stats.get(name)
+        if stat is None:
+            self.stats[name] = [1, value, value, value]
+        else:
+            stat[0] += 1
+            stat[1] += value
+            stat[2] = min(stat[2], value)
+            stat[3] = max(stat[3], value)
+
+    def report(self) -> dict:
+        return {
+            'phases': {name: {'calls': calls, 'seconds': round(seconds, 6)}
+                       for name, (calls, seconds) in self.phases.items()},
+            'counters': dict(sorted(self.counters.items())),
+            'stats': {name: {'count': n, 'mean': total / n, 'min': low, 'max': high}
+                      for name, (n, total, low, high) in self.stats.items()},
+            'traceEvents': sorted(self.events, key=lambda event: event['ts']),
+        }
+
+    def write(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as target:
+            json.dump(self.report(), target, indent=1, ensure_ascii=False)
+
+
+class NullProfiler(Profiler):
+    enabled = False
+
+    def phase(self, name: str):
+        return _null_phase
+
+    def count(self, name: str, n: int = 1) -> None:
+        pass
+
+    def observe(self, name: str, value: float) -> None:
+        pass
+
+
+null_profiler = NullProfiler()
+active: Profiler = null_profiler
+
+
+def enable() -> Profiler:
+    """Active un nouveau profileur et le renvoie."""
+    global active
+    active = Profiler()
+    return active
+
+
+def disable() -> None:
+    global active
+    active = null_profiler
+
+
+@contextmanager
+def profile() -> Iterator[Profiler]:
+    global active
+    previous = active
+    active = Profiler()
+    try:
+        yield active
+    finally:
+        active = previous
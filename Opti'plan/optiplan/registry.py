@@ -0,0 +1,22 @@
+"""Tables de correspondance identifiant → objet, construites une seule fois après le chargement.
+
+Remplacent les parcours linéaires `next(p for p in professors if p.id == ...)`
+du planificateur (`by_id` : heuristiques gloutonnes, amélioration locale) et
+de la génération du PDF (`Registry`).
+"""
+from typing import Dict, Iterable, List, TypeVar
+
+from .models import Professor, Room, Student
+
+T = TypeVar('T', Professor, Student, Room)
+
+
+def by_id(items: Iterable[T]) -> Dict[int, T]:
+    return {item.id: item for item in items}
+
+
+class Registry:
+    def __init__(self, professors: List[Professor], students: List[Student], rooms: List[Room]):
+        self.professors: Dict[int, Professor] = by_id(professors)
+        self.students: Dict[int, Student] = by_id(students)
+        self.rooms: Dict[int, Room] = by_id(rooms)
@@ -0,0 +1,252 @@
+"""Génération du PDF du planning au fil de l'eau.
+
+Au lieu d'accumuler toutes les lignes dans une seule `Table` puis d'appeler
+`build()` sur la liste complète des éléments, `StreamingPDF` passe au
+`build()` de ReportLab une liste remplie à la demande depuis un générateur :
+chaque élément est mis en page dès qu'il est produit, les pages terminées
+sont écrites (compressées) dans le canevas et seules les lignes du morceau
+en cours restent en mémoire. Le planning est découpé en un tableau par jour,
+lui-même limité à `chunk_rows` lignes, tous partageant un même `TableStyle`
+calculé une fois (alternance des couleurs par `ROWBACKGROUNDS`, sans
+`setStyle` par ligne) :
+
+    def flowables():
+        yield Paragraph("Planning des soutenances", styles['Heading1'])
+        yield from planning_tables(defenses, registry, slots_per_day, planning_style)
+
+    StreamingPDF('planning.pdf', pagesize=A4).build(flowables())
+
+Deux mises en page complètes sont fournies (`pdf_layouts`) : 'summary'
+(paysage, planning et statistiques, celle de source.py) et 'detailed'
+(planning, étudiants non programmés avec leur diagnostic, créneaux libres
+par salle et statistiques, celle de test2.py).
+"""
+import os
+from itertools import groupby, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import BaseDocTemplate, Flowable, Frame, PageTemplate, Paragraph, Spacer, Table, TableStyle
+
+from . import profiling
+from .diagnosis import diagnose
+from .models import Defense
+from .registry import Registry
+from .scheduler import Scheduler
+
+planning_header = ['Jour', 'Créneau', 'Étudiant', 'Niveau', 'Domaine', 'Salle', 'Président', 'Examinateur',
+                   'Encadreur']
+
+
+def table_style(header_padding: Optional[int] = None, banded: bool = True) -> TableStyle:
+    """Style commun des tableaux : en-tête gris, grille noire, lignes alternées blanc / gris clair."""
+    commands = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ]
+    if header_padding is not None:
+        commands.append(('BOTTOMPADDING', (0, 0), (-1, 0), header_padding))
+    if banded:
+        commands.append(('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]))
+    return TableStyle(commands)
+
+
+def planning_rows(defenses: Iterable[Defense], registry: Registry, slots_per_day: int) -> Iterator[List[str]]:
+    for defense in defenses:
+        student = registry.students[defense.student_id]
+        president = registry.professors[defense.president_id]
+        examiner = registry.professors[defense.examiner_id]
+        supervisor = registry.professors[defense.supervisor_id]
+        yield [
+            f"Jour {defense.time_slot // slots_per_day + 1}",
+            f"Créneau {defense.time_slot % slots_per_day + 1}",
+            student.name,
+            student.level,
+            student.field,
+            registry.rooms[defense.room_id].name,
+            f"{president.name} ({president.rank})",
+            f"{examiner.name} ({examiner.rank})",
+            f"{supervisor.name} ({supervisor.rank})",
+        ]
+
+
+class _FlowableStream(list):
+    # Liste passée à `BaseDocTemplate.build()` : ReportLab en consomme la tête et y remet les morceaux d'un élément
+    # découpé ; vide, elle est remplie depuis l'itérateur, un élément à la fois. `build()` teste `len()` avant
+    # chaque élément, seul point sur lequel cette classe s'appuie
+    def __init__(self, flowables: Iterable[Flowable]):
+        super().__init__()
+        self.source = iter(flowables)
+
+    def __len__(self) -> int:
+        if not super().__len__():
+            for flowable in self.source:
+                self.append(flowable)
+                break
+        return super().__len__()
+
+
+class StreamingPDF:
+    def __init__(self, path: str, pagesize=A4, **margins):
+        self.path = path
+        self.pagesize = pagesize
+        self.margins = margins
+
+    def build(self, flowables: Iterable[Flowable]) -> None:
+        """Met en page les éléments au fur et à mesure que l'itérateur les produit.
+
+        Le document est écrit dans un fichier temporaire voisin, renommé en `path` une fois complet : en cas
+        d'erreur, il est supprimé et `path` reste tel qu'il était.
+        """
+        directory, name = os.path.split(os.path.abspath(self.path))
+        partial = os.path.join(directory, f".{name}.{os.getpid()}.part")
+        try:
+            doc = BaseDocTemplate(partial, pagesize=self.pagesize, pageCompression=1, **self.margins)
+            frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
+            doc.addPageTemplates([PageTemplate(id='page', frames=[frame], pagesize=self.pagesize)])
+            with profiling.active.phase('pdf.build'):
+                doc.build(_FlowableStream(flowables))
+            os.replace(partial, self.path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+
+
+def table_chunks(header: List[str], rows: Iterable[List[str]], style: TableStyle,
+                 col_widths: Optional[Sequence[float]] = None, chunk_rows: int = 100) -> Iterator[Table]:
+    """Tableau découpé en morceaux de `chunk_rows` lignes, en-tête répété sur chaque page."""
+    profiler = profiling.active
+    rows = iter(rows)
+    while True:
+        with profiler.phase('pdf.rows'):
+            chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            break
+        yield Table([header] + chunk, colWidths=col_widths, repeatRows=1, style=style)
+
+
+def planning_tables(defenses: Iterable[Defense], registry: Registry, slots_per_day: int, style: TableStyle,
+                    col_widths: Optional[Sequence[float]] = None, chunk_rows: int = 100) -> Iterator[Table]:
+    """Planning trié par créneau puis par salle, un tableau par jour."""
+    ordered = sorted(defenses, key=lambda defense: (defense.time_slot, defense.room_id))
+    for _, day_defenses in groupby(ordered, key=lambda defense: defense.time_slot // slots_per_day):
+        yield from table_chunks(planning_header, planning_rows(day_defenses, registry, slots_per_day), style,
+                                col_widths, chunk_rows)
+
+
+def statistics_text(stats: Dict[str, float]) -> str:
+    total = stats['total_students']
+    scheduled_share = stats['scheduled_students_count'] / total * 100 if total else 0
+    return f"""
+Nombre total d'étudiants : {stats['total_students']}<br/>
+Nombre d'étudiants programmés : {stats['scheduled_students_count']}<br/>
+Nombre d'étudiants non programmés : {stats['unscheduled_students_count']}<br/>
+Pourcentage d'étudiants programmés : {scheduled_share:.2f}%<br/>
+Nombre total de créneaux disponibles : {stats['room_capacity']}<br/>
+Nombre de créneaux utilisés : {stats['used_slots_count']}<br/>
+Nombre de créneaux restants : {stats['available_slots_count']}<br/>
+Pourcentage d'utilisation des salles : {stats['room_utilization']:.2f}%<br/>
+Charge maximale d'un enseignant (jurys) : {stats['max_professor_load']}<br/>
+Écart-type de la charge des enseignants : {stats['professor_load_stddev']:.2f}<br/>
+"""
+
+
+def free_room_slots(scheduler: Scheduler) -> Dict[str, Dict[str, List[int]]]:
+    """Créneaux libres (numérotés dans la journée à partir de 1) par nom de salle et par jour."""
+    slots_per_day = scheduler.slots_per_day
+    free = {}
+    for room in scheduler.rooms:
+        available_slots = scheduler.room_schedule.free_slots(room.id)
+        if available_slots:
+            free[room.name] = {}
+            for day in range(scheduler.num_days):
+                day_slots = [slot % slots_per_day + 1 for slot in available_slots if slot // slots_per_day == day]
+                if day_slots:
+                    free[room.name][f"Jour {day + 1}"] = sorted(day_slots)
+    return free
+
+
+def write_summary_pdf(path: str, scheduler: Scheduler, registry: Registry) -> None:
+    styles = getSampleStyleSheet()
+
+    def flowables():
+        yield Paragraph("Planning des soutenances", styles['Heading1'])
+        yield from planning_tables(scheduler.defenses, registry, scheduler.slots_per_day, table_style(banded=False),
+                                   [60, 60, 100, 60, 100, 100, 120, 120, 120])
+        yield Spacer(1, 24)
+        yield Paragraph(statistics_text(scheduler.statistics()), styles['Normal'])
+
+    StreamingPDF(path, pagesize=landscape(A4), leftMargin=20, rightMargin=20, topMargin=20,
+                 bottomMargin=20).build(flowables())
+
+
+def write_detailed_pdf(path: str, scheduler: Scheduler, registry: Registry) -> None:
+    styles = getSampleStyleSheet()
+    style = table_style(header_padding=12)
+
+    def flowables():
+        # Planning des soutenances, un tableau par jour
+        yield Paragraph("Planning des soutenances", styles['Heading1'])
+        yield Spacer(1, 12)
+        yield from planning_tables(scheduler.defenses, registry, scheduler.slots_per_day, style,
+                                   [50, 50, 70, 50, 80, 50, 100, 100, 100])
+        yield Spacer(1, 24)
+
+        yield Paragraph("Étudiants non programmés", styles['Heading2'])
+        yield Spacer(1, 12)
+        unscheduled = scheduler.unscheduled_students
+        if unscheduled:
+            def unscheduled_rows():
+                for student in unscheduled:
+                    supervisor = registry.professors[student.supervisor_id]
+                    yield [f"{student.id}", student.name, student.level, student.field,
+                           f"{supervisor.name} ({supervisor.rank})"]
+            yield from table_chunks(['ID Étudiant', 'Nom', 'Niveau', 'Domaine', 'Encadreur'], unscheduled_rows(),
+                                    style)
+            yield Spacer(1, 12)
+            yield Paragraph("Diagnostic des étudiants non programmés", styles['Heading3'])
+            yield Spacer(1, 6)
+
+            # Causes bloquantes et relâchement le moins coûteux (optiplan.diagnosis), en cellules à la ligne
+            cell_style = styles['BodyText'].clone('cell', fontSize=8, leading=10)
+
+            def diagnosis_rows():
+                for student, diagnosis in zip(unscheduled, diagnose(scheduler, unscheduled)):
+                    causes, suggestion = diagnosis.describe(registry, scheduler.slots_per_day)
+                    yield [f"{student.id}", Paragraph(student.name, cell_style), Paragraph(causes, cell_style),
+                           Paragraph(suggestion, cell_style)]
+            yield from table_chunks(['ID Étudiant', 'Nom', 'Cause bloquante', 'Relâchement suggéré'],
+                                    diagnosis_rows(), style, [60, 90, 130, 171])
+        else:
+            yield Paragraph("Tous les étudiants ont été programmés.", styles['Normal'])
+        yield Spacer(1, 24)
+
+        yield Paragraph("Créneaux disponibles dans les salles", styles['Heading2'])
+        yield Spacer(1, 12)
+        free = free_room_slots(scheduler)
+        if free:
+            rows = ([room_name, day, ', '.join(str(slot) for slot in slots)]
+                    for room_name, days in free.items() for day, slots in days.items())
+            yield from table_chunks(['Salle', 'Jour', 'Créneaux disponibles'], rows, style)
+        else:
+            yield Paragraph("Aucun créneau disponible dans les salles.", styles['Normal'])
+        yield Spacer(1, 24)
+
+        yield Paragraph("Statistiques sur l'efficacité de l'algorithme", styles['Heading2'])
+        yield Spacer(1, 12)
+        yield Paragraph(statistics_text(scheduler.statistics()), styles['Normal'])
+
+    StreamingPDF(path, pagesize=A4).build(flowables())
+
+
+pdf_layouts: Dict[str, Callable[[str, Scheduler, Registry], None]] = {
+    'summary': write_summary_pdf,
+    'detailed': write_detailed_pdf,
+}
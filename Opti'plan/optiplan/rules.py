@@ -0,0 +1,10 @@
+"""Règles de composition du jury ; compilées en masques par `optiplan.constraints`."""
+from .models import rank_values
+
+
+def level_min_rank(level: str) -> int:
+    # Déterminer le grade minimal requis pour le président en fonction du niveau de l'étudiant
+    if level == 'Licence':
+        return rank_values['Docteur']
+    return rank_values['MC']  # Master
+
@@ -0,0 +1,126 @@
+"""Scénarios « et si » évalués sur des copies du planning courant.
+
+Un scénario décrit une modification (salle fermée certains jours, enseignant
+absent, jours ajoutés, nouveaux étudiants). Il est appliqué à une copie du
+planning (`Scheduler.fork()` : matrices et tables copiées, sans
+reconstruction) ; les réparations ne déplacent que les soutenances touchées,
+puis l'amélioration locale reprend les étudiants restés en attente. Le
+planning de référence n'est jamais modifié.
+
+    results = evaluate(scheduler, [
+        Scenario("SOKPON 1 fermée le jour 3", closed_rooms={'Batiment SOKPON 1': [2]}),
+        Scenario("Sixième jour", extra_days=1),
+    ])
+    for result in results:
+        print(result.name, f"{result.coverage:.1f}%", f"{result.coverage_change:+.1f}",
+              f"{result.utilization:.1f}%")
+
+Les scénarios sont évalués en parallèle par des processus créés par `fork`
+(système) : chacun hérite du planning de référence en copie sur écriture,
+sans le sérialiser, puis en fait une copie par scénario. Là où `fork`
+n'existe pas, l'évaluation reste séquentielle. Les jours sont numérotés à
+partir de 0.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Union
+
+from .models import Student
+from .scheduler import ScheduleDiff, Scheduler
+
+
+@dataclass
+class Scenario:
+    name: str
+    closed_rooms: Dict[Union[int, str], Optional[List[int]]] = field(default_factory=dict)  # Salle (id ou nom) -> jours
+    absences: Dict[int, Optional[List[int]]] = field(default_factory=dict)  # Enseignant -> jours (None : session)
+    extra_days: int = 0
+    extra_availability: Optional[Dict[int, List[int]]] = None  # Créneaux des jours ajoutés (None : tous)
+    new_students: List[Student] = field(default_factory=list)
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    statistics: Dict[str, float]
+    baseline: Dict[str, float]  # Statistiques du planning de référence
+    diff: ScheduleDiff
+    elapsed: float
+
+    @property
+    def coverage(self) -> float:
+        """Pourcentage d'étudiants programmés."""
+        total = self.statistics['total_students']
+        return self.statistics['scheduled_students_count'] / total * 100 if total else 0.0
+
+    @property
+    def coverage_change(self) -> float:
+        """Écart de couverture avec la référence, en points."""
+        total = self.baseline['total_students']
+        return self.coverage - (self.baseline['scheduled_students_count'] / total * 100 if total else 0.0)
+
+    @property
+    def utilization(self) -> float:
+        return self.statistics['room_utilization']
+
+
+def _slots(scheduler: Scheduler, days: Optional[Sequence[int]]) -> Optional[List[int]]:
+    return None if days is None else [slot for day in days for slot in scheduler.day_slots(day)]
+
+
+def _room_id(scheduler: Scheduler, room: Union[int, str]) -> int:
+    for candidate in scheduler.rooms:
+        if room in (candidate.id, candidate.name):
+            return candidate.id
+    raise ValueError(f"salle inconnue : {room}")
+
+
+def apply(scheduler: Scheduler, scenario: Scenario) -> None:
+    """Applique le scénario au planificateur (une copie, en général) en réparant les soutenances touchées."""
+    if scenario.extra_days:
+        scheduler.add_days(scenario.extra_days, scenario.extra_availability)
+    for room, days in scenario.closed_rooms.items():
+        scheduler.close_room(_room_id(scheduler, room), _slots(scheduler, days))
+    for prof_id, days in scenario.absences.items():
+        if prof_id not in scheduler.index.prof_row:
+            raise ValueError(f"enseignant inconnu : {prof_id}")
+        scheduler.remove_professor_slots(prof_id, _slots(scheduler, days))
+    for student in scenario.new_students:
+        scheduler.add_student(student)
+
+
+_base: Optional[Scheduler] = None
+
+
+def _init_worker(base):
+    # Hérité du processus parent par `fork` : le planning de référence n'est pas sérialisé
+    global _base
+    _base = base
+
+
+def _evaluate(scenario: Scenario, iterations: int, time_limit: float) -> ScenarioResult:
+    start = time.perf_counter()
+    scheduler = _base.fork()
+    apply(scheduler, scenario)
+    if time_limit > 0:
+        scheduler.search.run(iterations, time_limit)
+    return ScenarioResult(scenario.name, scheduler.statistics(), _base.statistics(),
+                          ScheduleDiff.between(_base.defenses, scheduler.defenses), time.perf_counter() - start)
+
+
+def evaluate(scheduler: Scheduler, scenarios: Sequence[Scenario], workers: Optional[int] = None,
+             local_search_iterations: int = 2000, local_search_time_limit: float = 1) -> List[ScenarioResult]:
+    """Évalue chaque scénario sur une copie du planning courant ; résultats dans l'ordre des scénarios."""
+    scenarios = list(scenarios)
+    workers = min(workers or os.cpu_count() or 1, len(scenarios))
+    iterations = [local_search_iterations] * len(scenarios)
+    time_limits = [local_search_time_limit] * len(scenarios)
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        _init_worker(scheduler)
+        return list(map(_evaluate, scenarios, iterations, time_limits))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'),
+                             initializer=_init_worker, initargs=(scheduler,)) as executor:
+        return list(executor.map(_evaluate, scenarios, iterations, time_limits))
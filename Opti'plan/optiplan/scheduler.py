@@ -0,0 +1,330 @@
+"""Planificateur réutilisable : calcul complet puis réparations locales.
+
+`Scheduler.schedule()` enchaîne l'heuristique gloutonne (éventuellement en
+multi-départs), l'amélioration locale et, sur demande, le mode exact CP-SAT.
+L'état obtenu (`room_schedule`, index des occupations) reste en mémoire, et
+les modifications de dernière minute ne réparent que les soutenances
+touchées :
+
+    scheduler = Scheduler(professors, students, rooms, num_days=5, slots_per_day=8)
+    scheduler.schedule()
+    diff = scheduler.remove_professor_slot(prof_id=12, slot=17)
+    diff = scheduler.close_room(room_id=3)
+    diff = scheduler.add_student(Student(...))
+
+Chaque opération renvoie un `ScheduleDiff` décrivant les soutenances ajoutées,
+retirées et déplacées. `fork()` copie l'état courant sans le reconstruire,
+pour essayer une modification sans toucher à l'original (voir
+`optiplan.scenarios`) ; les enseignants sont partagés entre copies et ne sont
+jamais modifiés en place.
+
+Quand les salles et les étudiants relèvent de plusieurs campus, la passe
+gloutonne et l'amélioration locale sont confiées à `sharding.schedule_sharded`
+(un campus par processus, puis coordination des enseignants partagés) ; les
+réparations restent cantonnées aux salles du campus de chaque étudiant.
+
+Les règles de planification sont celles du registre `constraints.rules` ;
+`relaxed_rules` en retire des règles nommées pour toutes les étapes, y compris
+les réparations :
+
+    scheduler = Scheduler(..., relaxed_rules=['president_supervisor_rank'])
+
+`validate()` contrôle le planning courant à partir des seules données d'entrée
+et le note (`optiplan.validation`).
+"""
+import copy
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from . import profiling
+from .greedy import build_schedule_state, engines
+from .local_search import LocalSearch
+from .models import Defense, Professor, Room, Student
+from .multistart import multistart
+from .sharding import ShardPlan, schedule_sharded
+from .solver import solve_cpsat
+from .validation import Validation, validate
+
+
+@dataclass
+class ScheduleDiff:
+    added: List[Defense] = field(default_factory=list)  # Étudiants nouvellement programmés
+    removed: List[Defense] = field(default_factory=list)  # Soutenances supprimées sans solution de rechange
+    moved: List[Tuple[Defense, Defense]] = field(default_factory=list)  # (avant, après)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.moved)
+
+    @classmethod
+    def between(cls, before: Iterable[Defense], after: Iterable[Defense]) -> 'ScheduleDiff':
+        """Différence entre deux plannings complets, étudiant par étudiant."""
+        previous = {defense.student_id: defense for defense in before}
+        diff = cls()
+        for defense in after:
+            old = previous.pop(defense.student_id, None)
+            if old is None:
+                diff.added.append(defense)
+            elif old != defense:
+                diff.moved.append((old, defense))
+        diff.removed.extend(previous.values())
+        return diff
+
+
+class Scheduler:
+    def __init__(self, professors: List[Professor], students: List[Student], rooms: List[Room],
+                 num_days: int, slots_per_day: int, seed: int = 0, relaxed_rules: Iterable[str] = ()):
+        self.professors = list(professors)
+        self.students = list(students)
+        self.rooms = list(rooms)
+        self.num_days = num_days
+        self.slots_per_day = slots_per_day
+        self.seed = seed
+        self.relaxed_rules = tuple(relaxed_rules)
+        self.solve_result = None
+        self.best_start: Optional[int] = None
+        self.shard_plan: Optional[ShardPlan] = None
+        # Créneaux fermés par salle (`close_room`), réappliqués à chaque reconstruction de l'état
+        self.closed_rooms: Dict[int, Set[int]] = {}
+        self.load([])
+
+    def load(self, defenses: Iterable[Defense]) -> None:
+        """Adopte un planning existant comme état courant."""
+        defenses = list(defenses)
+        with profiling.active.phase('schedule.load_state'):
+            self.index, self.room_schedule = build_schedule_state(self.professors, self.rooms, self.num_days,
+                                                                  self.slots_per_day, defenses, self.relaxed_rules,
+                                                                  self.closed_rooms)
+            self.search = LocalSearch(self.professors, self.students, self.rooms, self.index,
+                                      self.room_schedule, defenses, seed=self.seed)
+
+    def fork(self) -> 'Scheduler':
+        """Copie indépendante de l'état courant (matrices et tables copiées, données d'entrée partagées)."""
+        clone = copy.copy(self)
+        clone.professors = list(self.professors)
+        clone.students = list(self.students)
+        clone.rooms = list(self.rooms)
+        clone.closed_rooms = {room_id: set(slots) for room_id, slots in self.closed_rooms.items()}
+        clone.index = self.index.copy()
+        clone.room_schedule = self.room_schedule.copy()
+        clone.search = self.search.fork(clone.index, clone.room_schedule)
+        return clone
+
+    def day_slots(self, day: int) -> range:
+        """Créneaux du jour `day` (0 : premier jour)."""
+        if not 0 <= day < self.num_days:
+            raise ValueError(f"jour {day} hors de la session ({self.num_days} jours, numérotés à partir de 0)")
+        return range(day * self.slots_per_day, (day + 1) * self.slots_per_day)
+
+    @property
+    def campuses(self) -> Set[str]:
+        return {room.campus for room in self.rooms} | {student.campus for student in self.students}
+
+    def schedule(self, engine: str = 'student_major', multistart_runs: int = 1,
+                 multistart_workers: Optional[int] = None, local_search: bool = True,
+                 local_search_iterations: int = 10000, local_search_time_limit: float = 5,
+                 mode: str = 'greedy', solver_time_limit: float = 60,
+                 shard_workers: Optional[int] = None, selection: str = 'rank',
+                 solver_workers: Optional[int] = None) -> List[Defense]:
+        """`selection` : choix des jurys de l'heuristique ('rank' ou 'balanced', voir `optiplan.greedy`).
+
+        `multistart_runs` est ignoré pour une session à plusieurs campus (planification par campus).
+        """
+        profiler = profiling.active
+        sharded = len(self.campuses) > 1
+        if sharded:
+            with profiler.phase('schedule.sharded'):
+                defenses, self.shard_plan = schedule_sharded(
+                    engine, self.professors, self.students, self.rooms, self.num_days, self.slots_per_day,
+                    workers=shard_workers, seed=self.seed, local_search_iterations=local_search_iterations,
+                    local_search_time_limit=local_search_time_limit if local_search else 0, selection=selection,
+                    relaxed=self.relaxed_rules, closed_rooms=self.closed_rooms)
+            self.load(defenses)
+        elif multistart_runs > 1:
+            with profiler.phase('schedule.multistart'):
+                defenses, self.best_start = multistart(engine, self.professors, self.students, self.rooms,
+                                                       self.num_days, self.slots_per_day, starts=multistart_runs,
+                                                       workers=multistart_workers, seed=self.seed,
+                                                       selection=selection, relaxed=self.relaxed_rules,
+                                                       closed_rooms=self.closed_rooms)
+            self.load(defenses)
+        else:
+            with profiler.phase('schedule.greedy'):
+                index, room_schedule = build_schedule_state(self.professors, self.rooms, self.num_days,
+                                                            self.slots_per_day, relaxed=self.relaxed_rules,
+                                                            closed_rooms=self.closed_rooms)
+                defenses = engines[engine](self.professors, self.students, self.rooms, index, room_schedule,
+                                           selection=selection)
+            self.load(defenses)
+        profiler.count('schedule.scheduled_after_greedy', len(self.search.placed))
+
+        # Amélioration locale : déplacer des soutenances déjà placées pour programmer les étudiants restants
+        # (déjà faite campus par campus en mode réparti)
+        if local_search and not sharded:
+            with profiler.phase('schedule.local_search'):
+                self.search.run(local_search_iterations, local_search_time_limit)
+
+        # Mode exact : améliorer le planning avec CP-SAT, initialisé avec le planning courant
+        if mode == 'cpsat':
+            with profiler.phase('schedule.cpsat'):
+                self.solve_result = solve_cpsat(self.professors, self.students, self.rooms, self.num_days,
+                                                self.slots_per_day, hint=self.defenses,
+                                                time_limit=solver_time_limit, num_workers=solver_workers,
+                                                relaxed=self.relaxed_rules, closed_rooms=self.closed_rooms)
+            self.load(self.solve_result.defenses)
+        profiler.count('schedule.scheduled', len(self.search.placed))
+        return self.defenses
+
+    @property
+    def defenses(self) -> List[Defense]:
+        return list(self.search.placed.values())
+
+    @property
+    def scheduled_students(self) -> Set[int]:
+        return set(self.search.placed)
+
+    @property
+    def unscheduled_students(self) -> List[Student]:
+        return [student for student in self.students if student.id not in self.search.placed]
+
+    def statistics(self) -> Dict[str, float]:
+        """Indicateurs du rapport : étudiants programmés, occupation des salles et charge des jurys."""
+        total_students = len(self.students)
+        scheduled = len(self.search.placed)
+        room_capacity = self.index.total_slots * len(self.rooms)
+        used = self.room_schedule.used_count()
+        load = self.index.load  # Soutenances par enseignant, tous rôles confondus
+        return {
+            'total_students': total_students,
+            'scheduled_students_count': scheduled,
+            'unscheduled_students_count': total_students - scheduled,
+            'room_capacity': room_capacity,
+            'used_slots_count': used,
+            'available_slots_count': room_capacity - used,
+            'room_utilization': used / room_capacity * 100 if room_capacity > 0 else 0,
+            'max_professor_load': int(load.max()) if load.size else 0,
+            'professor_load_stddev': float(load.std()) if load.size else 0.0,
+        }
+
+    def validate(self) -> Validation:
+        """Vérification indépendante du planning courant (voir `optiplan.validation`), règles relâchées exclues."""
+        return validate(self.defenses, self.professors, self.students, self.rooms, self.num_days,
+                        self.slots_per_day, relaxed=self.relaxed_rules, closed_rooms=self.closed_rooms)
+
+    @property
+    def professor_schedule(self) -> Dict[int, Set[int]]:
+        """Créneaux occupés par enseignant (vue calculée sur l'index)."""
+        return {int(prof_id): set(self.index.busy[i].nonzero()[0].tolist())
+                for i, prof_id in enumerate(self.index.prof_ids)}
+
+    @property
+    def professor_defense_count(self) -> Dict[int, Dict[int, int]]:
+        """Nombre de soutenances par enseignant et par jour (vue calculée sur l'index)."""
+        return {int(prof_id): dict(enumerate(self.index.day_count[i].tolist()))
+                for i, prof_id in enumerate(self.index.prof_ids)}
+
+    def add_student(self, student: Student) -> ScheduleDiff:
+        self.students.append(student)
+        self.search.add_student(student)
+        return self._apply(lambda: [student.id])
+
+    def remove_professor_slot(self, prof_id: int, slot: int) -> ScheduleDiff:
+        """L'enseignant n'est plus disponible au créneau ; sa soutenance éventuelle est replacée."""
+        return self.remove_professor_slots(prof_id, [slot])
+
+    def remove_professor_slots(self, prof_id: int, slots: Optional[Iterable[int]] = None) -> ScheduleDiff:
+        """L'enseignant n'est plus disponible sur `slots` (toute la session par défaut)."""
+        slots = set(range(self.index.total_slots) if slots is None else self._check_slots(slots))
+        row = self.index.prof_row[prof_id]
+        # Nouvel objet plutôt qu'une modification en place : l'enseignant peut être partagé avec une copie
+        prof = replace(self.search.professors[prof_id],
+                       availability=[slot for slot in self.search.professors[prof_id].availability
+                                     if slot not in slots])
+        self.search.professors[prof_id] = self.professors[row] = prof
+        self.index.available[row, sorted(slots)] = False
+
+        def affected():
+            defenses = [self.search.professor_slots.get((prof_id, slot)) for slot in sorted(slots)]
+            return [self.search.remove(defense.student_id).student_id for defense in defenses if defense is not None]
+        return self._apply(affected)
+
+    def add_days(self, days: int = 1, availability: Optional[Dict[int, Iterable[int]]] = None) -> ScheduleDiff:
+        """Prolonge la session de `days` jours et y place directement les étudiants en attente.
+
+        `availability` donne, par enseignant, ses créneaux dans les jours ajoutés (numérotés à partir de 0) ;
+        par défaut, chaque enseignant y est disponible à tous les créneaux. L'état est reconstruit
+        (la grille change de largeur) ; les fermetures de salles (`closed_rooms`) sont réappliquées, les jours
+        ajoutés restent ouverts.
+        """
+        first = self.index.total_slots
+        added = days * self.slots_per_day
+        for row, prof in enumerate(self.professors):
+            extra = (range(added) if availability is None
+                     else [slot for slot in availability.get(prof.id, ()) if 0 <= slot < added])
+            self.professors[row] = replace(prof, availability=[slot for slot in prof.availability if slot < first]
+                                           + [first + slot for slot in extra])
+        self.num_days += days
+        self.load(self.defenses)
+
+        # Insertion directe sur les nouveaux créneaux (les anciens n'ont pas changé) ; le reste est laissé
+        # à l'amélioration locale
+        diff = ScheduleDiff()
+        for student_id in list(self.search.pending):
+            for slot in range(first, self.index.total_slots):
+                defense = self.search.place(student_id, slot)
+                if defense is not None:
+                    diff.added.append(defense)
+                    break
+        placed = {defense.student_id for defense in diff.added}
+        self.search.pending = [student_id for student_id in self.search.pending if student_id not in placed]
+        return diff
+
+    def close_room(self, room_id: int, slots: Optional[Iterable[int]] = None) -> ScheduleDiff:
+        """Ferme la salle sur `slots` (toute la session par défaut) et replace les soutenances touchées."""
+        slots = range(self.index.total_slots) if slots is None else self._check_slots(slots)
+        row = self.index.room_row[room_id]
+        self.closed_rooms.setdefault(room_id, set()).update(slots)
+
+        def affected():
+            removed = []
+            for slot in slots:
+                self.index.room_open[row, slot] = False
+                defense = self.room_schedule.get(room_id, slot)
+                if defense is not None:
+                    removed.append(self.search.remove(defense.student_id).student_id)
+            return removed
+        return self._apply(affected)
+
+    def _check_slots(self, slots: Iterable[int]) -> List[int]:
+        # Un indice négatif désignerait silencieusement un créneau de la fin de la session
+        slots = list(slots)
+        for slot in slots:
+            if not 0 <= slot < self.index.total_slots:
+                raise ValueError(f"créneau {slot} hors de la session ({self.index.total_slots} créneaux, "
+                                 f"numérotés à partir de 0)")
+        return slots
+
+    def _apply(self, change) -> ScheduleDiff:
+        # Applique la modification, répare les étudiants touchés et déduit le diff du journal
+        self.search.journal = []
+        try:
+            for student_id in change():
+                self.search.repair(student_id)
+            journal = self.search.journal
+        finally:
+            self.search.journal = None
+
+        before: Dict[int, Optional[Defense]] = {}
+        for sign, defense in journal:
+            if defense.student_id not in before:
+                before[defense.student_id] = defense if sign == '-' else None
+
+        diff = ScheduleDiff()
+        for student_id, previous in before.items():
+            current = self.search.placed.get(student_id)
+            if previous is None and current is not None:
+                diff.added.append(current)
+            elif previous is not None and current is None:
+                diff.removed.append(previous)
+            elif previous != current:
+                diff.moved.append((previous, current))
+        return diff
@@ -0,0 +1,372 @@
+"""Service de planification : données chargées une fois, API HTTP/JSON.
+
+    python -m optiplan --professors enseignants.xlsx --students students_data.xlsx --serve 8080
+
+Les fichiers sont lus au démarrage (et sur `POST /reload`), puis transmis une
+seule fois à chaque processus du pool de calcul, à sa création : une requête
+ne paie ni l'import de pandas, ni la lecture des fichiers, seulement le
+calcul. La boucle asyncio se contente de lire les requêtes et de répondre ;
+planifications, variantes et PDF partent dans le pool (`--workers`
+processus), si bien que des requêtes simultanées ne s'attendent pas.
+
+Routes :
+
+    GET  /status                données chargées et planning courant
+    POST /schedule              calcule le planning et le retient comme planning courant
+    POST /what-if               variante : {"absent": [enseignants], "closed_rooms": [salles],
+                                "strategy": "repair" | "resolve"}, comparée au planning courant
+    GET  /report.pdf?layout=…   PDF du planning courant ('summary' ou 'detailed')
+    POST /reload                relit les fichiers et relance le pool
+
+Le corps JSON de /schedule et /what-if peut modifier les options de
+planification de la ligne de commande (`planning_options`). Une variante
+n'est jamais retenue : 'repair' (par défaut quand un planning courant existe)
+ne replace que les soutenances touchées (`optiplan.scenarios.apply`), sous
+les règles relâchées du planning courant (un autre `relaxed_rules` est
+refusé) ; 'resolve' recalcule tout le planning.
+
+Les paramètres sont vérifiés avant l'envoi au pool (réponse 400) ; une
+erreur pendant le calcul donne une réponse 500, et sa trace est journalisée
+(`logging`, journal `optiplan.server`).
+"""
+import asyncio
+import io
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .cli import load
+from . import constraints
+from .constraints import rules
+from .greedy import engines, selections
+from .models import Defense, Professor, Session, Student
+from .registry import Registry
+from .scenarios import Scenario, apply
+from .scheduler import ScheduleDiff, Scheduler
+
+planning_options = ('engine', 'selection', 'mode', 'solver_time_limit', 'local_search', 'local_search_iterations',
+                    'local_search_time_limit', 'multistart_runs', 'seed', 'relaxed_rules')
+_numeric_options = ('solver_time_limit', 'local_search_time_limit')
+_integer_options = ('local_search_iterations', 'multistart_runs', 'seed')
+
+# Taille maximale du corps d'une requête (les corps attendus font quelques kilo-octets)
+max_body_size = 1 << 20
+
+_reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 409: 'Conflict',
+            413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+_logger = logging.getLogger(__name__)
+
+_instance: Optional[Tuple[Session, List[Professor], List[Student]]] = None
+
+
+def _init_worker(instance, registry=None):
+    # Les données sont transmises une seule fois par processus, avec le registre des règles du parent
+    global _instance
+    _instance = instance
+    if registry is not None:
+        constraints.install(registry)
+
+
+def _scheduler(settings: Dict, closed_rooms=()) -> Scheduler:
+    session, professors, students = _instance
+    rooms = [room for room in session.rooms() if room.id not in set(closed_rooms)]
+    return Scheduler(professors, students, rooms, session.num_days, session.slots_per_day, seed=settings['seed'],
+                     relaxed_rules=settings['relaxed_rules'])
+
+
+def _schedule(scheduler: Scheduler, settings: Dict) -> None:
+    # Le pool parallélise déjà les requêtes : multi-départs, campus et CP-SAT restent dans le processus
+    scheduler.schedule(settings['engine'], multistart_runs=settings['multistart_runs'], multistart_workers=1,
+                       local_search=settings['local_search'],
+                       local_search_iterations=settings['local_search_iterations'],
+                       local_search_time_limit=settings['local_search_time_limit'], mode=settings['mode'],
+                       solver_time_limit=settings['solver_time_limit'], solver_workers=1, shard_workers=1,
+                       selection=settings['selection'])
+
+
+def _result(scheduler: Scheduler, start: float) -> Dict:
+    result = {'elapsed': round(time.perf_counter() - start, 3), 'statistics': scheduler.statistics(),
+              'validation': scheduler.validate().summary(), 'best_start': scheduler.best_start, 'solver': None}
+    if scheduler.solve_result is not None:
+        result['solver'] = {'status': scheduler.solve_result.status,
+                            'upper_bound': scheduler.solve_result.upper_bound}
+    return result
+
+
+def _solve(settings: Dict) -> Tuple[Dict, List[Defense]]:
+    start = time.perf_counter()
+    scheduler = _scheduler(settings)
+    _schedule(scheduler, settings)
+    return _result(scheduler, start), scheduler.defenses
+
+
+def _what_if(settings: Dict, current: Optional[List[Defense]], absent: List[int], closed_rooms: List[int],
+             strategy: str) -> Tuple[Dict, List[Defense]]:
+    start = time.perf_counter()
+    # Les enseignants absents sont remplacés, jamais modifiés : l'instance du processus sert aux requêtes suivantes
+    if strategy == 'repair':
+        # Même salles qu'au calcul du planning courant : seules les soutenances touchées bougent
+        scheduler = _scheduler(settings)
+        scheduler.load(current)
+        apply(scheduler, Scenario('what-if', closed_rooms=dict.fromkeys(closed_rooms),
+                                  absences=dict.fromkeys(absent)))
+    else:
+        scheduler = _scheduler(settings, closed_rooms)
+        for prof_id in absent:
+            scheduler.remove_professor_slots(prof_id)
+        _schedule(scheduler, settings)
+    return _result(scheduler, start), scheduler.defenses
+
+
+def _render(defenses: List[Defense], layout: str, relaxed_rules: List[str]) -> bytes:
+    from .report import pdf_layouts
+
+    scheduler = _scheduler({'seed': 0, 'relaxed_rules': relaxed_rules})
+    scheduler.load(defenses)
+    target = io.BytesIO()
+    pdf_layouts[layout](target, scheduler, Registry(scheduler.professors, scheduler.students, scheduler.rooms))
+    return target.getvalue()
+
+
+def _defense_dicts(defenses: List[Defense]) -> List[Dict]:
+    return [asdict(defense) for defense in defenses]
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Service:
+    def __init__(self, args):
+        self.args = args
+        self.workers = args.workers or os.cpu_count() or 1
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.instance: Optional[Tuple[Session, List[Professor], List[Student]]] = None
+        self.current: Optional[List[Defense]] = None  # Planning courant (dernier /schedule)
+        self.current_summary: Optional[Dict] = None
+        self.routes = {
+            ('GET', '/status'): self.status,
+            ('POST', '/schedule'): self.schedule,
+            ('POST', '/what-if'): self.what_if,
+            ('GET', '/report.pdf'): self.report,
+            ('POST', '/reload'): self.reload,
+        }
+
+    async def start(self) -> None:
+        await self.reload({}, {})
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    async def _run(self, function, *args):
+        # Les paramètres sont validés avant l'envoi au pool : toute erreur du calcul est une erreur du service
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    def _settings(self, body: Dict) -> Dict:
+        settings = {name: getattr(self.args, name) for name in planning_options}
+        for name, value in body.items():
+            if name not in settings:
+                raise HTTPError(400, f"option inconnue : {name} ({', '.join(planning_options)})")
+            settings[name] = value
+        if settings['engine'] not in engines:
+            raise HTTPError(400, f"heuristique inconnue : {settings['engine']} ({', '.join(engines)})")
+        if settings['selection'] not in selections:
+            raise HTTPError(400, f"sélection inconnue : {settings['selection']} ({', '.join(selections)})")
+        if settings['mode'] not in ('greedy', 'cpsat'):
+            raise HTTPError(400, f"mode inconnu : {settings['mode']} (greedy, cpsat)")
+        if not isinstance(settings['local_search'], bool):
+            raise HTTPError(400, "local_search doit être un booléen")
+        for name in _numeric_options:
+            if isinstance(settings[name], bool) or not isinstance(settings[name], (int, float)):
+                raise HTTPError(400, f"{name} doit être un nombre")
+        for name in _integer_options:
+            if isinstance(settings[name], bool) or not isinstance(settings[name], int):
+                raise HTTPError(400, f"{name} doit être un entier")
+        settings['relaxed_rules'] = settings['relaxed_rules'] or []
+        if (not isinstance(settings['relaxed_rules'], list)
+                or not all(isinstance(name, str) and name in rules for name in settings['relaxed_rules'])):
+            raise HTTPError(400, f"relaxed_rules doit être une liste de règles ({', '.join(rules)})")
+        return settings
+
+    def _ids(self, body: Dict, name: str, known) -> List[int]:
+        ids = body.pop(name, [])
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            raise HTTPError(400, f"{name} doit être une liste d'identifiants")
+        unknown = sorted(set(ids) - set(known))
+        if unknown:
+            raise HTTPError(400, f"{name} : identifiants inconnus {unknown}")
+        return ids
+
+    async def status(self, query: Dict, body: Dict) -> Dict:
+        session, professors, students = self.instance
+        return {
+            'professors': len(professors),
+            'students': len(students),
+            'rooms': len(session.rooms()),
+            'campuses': [campus for campus in session.campuses if campus],
+            'num_days': session.num_days,
+            'slots_per_day': session.slots_per_day,
+            'workers': self.workers,
+            'current': self.current_summary,
+        }
+
+    async def schedule(self, query: Dict, body: Dict) -> Dict:
+        settings = self._settings(body)
+        instance = self.instance
+        result, defenses = await self._run(_solve, settings)
+        if self.instance is instance:  # Pas de rechargement entre-temps
+            self.current = defenses
+            self.current_summary = {'settings': settings, **result}
+        return {**result, 'defenses': _defense_dicts(defenses)}
+
+    async def what_if(self, query: Dict, body: Dict) -> Dict:
+        session, professors, _ = self.instance
+        absent = self._ids(body, 'absent', (prof.id for prof in professors))
+        closed_rooms = self._ids(body, 'closed_rooms', (room.id for room in session.rooms()))
+        strategy = body.pop('strategy', 'repair' if self.current is not None else 'resolve')
+        if strategy not in ('repair', 'resolve'):
+            raise HTTPError(400, f"stratégie inconnue : {strategy} (repair, resolve)")
+        if strategy == 'repair' and self.current is None:
+            raise HTTPError(409, "aucun planning courant à réparer : appeler d'abord /schedule")
+        if strategy == 'repair':
+            # Une réparation garde les règles du planning courant : calculé sous d'autres règles, il les
+            # enfreindrait hors des soutenances touchées
+            current_rules = self.current_summary['settings']['relaxed_rules']
+            body.setdefault('relaxed_rules', current_rules)
+        settings = self._settings(body)
+        if strategy == 'repair' and set(settings['relaxed_rules']) != set(current_rules):
+            raise HTTPError(409, f"relaxed_rules différent de celui du planning courant ({current_rules}) : "
+                                 "utiliser la stratégie 'resolve'")
+        current = self.current
+        result, defenses = await self._run(_what_if, settings, current, absent, closed_rooms, strategy)
+        diff = ScheduleDiff.between(current, defenses) if current is not None else None
+        return {
+            **result,
+            'absent': absent,
+            'closed_rooms': closed_rooms,
+            'strategy': strategy,
+            'baseline': self.current_summary['statistics'] if current is not None else None,
+            'diff': None if diff is None else {
+                'added': _defense_dicts(diff.added),
+                'removed': _defense_dicts(diff.removed),
+                'moved': [[asdict(before), asdict(after)] for before, after in diff.moved],
+            },
+            'defenses': _defense_dicts(defenses),
+        }
+
+    async def report(self, query: Dict, body: Dict) -> bytes:
+        if self.current is None:
+            raise HTTPError(409, "aucun planning courant : appeler d'abord /schedule")
+        from .report import pdf_layouts
+
+        layout = query.get('layout', [self.args.pdf_layout])[-1]
+        if layout not in pdf_layouts:
+            raise HTTPError(400, f"mise en page inconnue : {layout} ({', '.join(pdf_layouts)})")
+        return await self._run(_render, self.current, layout, self.current_summary['settings']['relaxed_rules'])
+
+    async def reload(self, query: Dict, body: Dict) -> Dict:
+        loop = asyncio.get_running_loop()
+        self.instance = await loop.run_in_executor(None, load, self.args)
+        previous, self.executor = self.executor, ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker,
+            initargs=(self.instance, constraints.rules))
+        if previous is not None:
+            previous.shutdown(wait=False)  # Les calculs en cours se terminent sur les anciennes données
+        # Démarrage des processus dès maintenant plutôt qu'à la première requête
+        await asyncio.gather(*(loop.run_in_executor(self.executor, os.getpid) for _ in range(self.workers)))
+        self.current = self.current_summary = None
+        return await self.status(query, body)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        start = time.perf_counter()
+        method, path = '-', '-'
+        try:
+            method, target, body = await _read_request(reader)
+            url = urlsplit(target)
+            path = url.path
+            route = self.routes.get((method, path))
+            if route is None:
+                known = [route_method for route_method, route_path in self.routes if route_path == path]
+                if known:
+                    raise HTTPError(405, f"{method} {path} : méthode non autorisée ({', '.join(known)})")
+                raise HTTPError(404, f"{path} : route inconnue")
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError as exc:
+                raise HTTPError(400, f"corps JSON invalide : {exc}") from exc
+            if not isinstance(payload, dict):
+                raise HTTPError(400, "le corps JSON doit être un objet")
+            status, content = 200, await route(parse_qs(url.query), payload)
+        except HTTPError as exc:
+            status, content = exc.status, {'error': str(exc)}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as exc:  # Erreur de calcul : journalisée avec sa trace, le service continue
+            _logger.exception("%s %s : erreur interne", method, path)
+            status, content = 500, {'error': f"erreur interne du service ({type(exc).__name__})"}
+
+        if isinstance(content, bytes):
+            content_type, data = 'application/pdf', content
+        else:
+            content_type, data = 'application/json; charset=utf-8', json.dumps(content, ensure_ascii=False).encode()
+        writer.write(f"HTTP/1.1 {status} {_reasons[status]}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode('latin-1') + data)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+        print(f"{method} {path} {status} {time.perf_counter() - start:.3f}s", flush=True)
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+    request_line = (await reader.readline()).decode('latin-1').split()
+    if len(request_line) != 3:
+        raise HTTPError(400, "requête HTTP invalide")
+    method, target, _ = request_line
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError as exc:
+        raise HTTPError(400, "Content-Length invalide") from exc
+    if length > max_body_size:
+        raise HTTPError(413, f"corps de requête trop volumineux ({length} octets, au plus {max_body_size})")
+    return method, target, await reader.readexactly(length) if length > 0 else b''
+
+
+async def _serve(args) -> None:
+    service = Service(args)
+    try:
+        await service.start()
+        server = await asyncio.start_server(service.handle, args.host, args.serve)
+        print(f"Service à l'écoute sur http://{args.host}:{args.serve}/ ({service.workers} processus de calcul)",
+              flush=True)
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def serve(args) -> None:
+    """Lance le service jusqu'à l'interruption (Ctrl+C)."""
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
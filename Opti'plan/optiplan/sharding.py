@@ -0,0 +1,248 @@
+"""Planification répartie par campus pour les sessions multi-facultés.
+
+Chaque campus a ses salles ; seuls les enseignants sont partagés. Un
+enseignant est rattaché aux campus où il encadre des étudiants ; s'il
+n'encadre personne, aux campus qui ont des étudiants de ses spécialités
+(à défaut, à tous les campus qui ont des étudiants), avec pour poids le
+nombre de ces étudiants. Les campus reliés par des enseignants communs
+forment les composantes de l'instance.
+
+La planification se fait en deux temps :
+
+1. chaque campus est planifié seul, en parallèle (heuristique gloutonne et
+   amélioration locale). Un enseignant partagé y reçoit une part de ses
+   créneaux et de son plafond journalier, proportionnelle à son poids sur le
+   campus : les parts étant disjointes, les plannings des campus se
+   fusionnent sans conflit ;
+2. étape de coordination : pour chaque composante de plusieurs campus, les
+   plannings fusionnés sont repris par l'amélioration locale avec les
+   disponibilités complètes des enseignants partagés, ce qui place les
+   étudiants restés en attente sur les parts inutilisées. Les composantes
+   étant indépendantes, elles sont traitées en parallèle.
+
+Le temps de calcul suit ainsi la taille du plus gros campus (puis de la plus
+grosse composante), et non celle de l'université entière.
+"""
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import constraints, profiling
+from .greedy import build_schedule_state, engines
+from .local_search import LocalSearch
+from .models import Defense, Professor, Room, Student, max_defenses_per_day
+from .specialties import normalize
+
+
+@dataclass
+class Shard:
+    campus: str
+    professors: List[Professor]  # Enseignants partagés : disponibilités réduites à la part du campus
+    students: List[Student]
+    rooms: List[Room]
+    daily_caps: Dict[int, List[int]] = field(default_factory=dict)  # Enseignant partagé -> plafond par jour
+
+
+@dataclass
+class ShardPlan:
+    shards: List[Shard]
+    components: List[List[str]]  # Campus reliés par des enseignants partagés
+    homes: Dict[int, Dict[str, int]]  # Enseignant -> poids par campus de rattachement
+
+    @property
+    def shared_professors(self) -> List[int]:
+        return [prof_id for prof_id, weights in self.homes.items() if len(weights) > 1]
+
+
+def _interleave(weights: Dict[str, float], n: int) -> List[str]:
+    # Tourniquet pondéré lissé : n unités réparties au prorata des poids, régulièrement entrelacées
+    total = sum(weights.values())
+    current = dict.fromkeys(weights, 0.0)
+    order = []
+    for _ in range(n):
+        for key, weight in weights.items():
+            current[key] += weight
+        best = max(current, key=current.get)
+        current[best] -= total
+        order.append(best)
+    return order
+
+
+def split_professor(prof: Professor, weights: Dict[str, int], num_days: int, slots_per_day: int,
+                    max_per_day: int = max_defenses_per_day) -> Dict[str, Tuple[List[int], List[int]]]:
+    """Parts (créneaux, plafond par jour) d'un enseignant partagé entre les campus de `weights`."""
+    total_slots = num_days * slots_per_day
+    by_day = [[] for _ in range(num_days)]
+    for slot in sorted(set(prof.availability)):
+        if 0 <= slot < total_slots:
+            by_day[slot // slots_per_day].append(slot)
+
+    # Unités de plafond journalier, puis créneaux de chaque jour au prorata des unités reçues
+    units = [day for day, slots in enumerate(by_day) for _ in range(min(max_per_day, len(slots)))]
+    caps = {campus: [0] * num_days for campus in weights}
+    for day, campus in zip(units, _interleave(weights, len(units))):
+        caps[campus][day] += 1
+    slots = {campus: [] for campus in weights}
+    for day, day_slots in enumerate(by_day):
+        day_weights = {campus: caps[campus][day] for campus in weights if caps[campus][day]}
+        for slot, campus in zip(day_slots, _interleave(day_weights, len(day_slots)) if day_weights else ()):
+            slots[campus].append(slot)
+    return {campus: (slots[campus], caps[campus]) for campus in weights}
+
+
+def plan_shards(professors: List[Professor], students: List[Student], rooms: List[Room], num_days: int,
+                slots_per_day: int, max_per_day: int = max_defenses_per_day) -> ShardPlan:
+    campuses = list(dict.fromkeys([room.campus for room in rooms] + [student.campus for student in students]))
+    students_by_campus = defaultdict(list)
+    for student in students:
+        students_by_campus[student.campus].append(student)
+    rooms_by_campus = defaultdict(list)
+    for room in rooms:
+        rooms_by_campus[room.campus].append(room)
+
+    # Rattachement : campus des étudiants encadrés, sinon tous les campus où ses spécialités sont demandées,
+    # sinon tous les campus qui ont des étudiants (un président peut siéger partout)
+    homes: Dict[int, Dict[str, int]] = {prof.id: Counter() for prof in professors}
+    for student in students:
+        if student.supervisor_id in homes:
+            homes[student.supervisor_id][student.campus] += 1
+    field_demand = defaultdict(Counter)
+    for student in students:
+        field_demand[normalize(student.field)][student.campus] += 1
+    for prof in professors:
+        if not homes[prof.id] and campuses:
+            for specialty in dict.fromkeys(map(normalize, prof.specialties)):
+                homes[prof.id].update(field_demand[specialty])
+            if not homes[prof.id]:
+                homes[prof.id].update({campus: len(students_by_campus[campus]) for campus in campuses
+                                       if students_by_campus[campus]})
+
+    # Composantes : union des campus partageant un enseignant
+    parent = {campus: campus for campus in campuses}
+
+    def find(campus):
+        while parent[campus] != campus:
+            parent[campus] = parent[parent[campus]]
+            campus = parent[campus]
+        return campus
+
+    for weights in homes.values():
+        first, *others = weights or ['']
+        for other in others:
+            parent[find(other)] = find(first)
+    components = defaultdict(list)
+    for campus in campuses:
+        components[find(campus)].append(campus)
+
+    shard_professors = defaultdict(list)
+    daily_caps = defaultdict(dict)
+    for prof in professors:
+        weights = homes[prof.id]
+        if len(weights) <= 1:
+            shard_professors[next(iter(weights), '')].append(prof)
+            continue
+        for campus, (slots, caps) in split_professor(prof, weights, num_days, slots_per_day,
+                                                     max_per_day).items():
+            shard_professors[campus].append(replace(prof, availability=slots))
+            daily_caps[campus][prof.id] = caps
+
+    shards = [Shard(campus, shard_professors[campus], students_by_campus[campus], rooms_by_campus[campus],
+                    daily_caps[campus]) for campus in campuses]
+    return ShardPlan(shards, list(components.values()),
+                     {prof_id: dict(weights) for prof_id, weights in homes.items()})
+
+
+_instance = None
+
+
+def _init_worker(instance, registry=None):
+    # Registre des règles du parent : un processus démarré par 'spawn' ne connaît que les règles intégrées
+    global _instance
+    _instance = instance
+    if registry is not None:
+        constraints.install(registry)
+
+
+def _solve_shard(shard: Shard) -> List[Defense]:
+    engine, selection, num_days, slots_per_day, seed, iterations, time_limit, relaxed, closed = _instance
+    if not shard.students or not shard.rooms:
+        return []
+    index, room_schedule = build_schedule_state(shard.professors, shard.rooms, num_days, slots_per_day,
+                                                relaxed=relaxed, closed_rooms=closed)
+    for prof_id, caps in shard.daily_caps.items():
+        index.limit_daily(prof_id, caps)
+    defenses = engines[engine](shard.professors, shard.students, shard.rooms, index, room_schedule,
+                               selection=selection)
+    if time_limit <= 0:
+        return defenses
+    search = LocalSearch(shard.professors, shard.students, shard.rooms, index, room_schedule, defenses, seed=seed)
+    return search.run(iterations, time_limit)
+
+
+def _reconcile(component: Tuple[List[Professor], List[Student], List[Room], List[Defense]]) -> List[Defense]:
+    _, _, num_days, slots_per_day, seed, iterations, time_limit, relaxed, closed = _instance
+    professors, students, rooms, defenses = component
+    index, room_schedule = build_schedule_state(professors, rooms, num_days, slots_per_day, defenses, relaxed,
+                                                closed)
+    search = LocalSearch(professors, students, rooms, index, room_schedule, defenses, seed=seed)
+    return search.run(iterations, time_limit)
+
+
+def _map(function, items: Sequence, instance, workers: int) -> list:
+    if workers <= 1 or len(items) <= 1:
+        _init_worker(instance)
+        return [function(item) for item in items]
+    with ProcessPoolExecutor(max_workers=min(workers, len(items)), initializer=_init_worker,
+                             initargs=(instance, constraints.rules)) as executor:
+        return list(executor.map(function, items))
+
+
+def schedule_sharded(engine: str, professors: List[Professor], students: List[Student], rooms: List[Room],
+                     num_days: int, slots_per_day: int, workers: Optional[int] = None, seed: int = 0,
+                     local_search_iterations: int = 10000,
+                     local_search_time_limit: float = 5,
+                     selection: str = 'rank', relaxed: Iterable[str] = (),
+                     closed_rooms: Optional[Dict[int, Iterable[int]]] = None) -> Tuple[List[Defense], ShardPlan]:
+    """Planifie chaque campus en parallèle puis coordonne les enseignants partagés ; renvoie aussi le découpage."""
+    profiler = profiling.active
+    workers = workers or os.cpu_count() or 1
+    instance = (engine, selection, num_days, slots_per_day, seed, local_search_iterations, local_search_time_limit,
+                tuple(relaxed), closed_rooms)
+    with profiler.phase('sharding.plan'):
+        plan = plan_shards(professors, students, rooms, num_days, slots_per_day)
+    profiler.count('sharding.shards', len(plan.shards))
+    profiler.count('sharding.components', len(plan.components))
+    profiler.count('sharding.shared_professors', len(plan.shared_professors))
+
+    # Plus gros campus d'abord, pour équilibrer les processus
+    shards = sorted(plan.shards, key=lambda shard: len(shard.students), reverse=True)
+    with profiler.phase('sharding.shards'):
+        results = _map(_solve_shard, shards, instance, workers)
+    by_campus = {shard.campus: defenses for shard, defenses in zip(shards, results)}
+
+    defenses: List[Defense] = []
+    coordinated = []
+    professors_by_campus = defaultdict(list)
+    for prof in professors:
+        for campus in plan.homes[prof.id]:
+            professors_by_campus[campus].append(prof)
+    shards_by_campus = {shard.campus: shard for shard in plan.shards}
+    for component in plan.components:
+        component_defenses = [defense for campus in component for defense in by_campus[campus]]
+        if len(component) == 1 or local_search_time_limit <= 0:
+            defenses.extend(component_defenses)
+            continue
+        # Enseignants de la composante avec leurs disponibilités complètes
+        component_professors = list({prof.id: prof for campus in component
+                                     for prof in professors_by_campus[campus]}.values())
+        coordinated.append((component_professors,
+                            [student for campus in component for student in shards_by_campus[campus].students],
+                            [room for campus in component for room in shards_by_campus[campus].rooms],
+                            component_defenses))
+    coordinated.sort(key=lambda component: len(component[1]), reverse=True)
+    with profiler.phase('sharding.reconcile'):
+        for component_defenses in _map(_reconcile, coordinated, instance, workers):
+            defenses.extend(component_defenses)
+    return defenses, plan
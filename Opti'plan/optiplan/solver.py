@@ -0,0 +1,228 @@
+"""Mode exact : affectation étudiant / créneau / jury / salle par programmation par contraintes.
+
+Le modèle est résolu avec OR-Tools CP-SAT (`pip install ortools`) dans une
+limite de temps, en partant du planning de l'heuristique comme solution
+initiale. L'objectif est de maximiser le nombre de soutenances programmées ;
+le statut OPTIMAL prouve qu'aucune affectation ne fait mieux.
+
+Variables, pour chaque étudiant s et créneau t où l'encadreur est disponible :
+  y[s, t]     soutenance de s au créneau t
+  p[s, t, k]  l'enseignant k préside (admis par les règles de président)
+  e[s, t, k]  l'enseignant k examine (admis par les règles d'examinateur)
+Contraintes : au plus une soutenance par étudiant, un président et un
+examinateur par soutenance, aucun enseignant sur deux jurys au même créneau,
+les règles d'occupation par enseignant et par jour (`SlotRule.constrain` :
+au plus `max_per_day` soutenances…), au plus une soutenance par salle et par
+créneau. Les règles sont celles du registre `constraints.rules`, hors
+`relaxed`. Les salles d'un même campus étant
+interchangeables, la capacité est comptée par campus et les salles sont
+attribuées après la résolution, parmi les salles ouvertes du créneau
+(`closed_rooms` : créneaux fermés par salle).
+
+Solution initiale : le planning de l'heuristique, vérifié par
+`optiplan.validation`, est donné comme indication complète (toutes les
+variables, à 0 hors du planning). S'il atteint déjà la borne triviale
+(étudiants programmables, capacité des salles), il est optimal et rendu
+sans résolution. Le prétraitement de CP-SAT est désactivé : sur ce modèle
+(contraintes « au plus un » sur des booléens), il occupait l'essentiel
+d'une limite de quelques secondes avant que l'indication ne soit seulement
+chargée ; sans lui, la recherche part aussitôt de l'indication. Si aucune
+solution n'est trouvée dans le temps imparti, l'indication est rendue
+(statut FEASIBLE). CP-SAT explore en parallèle avec `num_workers` fils de
+recherche, un par cœur par défaut.
+
+Taille : une variable par (étudiant, créneau où l'encadreur est libre) et
+par candidat président ou examinateur à ce créneau, soit de l'ordre de
+étudiants x créneaux x candidats (environ 75 000 booléens pour 99 étudiants
+sur 40 créneaux avec une trentaine de candidats par créneau). Le mode exact
+convient à quelques centaines d'étudiants ; au-delà, s'en tenir aux
+heuristiques et à l'amélioration locale (`stats['variables']` donne la
+taille du modèle construit).
+"""
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from .availability import AvailabilityIndex
+from .constraints import RuleSet
+from .models import Defense, Professor, Room, Student, max_defenses_per_day
+from .validation import validate
+
+
+@dataclass
+class SolveResult:
+    defenses: List[Defense]
+    status: str  # 'OPTIMAL', 'FEASIBLE' ou 'UNKNOWN'
+    upper_bound: int  # Borne supérieure prouvée du nombre de soutenances
+    hint_used: bool = False  # Vrai si la solution initiale a été conservée telle quelle
+    stats: Dict[str, float] = field(default_factory=dict)
+
+
+def _stop_at_bound(cp_model, bound: int):
+    class StopAtBound(cp_model.CpSolverSolutionCallback):
+        # Arrête la recherche dès que la borne triviale est atteinte
+        def on_solution_callback(self):
+            if self.ObjectiveValue() >= bound:
+                self.StopSearch()
+
+    return StopAtBound()
+
+
+def solve_cpsat(professors: List[Professor], students: List[Student], rooms: List[Room], num_days: int,
+                slots_per_day: int, hint: Optional[List[Defense]] = None, time_limit: float = 60.0,
+                max_per_day: int = max_defenses_per_day, num_workers: Optional[int] = None,
+                relaxed: Iterable[str] = (), closed_rooms: Optional[Dict[int, Iterable[int]]] = None
+                ) -> SolveResult:
+    try:
+        from ortools.sat.python import cp_model
+    except ImportError as exc:
+        raise ImportError("Le mode exact nécessite OR-Tools : pip install ortools") from exc
+
+    rules = RuleSet(professors, relaxed)
+    index = AvailabilityIndex(professors, rooms, num_days, slots_per_day, max_per_day, rules)
+    closed = {(room_id, slot) for room_id, slots in (closed_rooms or {}).items() for slot in slots}
+    available = index.available
+    professors_by_id = {prof.id: prof for prof in professors}
+    all_rows = index.rows(prof.id for prof in professors)
+
+    model = cp_model.CpModel()
+    y = {}
+    president_vars = {}
+    examiner_vars = {}
+    jury_vars = {}
+    supervisor_of = {}
+    prof_slot_load = defaultdict(list)
+    slot_load = defaultdict(list)  # (campus, créneau) -> soutenances
+    campus_rooms = defaultdict(list)
+    for room in rooms:
+        campus_rooms[room.campus].append(room)
+    # Salles ouvertes par (campus, créneau)
+    open_rooms = {(campus, slot): [room for room in campus_list if (room.id, slot) not in closed]
+                  for campus, campus_list in campus_rooms.items() for slot in range(index.total_slots)}
+    # Avec un seul campus, toutes les salles sont ouvertes à tous les étudiants
+    single_campus = len(campus_rooms) <= 1
+    campus_of = {}
+
+    for student in students:
+        supervisor = professors_by_id.get(student.supervisor_id)
+        campus = next(iter(campus_rooms), '') if single_campus else student.campus
+        if supervisor is None or campus not in campus_rooms:
+            continue
+        campus_of[student.id] = campus
+        supervisor_row = index.prof_row[supervisor.id]
+        president_rows, examiner_rows = (
+            [k for k in rules.rows(rules.group(role, student, supervisor), all_rows).tolist() if k != supervisor_row]
+            for role in ('president', 'examiner'))
+        supervisor_of[student.id] = supervisor.id
+
+        student_vars = []
+        for slot in range(index.total_slots):
+            if not available[supervisor_row, slot] or not open_rooms[campus, slot]:
+                continue
+            presidents = [k for k in president_rows if available[k, slot]]
+            examiners = [k for k in examiner_rows if available[k, slot]]
+            if not presidents or not examiners:
+                continue
+
+            scheduled = model.NewBoolVar(f"y_{student.id}_{slot}")
+            y[student.id, slot] = scheduled
+            student_vars.append(scheduled)
+            slot_load[campus, slot].append(scheduled)
+            prof_slot_load[supervisor_row, slot].append(scheduled)
+
+            jury = []
+            for prefix, rows, variables in (('p', presidents, president_vars), ('e', examiners, examiner_vars)):
+                chosen = []
+                for k in rows:
+                    var = model.NewBoolVar(f"{prefix}_{student.id}_{slot}_{k}")
+                    variables[student.id, slot, k] = var
+                    prof_slot_load[k, slot].append(var)
+                    chosen.append((k, var))
+                model.Add(sum(var for _, var in chosen) == scheduled)
+                jury.append(chosen)
+            jury_vars[student.id, slot] = jury
+
+        if student_vars:
+            model.AddAtMostOne(student_vars)
+
+    # Pas de double réservation d'un enseignant ; règles d'occupation (plafond journalier…) par enseignant et jour
+    prof_days = set()
+    for (k, slot), load in prof_slot_load.items():
+        if len(load) > 1:
+            model.AddAtMostOne(load)
+        prof_days.add((k, slot // slots_per_day))
+    for k, day in sorted(prof_days):
+        loads = [prof_slot_load.get((k, slot), []) for slot in range(day * slots_per_day, (day + 1) * slots_per_day)]
+        for rule in rules.slot_rules:
+            rule.constrain(model, loads, index.max_per_day)
+
+    # Une soutenance par salle et par créneau
+    for (campus, slot), load in slot_load.items():
+        if len(load) > len(open_rooms[campus, slot]):
+            model.Add(sum(load) <= len(open_rooms[campus, slot]))
+
+    # Bornes triviales (capacité des salles, étudiants programmables), redondantes mais utiles à la preuve
+    schedulable = len({student_id for student_id, _ in y})
+    trivial_bound = min(schedulable, sum(map(len, open_rooms.values())))
+    model.Add(sum(y.values()) <= trivial_bound)
+
+    model.Maximize(sum(y.values()))
+
+    # Solution initiale : le planning de l'heuristique, s'il respecte le modèle ; indication complète (toutes
+    # les variables, à 0 hors du planning)
+    hint_valid = False
+    stats = {'wall_time': 0.0, 'variables': len(y) + len(president_vars) + len(examiner_vars)}
+    if hint:
+        hinted = set()
+        for defense in hint:
+            keys = [(y, (defense.student_id, defense.time_slot)),
+                    (president_vars, (defense.student_id, defense.time_slot, index.prof_row.get(defense.president_id))),
+                    (examiner_vars, (defense.student_id, defense.time_slot, index.prof_row.get(defense.examiner_id)))]
+            if all(key in variables for variables, key in keys):
+                hinted.update(variables[key].Index() for variables, key in keys)
+        hint_valid = (len(hinted) == 3 * len(hint)
+                      and validate(hint, professors, students, rooms, num_days, slots_per_day, max_per_day,
+                                   relaxed, closed_rooms).valid)
+        if hint_valid and len(hint) >= trivial_bound:
+            # La borne triviale est atteinte : l'indication est optimale, inutile de résoudre
+            return SolveResult(list(hint), 'OPTIMAL', trivial_bound, True, stats)
+        for variables in (y, president_vars, examiner_vars):
+            for var in variables.values():
+                model.AddHint(var, var.Index() in hinted)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.num_workers = stats['workers'] = num_workers or os.cpu_count() or 1
+    # Sans prétraitement, la recherche part aussitôt de l'indication (voir l'en-tête du module)
+    solver.parameters.cp_model_presolve = False
+    status = solver.Solve(model, _stop_at_bound(cp_model, trivial_bound))
+    status_name = solver.StatusName(status)
+    stats['wall_time'] = solver.WallTime()
+
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        # Aucune solution trouvée dans le temps imparti : l'indication, valide, reste une solution
+        if hint_valid:
+            return SolveResult(list(hint), 'FEASIBLE', trivial_bound, True, stats)
+        return SolveResult([], status_name, trivial_bound, False, stats)
+
+    defenses = []
+    room_usage = defaultdict(int)
+    for (student_id, slot), scheduled in sorted(y.items(), key=lambda item: (item[0][1], item[0][0])):
+        if not solver.Value(scheduled):
+            continue
+        presidents, examiners = jury_vars[student_id, slot]
+        president_row = next(k for k, var in presidents if solver.Value(var))
+        examiner_row = next(k for k, var in examiners if solver.Value(var))
+        campus = campus_of[student_id]
+        room = open_rooms[campus, slot][room_usage[campus, slot]]
+        room_usage[campus, slot] += 1
+        defenses.append(Defense(student_id, slot, room.id, int(index.prof_ids[president_row]),
+                                int(index.prof_ids[examiner_row]), supervisor_of[student_id]))
+
+    upper_bound = min(int(solver.BestObjectiveBound()), trivial_bound)
+    if len(defenses) == upper_bound:
+        status_name = 'OPTIMAL'
+    if hint_valid and len(hint) > len(defenses):
+        return SolveResult(list(hint), status_name, upper_bound, True, stats)
+    return SolveResult(defenses, status_name, upper_bound, False, stats)
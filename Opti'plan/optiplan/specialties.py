@@ -0,0 +1,58 @@
+"""Index inversé spécialité → enseignants, construit une seule fois.
+
+Les noms de spécialité (colonne `Speciality` des enseignants) et de filière
+(colonne `Filière` des étudiants) sont comparés sous forme normalisée : sans
+accents, sans distinction de casse, espaces superflus retirés
+('Génie  Logiciel ' et 'genie logiciel' désignent la même filière). Chaque
+filière n'est résolue qu'une fois et tous ses étudiants partagent la même
+liste de spécialistes : le pré-calcul coûte O(enseignants × spécialités +
+filières) au lieu d'un test par couple étudiant × enseignant.
+
+    specialties = SpecialtyIndex(professors)
+    examiners = specialties.specialists(student.field)  # Ordre de `professors`, encadreur compris
+"""
+import unicodedata
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+from .models import Professor, Student
+
+
+@lru_cache(maxsize=None)
+def normalize(name: str) -> str:
+    """Forme de comparaison d'un nom de spécialité : sans accents ni casse, espaces réduits."""
+    decomposed = unicodedata.normalize('NFKD', name)
+    return ' '.join(''.join(char for char in decomposed if not unicodedata.combining(char)).casefold().split())
+
+
+class SpecialtyIndex:
+    def __init__(self, professors: Iterable[Professor]):
+        # Spécialité normalisée -> enseignants, dans l'ordre de `professors`, chacun une seule fois
+        self.professors: Dict[str, List[Professor]] = {}
+        for prof in professors:
+            names = {normalize(specialty) for specialty in prof.specialties}
+            for name in names:
+                self.professors.setdefault(name, []).append(prof)
+        self.fields: Dict[str, Tuple[List[Professor], FrozenSet[int]]] = {}
+
+    def _field(self, field: str) -> Tuple[List[Professor], FrozenSet[int]]:
+        entry = self.fields.get(field)
+        if entry is None:
+            specialists = self.professors.get(normalize(field), [])
+            entry = self.fields[field] = (specialists, frozenset(prof.id for prof in specialists))
+        return entry
+
+    def specialists(self, field: str) -> List[Professor]:
+        """Spécialistes de la filière ; liste partagée, à ne pas modifier."""
+        return self._field(field)[0]
+
+    def ids(self, field: str) -> FrozenSet[int]:
+        return self._field(field)[1]
+
+    def is_specialist(self, prof_id: int, field: str) -> bool:
+        return prof_id in self._field(field)[1]
+
+    def examiner_count(self, student: Student) -> int:
+        """Examinateurs possibles de l'étudiant : spécialistes de sa filière, hors encadreur."""
+        specialists, ids = self._field(student.field)
+        return len(specialists) - (student.supervisor_id in ids)
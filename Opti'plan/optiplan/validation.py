@@ -0,0 +1,299 @@
+"""Vérification et notation d'un planning, indépendantes des heuristiques.
+
+`validate` reprend un planning quelconque (liste de `Defense`) à partir des
+seules données d'entrée : aucun état des heuristiques n'est réutilisé. Les
+soutenances sont converties en colonnes NumPy (une par champ) et chaque
+contrôle porte sur toutes les soutenances à la fois, par tri, comptage ou
+lecture de masque, si bien qu'un planning de 100 000 soutenances se vérifie
+en une fraction de seconde :
+
+- contrôles structurels (`checks`) : identifiants inconnus, créneau hors de
+  la session, étudiant programmé deux fois, encadreur différent de celui de
+  l'étudiant, enseignant dans deux rôles, salle ou enseignant réservé deux
+  fois au même créneau, salle fermée (`closed_rooms`), enseignant
+  indisponible, salle hors du campus ;
+- règles du registre `constraints.rules`, hors `relaxed` : masques de
+  `RuleSet` pour les rôles du jury (grade du président, examinateur
+  spécialiste…) ; pour les règles d'occupation (plafond journalier…), une
+  soutenance est en faute si son créneau serait bloqué par la règle sans
+  elle. Les règles dures non `relaxable` rendent le planning invalide ; les
+  règles `relaxable` (examinateur non spécialiste de la passe de rattrapage)
+  et les règles souples sont tolérées et pénalisées avec leur poids.
+
+Indicateurs de qualité (`metrics`) : soutenances programmées, charge des
+jurys (maximum, écart-type sur tous les enseignants), trous dans la journée
+d'un enseignant (créneaux libres entre sa première et sa dernière
+soutenance) et changements de salle d'un enseignant entre deux soutenances
+successives d'un même jour, en totaux et rapportés aux enseignants en jury.
+`score` les résume (plus haut = meilleur) : trous et changements de salle y
+entrent par enseignant, pour qu'ils pèsent autant sur une petite session que
+sur une grande face au nombre de soutenances programmées.
+
+    validation = validate(scheduler.defenses, professors, students, rooms, num_days=5, slots_per_day=8)
+    if not validation.valid:
+        print(validation.counts)
+"""
+from dataclasses import dataclass, field
+from operator import attrgetter
+from itertools import chain
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .constraints import Rule, RuleSet, roles, rules
+from .models import Defense, Professor, Room, Student, max_defenses_per_day
+
+checks = {
+    'unknown_reference': "étudiant, enseignant ou salle inconnu",
+    'slot_out_of_range': "créneau hors de la session",
+    'student_twice': "étudiant programmé plusieurs fois",
+    'wrong_supervisor': "encadreur différent de celui de l'étudiant",
+    'jury_overlap': "même enseignant dans deux rôles du jury",
+    'room_double_booking': "salle réservée deux fois au même créneau",
+    'room_closed': "salle fermée au créneau",
+    'professor_double_booking': "enseignant sur deux soutenances au même créneau",
+    'unavailable': "enseignant indisponible au créneau",
+    'wrong_campus': "salle hors du campus de l'étudiant",
+}
+
+# Poids des indicateurs dans `score` (le nombre de soutenances programmées compte pour 1 chacune) ; trous et
+# changements de salle par enseignant en jury : les totaux croissent avec la taille de la session
+metric_weights = {'professor_load_stddev': 1.0, 'gaps_per_professor': 1.0, 'room_changes_per_professor': 1.0}
+
+_jury_attributes = ('president_id', 'examiner_id', 'supervisor_id')
+
+
+@dataclass
+class Validation:
+    # Contrôle ou règle -> positions (dans la liste validée) des soutenances fautives
+    violations: Dict[str, np.ndarray] = field(default_factory=dict)
+    # Règles tolérées (relâchables ou souples) -> positions des soutenances qui les enfreignent
+    tolerated: Dict[str, np.ndarray] = field(default_factory=dict)
+    penalties: Dict[str, float] = field(default_factory=dict)  # Règle tolérée -> violations x poids
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def valid(self) -> bool:
+        return not any(positions.size for positions in self.violations.values())
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        """Nombre de soutenances fautives par contrôle ou règle dure (contrôles sans faute omis)."""
+        return {name: int(positions.size) for name, positions in self.violations.items() if positions.size}
+
+    @property
+    def score(self) -> float:
+        """Soutenances programmées, moins les indicateurs pondérés (`metric_weights`) et les pénalités."""
+        return (self.metrics.get('scheduled', 0)
+                - sum(weight * self.metrics.get(name, 0) for name, weight in metric_weights.items())
+                - sum(self.penalties.values()))
+
+    def describe(self) -> List[Tuple[str, int]]:
+        """(libellé, nombre) des contrôles et règles enfreints, pour le rapport."""
+        return [(label(name), count) for name, count in self.counts.items()]
+
+    def summary(self) -> Dict:
+        """Résumé sérialisable en JSON (sortie .json de la ligne de commande, réponses du service)."""
+        return {
+            'valid': self.valid,
+            'violations': self.counts,
+            'tolerated': {name: int(positions.size) for name, positions in self.tolerated.items() if positions.size},
+            'metrics': self.metrics,
+            'score': round(self.score, 4),
+        }
+
+
+def label(name: str) -> str:
+    return checks[name] if name in checks else rules[name].label if name in rules else name
+
+
+def _column(defenses: Sequence[Defense], attribute: str) -> np.ndarray:
+    return np.fromiter(map(attrgetter(attribute), defenses), dtype=np.int64, count=len(defenses))
+
+
+def _lookup(ids: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Positions dans `ids` des identifiants `values`, et masque des identifiants connus
+    if not ids.size:
+        return np.zeros_like(values), np.zeros(values.shape, dtype=bool)
+    order = np.argsort(ids, kind='stable')
+    sorted_ids = ids[order]
+    found = np.minimum(np.searchsorted(sorted_ids, values), sorted_ids.size - 1)
+    return order[found], sorted_ids[found] == values
+
+
+def _duplicated(*keys: np.ndarray) -> np.ndarray:
+    # Masque des entrées dont la clé (combinaison de colonnes) apparaît plus d'une fois
+    if not keys[0].size:
+        return np.zeros(0, dtype=bool)
+    key = np.ravel_multi_index(keys, [int(column.max()) + 1 for column in keys]) if len(keys) > 1 else keys[0]
+    _, inverse, counts = np.unique(key, return_inverse=True, return_counts=True)
+    return counts[inverse] > 1
+
+
+def _positions(mask: np.ndarray, index: np.ndarray) -> np.ndarray:
+    # Positions (dans la liste validée) des soutenances retenues par `mask`, une seule fois chacune
+    return np.unique(index[mask])
+
+
+def validate(defenses: Iterable[Defense], professors: Sequence[Professor], students: Sequence[Student],
+             rooms: Sequence[Room], num_days: int, slots_per_day: int, max_per_day: int = max_defenses_per_day,
+             relaxed: Iterable[str] = (), closed_rooms: Optional[Dict[int, Iterable[int]]] = None) -> Validation:
+    """Contrôles, règles et indicateurs du planning `defenses` pour les données d'entrée données.
+
+    `closed_rooms` : créneaux fermés par salle (`Scheduler.close_room`).
+    """
+    defenses = list(defenses)
+    total_slots = num_days * slots_per_day
+    ruleset = RuleSet(professors, relaxed, soft=True)
+    result = Validation()
+    violations = result.violations
+
+    columns = {name: _column(defenses, name)
+               for name in ('student_id', 'time_slot', 'room_id', 'president_id', 'examiner_id', 'supervisor_id')}
+    student_ids = np.array([student.id for student in students], dtype=np.int64)
+    student_rows, student_known = _lookup(student_ids, columns['student_id'])
+    room_rows, room_known = _lookup(np.array([room.id for room in rooms], dtype=np.int64), columns['room_id'])
+    prof_ids = np.array([prof.id for prof in professors], dtype=np.int64)
+    role_rows = {}
+    known = student_known & room_known
+    for attribute in _jury_attributes:
+        role_rows[attribute], role_known = _lookup(prof_ids, columns[attribute])
+        known &= role_known
+    violations['unknown_reference'] = np.flatnonzero(~known)
+    slots = columns['time_slot']
+    in_range = (slots >= 0) & (slots < total_slots)
+    violations['slot_out_of_range'] = np.flatnonzero(known & ~in_range)
+
+    # Les contrôles suivants ne portent que sur les soutenances aux références connues
+    kept = np.flatnonzero(known & in_range)
+    slots = slots[kept]
+    student_rows = student_rows[kept]
+    room_rows = room_rows[kept]
+    rows = {attribute: role_rows[attribute][kept] for attribute in _jury_attributes}
+    jury = np.stack([rows[attribute] for attribute in _jury_attributes])  # Rôle x soutenance -> ligne d'enseignant
+
+    violations['student_twice'] = _positions(_duplicated(student_rows), kept)
+    supervisor_of = np.array([student.supervisor_id for student in students], dtype=np.int64)
+    violations['wrong_supervisor'] = kept[supervisor_of[student_rows] != prof_ids[rows['supervisor_id']]]
+    violations['jury_overlap'] = kept[(jury[0] == jury[1]) | (jury[0] == jury[2]) | (jury[1] == jury[2])]
+    violations['room_double_booking'] = _positions(_duplicated(room_rows, slots), kept)
+    room_open = np.ones((len(rooms), total_slots), dtype=bool)
+    room_row = {room.id: row for row, room in enumerate(rooms)}
+    for room_id, closed in (closed_rooms or {}).items():
+        if room_id in room_row:
+            room_open[room_row[room_id], [slot for slot in closed if 0 <= slot < total_slots]] = False
+    violations['room_closed'] = kept[~room_open[room_rows, slots]]
+
+    # Une entrée par rôle tenu : (enseignant, créneau, salle, soutenance)
+    entry_rows = jury.ravel()
+    entry_slots = np.tile(slots, len(_jury_attributes))
+    entry_defenses = np.tile(kept, len(_jury_attributes))
+    entry_rooms = np.tile(room_rows, len(_jury_attributes))
+    violations['professor_double_booking'] = _positions(_duplicated(entry_rows, entry_slots), entry_defenses)
+    available = np.zeros((len(professors), total_slots), dtype=bool)
+    lengths = [len(prof.availability) for prof in professors]
+    availability = np.fromiter(chain.from_iterable(prof.availability for prof in professors), dtype=np.int64,
+                               count=sum(lengths))
+    availability_rows = np.repeat(np.arange(len(professors)), lengths)
+    inside = (availability >= 0) & (availability < total_slots)
+    available[availability_rows[inside], availability[inside]] = True
+    violations['unavailable'] = _positions(~available[entry_rows, entry_slots], entry_defenses)
+    campuses = [room.campus for room in rooms]
+    if len(set(campuses)) > 1:
+        student_campus = np.array([student.campus for student in students], dtype=object)
+        violations['wrong_campus'] = kept[student_campus[student_rows] != np.array(campuses, dtype=object)[room_rows]]
+    else:
+        violations['wrong_campus'] = np.zeros(0, dtype=np.int64)
+
+    _check_role_rules(result, ruleset, kept, students, student_rows, professors, rows)
+    _check_slot_rules(result, ruleset, entry_rows, entry_slots, entry_defenses, len(professors), num_days,
+                      slots_per_day, max_per_day)
+    result.metrics = _metrics(np.unique(student_rows).size, entry_rows, entry_slots, entry_rooms, len(professors),
+                              num_days, slots_per_day)
+    return result
+
+
+def _record(result: Validation, rule: Rule, positions: np.ndarray) -> None:
+    # Règle dure : violation ; règle relâchable ou souple : tolérée et pénalisée
+    if rule.hard and not rule.relaxable:
+        result.violations[rule.name] = positions
+    else:
+        result.tolerated[rule.name] = positions
+        result.penalties[rule.name] = positions.size * rule.weight
+
+
+def _check_role_rules(result: Validation, ruleset: RuleSet, kept: np.ndarray, students: Sequence[Student],
+                      student_rows: np.ndarray, professors: Sequence[Professor],
+                      rows: Dict[str, np.ndarray]) -> None:
+    # Par règle : une clé par soutenance (numérotée), un masque par clé distincte, puis une lecture de masque
+    # pour toutes les soutenances à la fois
+    pairs = [(students[student_row], professors[supervisor_row])
+             for student_row, supervisor_row in zip(student_rows.tolist(), rows['supervisor_id'].tolist())]
+    for role in roles:
+        members = rows[f"{role}_id"]
+        for rule in ruleset.role_rules[role]:
+            codes: Dict[Hashable, int] = {}
+            keys = np.fromiter((codes.setdefault(rule.key(student, supervisor), len(codes))
+                                for student, supervisor in pairs), dtype=np.int64, count=len(pairs))
+            if not codes:
+                _record(result, rule, np.zeros(0, dtype=np.int64))
+                continue
+            masks = np.stack([ruleset.rule_mask(rule, key) for key in codes])
+            _record(result, rule, kept[~masks[keys, members]])
+
+
+def _check_slot_rules(result: Validation, ruleset: RuleSet, entry_rows: np.ndarray, entry_slots: np.ndarray,
+                      entry_defenses: np.ndarray, num_professors: int, num_days: int, slots_per_day: int,
+                      max_per_day: int) -> None:
+    # Occupations par (enseignant, jour) ; une soutenance est en faute si, retirée, son créneau serait bloqué
+    if not ruleset.slot_rules:
+        return
+    busy = np.zeros((num_professors * num_days, slots_per_day), dtype=bool)
+    days, offsets = np.divmod(entry_slots, slots_per_day)
+    busy[entry_rows * num_days + days, offsets] = True
+    active = np.flatnonzero(busy.any(axis=1))
+    busy = busy[active]
+    count = busy.sum(axis=1)
+    # Ligne de `busy` de chaque entrée (lignes actives triées : recherche dichotomique)
+    entry_lines = np.searchsorted(active, entry_rows * num_days + days)
+    for rule in ruleset.slot_rules:
+        faulty = np.zeros(busy.shape, dtype=bool)
+        for offset in range(slots_per_day):
+            holders = busy[:, offset]
+            if not holders.any():
+                continue
+            without = busy[holders]
+            without[:, offset] = False
+            faulty[holders, offset] = rule.blocked(without, count[holders] - 1, max_per_day)[:, offset]
+        _record(result, rule, np.unique(entry_defenses[faulty[entry_lines, offsets]]))
+
+
+def _metrics(scheduled: int, entry_rows: np.ndarray, entry_slots: np.ndarray, entry_rooms: np.ndarray,
+             num_professors: int, num_days: int, slots_per_day: int) -> Dict[str, float]:
+    load = np.bincount(entry_rows, minlength=num_professors)
+    days, offsets = np.divmod(entry_slots, slots_per_day)
+
+    # Trous : pour chaque (enseignant, jour) occupé, créneaux libres entre la première et la dernière soutenance
+    lines = entry_rows * num_days + days
+    first = np.full(num_professors * num_days, slots_per_day)
+    last = np.full(num_professors * num_days, -1)
+    np.minimum.at(first, lines, offsets)
+    np.maximum.at(last, lines, offsets)
+    per_line = np.bincount(lines, minlength=num_professors * num_days)
+    occupied = per_line > 0
+    gaps = int((last[occupied] - first[occupied] + 1 - per_line[occupied]).sum())
+
+    # Changements de salle : soutenances successives d'un même enseignant, le même jour, dans deux salles
+    order = np.lexsort((entry_slots, entry_rows))
+    same_day = lines[order][1:] == lines[order][:-1]
+    room_changes = int((same_day & (entry_rooms[order][1:] != entry_rooms[order][:-1])).sum())
+    active = int(np.count_nonzero(load))
+    return {
+        'scheduled': scheduled,
+        'max_professor_load': int(load.max()) if load.size else 0,
+        'professor_load_stddev': float(load.std()) if load.size else 0.0,
+        'gaps': gaps,
+        'gaps_per_professor': gaps / active if active else 0.0,
+        'room_changes': room_changes,
+        'room_changes_per_professor': room_changes / active if active else 0.0,
+    }
@@ -0,0 +1,114 @@
+import pytest
+
+from optiplan import Defense, Professor, Room
+from optiplan.availability import AvailabilityIndex, BalancedQueues, CandidateQueues, RoomSchedule
+
+# Deux jours de 6 créneaux : un jour peut dépasser le plafond de 4 soutenances
+num_days, slots_per_day = 2, 6
+
+
+@pytest.fixture
+def index() -> AvailabilityIndex:
+    professors = [Professor(i, f"Enseignant {i}", 'MC', ['Informatique'], list(range(num_days * slots_per_day)))
+                  for i in range(1, 7)]
+    return AvailabilityIndex(professors, [Room(1, "Salle 100"), Room(2, "Salle 101")], num_days, slots_per_day)
+
+
+def test_commit_and_release_restore_the_index(index):
+    defense = Defense(1, 5, 1, 2, 3, 1)
+    index.commit(defense)
+    for prof_id in (1, 2, 3):
+        assert not index.is_free(prof_id, 5)
+        assert index.is_available(prof_id, 5)
+    assert index.is_free(4, 5)
+    assert index.load[index.rows([1, 2, 3])].tolist() == [1, 1, 1]
+    assert index.day_count[index.prof_row[1], 0] == 1
+    assert not index.is_room_free(1, 5)
+    assert index.first_free_room(5) == 2
+
+    index.release(defense)
+    assert index.is_free(1, 5) and index.is_room_free(1, 5)
+    assert not index.busy.any() and not index.room_busy.any()
+    assert not index.load.any() and not index.day_count.any()
+
+
+def test_daily_cap_blocks_the_rest_of_the_day(index):
+    for slot in range(index.max_per_day):
+        index.commit(Defense(slot + 1, slot, 1, 2, 3, 1))
+    # Plafond atteint pour 1, 2 et 3 : les créneaux libres du jour sont fermés, le lendemain reste ouvert
+    assert index.day_count[index.prof_row[1], 0] == index.max_per_day
+    assert not index.is_free(1, 5) and index.busy_cause(1, 5) == 'daily_cap'
+    assert index.is_free(1, slots_per_day)
+    assert index.free_among(index.rows([1, 4]), 5).tolist() == [4]
+    index.release(Defense(1, 0, 1, 2, 3, 1))
+    assert index.is_free(1, 5)
+
+
+def test_copy_is_independent(index):
+    clone = index.copy()
+    clone.commit(Defense(1, 0, 1, 2, 3, 1))
+    assert index.is_free(1, 0) and index.is_room_free(1, 0)
+    assert not clone.is_free(1, 0)
+
+
+def test_room_schedule_reuses_released_positions():
+    schedule = RoomSchedule([Room(1, "Salle 100"), Room(2, "Salle 101")], num_days * slots_per_day)
+    first, second = Defense(1, 0, 1, 2, 3, 1), Defense(2, 0, 2, 5, 6, 4)
+    schedule.place(first)
+    schedule.place(second)
+    assert schedule.get(1, 0) == first and schedule.used_count() == 2
+    assert schedule.clear(1, 0) == first and schedule.clear(1, 0) is None
+    assert 0 in schedule.free_slots(1)
+    third = Defense(3, 4, 1, 2, 3, 1)
+    schedule.place(third)
+    assert len(schedule.defenses) == 2
+    assert schedule.occupants(0) == [second] and schedule.get(1, 4) == third
+    assert schedule.as_dict()[1][4] == third and schedule.as_dict()[2][1] is None
+
+
+def test_domain_classes_are_slotted():
+    prof = Professor(1, "Enseignant 1", 'MC', ['Informatique'], [0])
+    for item in (prof, Room(1, "Salle 100"), Defense(1, 0, 1, 2, 3, 1)):
+        assert not hasattr(item, '__dict__')
+
+
+def test_candidate_queues_follow_the_group_order(index):
+    queues = CandidateQueues(index, {'presidents': index.rows([3, 1, 2])})
+    assert queues.first_free('presidents', 0) == 3
+    assert queues.free('presidents', 0, limit=2) == [3, 1]
+    assert queues.first_free('presidents', 0, exclude=[3]) == 1
+    defense = Defense(1, 0, 1, 3, 4, 5)
+    index.commit(defense)
+    assert queues.first_free('presidents', 0) == 1
+    # Libéré, l'enseignant retrouve sa place dans la file du créneau
+    index.release(defense)
+    assert queues.first_free('presidents', 0) == 3
+
+
+def test_candidate_queues_restore_the_day_below_the_cap(index):
+    queues = CandidateQueues(index, {'presidents': index.rows([1, 2])})
+    day = [Defense(slot + 1, slot, 1, 4, 5, 1) for slot in range(index.max_per_day)]
+    for defense in day:
+        index.commit(defense)
+    # Enseignant 1 au plafond : retiré de la file du créneau 5, où il n'est pourtant pas pris
+    assert queues.first_free('presidents', 5) == 2
+    index.release(day[0])
+    assert queues.first_free('presidents', 5) == 1
+
+
+def test_balanced_queues_pick_the_least_loaded(index):
+    queues = BalancedQueues(index, {'presidents': index.rows([3, 1, 2])})
+    # Charges égales : ordre du groupe
+    assert queues.free('presidents', 0, limit=3) == [3, 1, 2]
+    index.commit(Defense(1, 6, 1, 3, 4, 5))
+    assert queues.free('presidents', 0, limit=3) == [1, 2, 3]
+    index.commit(Defense(2, 7, 1, 1, 4, 5))
+    assert queues.first_free('presidents', 0) == 2
+    assert queues.first_free('presidents', 0, exclude=[2]) == 3
+    # Occupé au créneau, puis libéré avec une charge en baisse
+    busy = Defense(3, 0, 2, 2, 4, 5)
+    index.commit(busy)
+    assert queues.first_free('presidents', 0) == 3
+    index.release(busy)
+    index.release(Defense(1, 6, 1, 3, 4, 5))
+    assert queues.free('presidents', 0, limit=3) == [3, 2, 1]
@@ -0,0 +1,66 @@
+import multiprocessing
+
+import pytest
+
+from optiplan import Professor, Room, Scheduler, Student, constraints
+from optiplan.constraints import MaxConsecutive, register
+from optiplan.multistart import multistart
+from optiplan.validation import validate
+
+
+# Un jour de 6 créneaux, une salle, quatre enseignants : sans règle, les soutenances s'enchaînent
+professors = [Professor(i, f"Enseignant {i}", 'MC', ['Informatique'], list(range(6))) for i in range(1, 5)]
+students = [Student(i, f"Étudiant {i}", 'Licence', 'Informatique', i % 4 + 1) for i in range(1, 7)]
+session = dict(professors=professors, students=students, rooms=[Room(1, "Salle 100")], num_days=1,
+               slots_per_day=6)
+
+
+@pytest.fixture
+def spawn_start_method():
+    # Démarrage 'spawn' (macOS, Windows) : les processus de calcul réimportent le paquet
+    previous = multiprocessing.get_start_method(allow_none=True)
+    multiprocessing.set_start_method('spawn', force=True)
+    yield
+    multiprocessing.set_start_method(previous, force=True)
+
+
+@pytest.fixture
+def max_consecutive():
+    registry = dict(constraints.rules)
+    register(MaxConsecutive(limit=1))
+    yield
+    constraints.install(registry)
+
+
+def test_registered_rule_applies_in_spawned_workers(spawn_start_method, max_consecutive):
+    defenses, _ = multistart('student_major', **session, starts=2, workers=2)
+    assert defenses
+    validation = validate(defenses, **session)
+    assert 'max_consecutive' in validation.violations
+    assert validation.counts.get('max_consecutive', 0) == 0
+
+
+def test_install_replaces_registry():
+    registry = dict(constraints.rules)
+    try:
+        constraints.install({'max_consecutive': MaxConsecutive()})
+        assert list(constraints.rules) == ['max_consecutive']
+    finally:
+        constraints.install(registry)
+    assert constraints.rules == registry
+
+
+@pytest.mark.parametrize('relaxed_rules, scheduled', [
+    ((), 0),
+    (('president_not_professor', 'president_level_rank', 'president_supervisor_rank'), 1),  # Défaut de source.py
+])
+def test_relaxed_president_rules(relaxed_rules, scheduled):
+    # Encadreur 'MC' et deux 'Professeur' : le jury n'est complet que présidé par un 'Professeur'
+    professors = [Professor(1, "Encadreur", 'MC', ['Informatique'], [0]),
+                  Professor(2, "Professeur 2", 'Professeur', ['Informatique'], [0]),
+                  Professor(3, "Professeur 3", 'Professeur', ['Informatique'], [0])]
+    scheduler = Scheduler(professors, [Student(1, "Étudiant 1", 'Licence', 'Informatique', 1)],
+                          [Room(1, "Salle 100")], num_days=1, slots_per_day=1, relaxed_rules=relaxed_rules)
+    defenses = scheduler.schedule(local_search=False)
+    assert len(defenses) == scheduled
+    assert all(defense.president_id in (2, 3) for defense in defenses)
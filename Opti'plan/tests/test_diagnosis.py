@@ -0,0 +1,51 @@
+from optiplan import Defense, Professor, Room, Scheduler, Student
+from optiplan.diagnosis import diagnose
+
+
+def session(defenses=(), rooms=1, supervisor_slots=(0, 1)):
+    """Deux créneaux sur un jour ; l'encadreur 1 encadre les étudiants 1 et 2, disponible sur `supervisor_slots`.
+
+    Les enseignants 2 à 10 ('MC', Informatique) sont disponibles aux deux créneaux ; les étudiants 3 et 4 sont
+    encadrés par 2 et 5.
+    """
+    professors = ([Professor(1, "Encadreur", 'MC', ['Informatique'], list(supervisor_slots))]
+                  + [Professor(i, f"Enseignant {i}", 'MC', ['Informatique'], [0, 1]) for i in range(2, 11)])
+    students = [Student(i, f"Étudiant {i}", 'Licence', 'Informatique', supervisor)
+                for i, supervisor in ((1, 1), (2, 1), (3, 2), (4, 5))]
+    scheduler = Scheduler(professors, students, [Room(i, f"Salle {i}") for i in range(1, rooms + 1)],
+                          num_days=1, slots_per_day=2)
+    scheduler.load(defenses)
+    return scheduler
+
+
+def test_placeable_student_has_no_blocking_set():
+    scheduler = session()
+    [diagnosis] = diagnose(scheduler, [scheduler.students[1]])
+    assert diagnosis.blocking == frozenset() and diagnosis.slots == [0, 1] and diagnosis.cost == 0
+
+
+def test_unknown_supervisor():
+    [diagnosis] = diagnose(session(), [Student(9, "Étudiant 9", 'Licence', 'Informatique', 99)])
+    assert diagnosis.blocking == {'unknown_supervisor'} and diagnosis.cost is None
+
+
+def test_room_and_supervisor_blocking_sets():
+    # Salle unique prise aux deux créneaux ; l'encadreur 1 siège au créneau 0
+    scheduler = session([Defense(1, 0, 1, 2, 3, 1), Defense(3, 1, 1, 4, 6, 2)])
+    [diagnosis] = diagnose(scheduler, [scheduler.students[1]])
+    assert diagnosis.counts == {'supervisor_busy': 1, 'no_room': 2}
+    assert diagnosis.blocking == {'no_room'} and diagnosis.slots == [1]
+    assert [(relaxation.kind, relaxation.slot) for relaxation in diagnosis.relaxations] == [('extra_room', 1)]
+
+
+def test_relaxation_and_blocking_set_describe_the_same_slot():
+    # Créneau 0 : encadreur déjà pris comme encadreur, aucun relâchement simple. Créneau 1 : encadreur
+    # indisponible et les deux salles prises, relâchables ; l'ensemble renvoyé est celui du créneau 1
+    scheduler = session([Defense(1, 0, 1, 2, 3, 1), Defense(3, 1, 1, 4, 6, 2), Defense(4, 1, 2, 7, 8, 5)],
+                        rooms=2, supervisor_slots=[0])
+    [diagnosis] = diagnose(scheduler, [scheduler.students[1]])
+    assert diagnosis.counts == {'supervisor_busy': 1, 'supervisor_unavailable': 1, 'no_room': 1}
+    assert diagnosis.blocking == {'supervisor_unavailable', 'no_room'} and diagnosis.slots == [1]
+    assert {relaxation.slot for relaxation in diagnosis.relaxations} == {1}
+    assert sorted(relaxation.kind for relaxation in diagnosis.relaxations) == ['extra_room', 'extra_slot']
+    assert diagnosis.cost == 4
@@ -0,0 +1,95 @@
+import csv
+import json
+from datetime import date, datetime, time
+
+import pytest
+
+from optiplan import Defense, Professor, Registry, Room, Student
+from optiplan.export import (Clock, _escape, _fold, columns, records, write_all, write_csv, write_icalendar,
+                             write_jsonl, write_xlsx)
+
+professors = [Professor(i, name, 'MC', ['Informatique'], [0, 1, 2]) for i, name in
+              ((1, "Dupont, Jean"), (2, "Benali; Amine"), (3, "Lefèvre \\ Élodie"), (4, "Ndiaye Awa"))]
+students = [Student(1, "Étudiant 1", 'Licence', 'Informatique', 1),
+            Student(2, "Chloé " + "très long nom " * 6, 'Master', 'Génie\nlogiciel', 4)]
+rooms = [Room(1, "Salle 100", 'Nord'), Room(2, "Amphi, bâtiment B", 'Nord')]
+registry = Registry(professors, students, rooms)
+# Ordre inverse : les exports trient par créneau puis par salle
+defenses = [Defense(2, 4, 1, 2, 3, 4), Defense(1, 1, 2, 2, 3, 1)]
+clock = Clock(date(2025, 6, 6), time(9, 0), 90)  # Un vendredi
+
+
+def test_clock_skips_weekends():
+    assert clock.bounds(1, 3) == (datetime(2025, 6, 6, 10, 30), datetime(2025, 6, 6, 12, 0))
+    assert clock.bounds(4, 3)[0] == datetime(2025, 6, 9, 10, 30)  # Lundi
+
+
+def test_csv_round_trip(tmp_path):
+    path = tmp_path / 'planning.csv'
+    write_csv(str(path), defenses, registry, 3, clock)
+    with open(path, encoding='utf-8', newline='') as source:
+        rows = list(csv.reader(source))
+    expected = [['' if value is None else str(value) for value in record]
+                for record in records(defenses, registry, 3, clock)]
+    assert rows == [columns] + expected
+    assert [row[columns.index('student_id')] for row in rows[1:]] == ['1', '2']
+    assert rows[2][columns.index('field')] == 'Génie\nlogiciel'
+
+
+def test_jsonl_round_trip(tmp_path):
+    path = tmp_path / 'planning.jsonl'
+    write_jsonl(str(path), defenses, registry, 3)
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == [dict(zip(columns, record))
+                                                    for record in records(defenses, registry, 3)]
+    first = json.loads(lines[0])
+    assert (first['day'], first['slot'], first['start'], first['room']) == (1, 2, None, "Amphi, bâtiment B")
+
+
+def test_xlsx_round_trip(tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    path = tmp_path / 'planning.xlsx'
+    write_xlsx(str(path), defenses, registry, 3, clock)
+    sheet = openpyxl.load_workbook(path, read_only=True)['Planning']
+    assert [list(row) for row in sheet.iter_rows(values_only=True)] == [columns] + list(
+        records(defenses, registry, 3, clock))
+
+
+def test_escape_and_fold():
+    assert _escape('a\\b;c,d\ne') == 'a\\\\b\\;c\\,d\\ne'
+    line = 'SUMMARY:' + 'é' * 40 + 'x' * 60
+    folded = _fold(line).split('\r\n')
+    assert len(folded) > 1 and all(len(part.encode('utf-8')) <= 75 for part in folded)
+    assert all(part.startswith(' ') for part in folded[1:])
+    assert folded[0] + ''.join(part[1:] for part in folded[1:]) == line  # Aucun caractère coupé
+    assert _fold('x' * 75) == 'x' * 75
+
+
+def test_icalendar_writes_one_agenda_per_jury_member(tmp_path):
+    with pytest.raises(ValueError):
+        write_icalendar(str(tmp_path / 'jury.ics'), defenses, registry, 3)
+    write_icalendar(str(tmp_path / 'agendas' / 'jury.ics'), defenses, registry, 3, clock)
+    assert sorted(path.name for path in (tmp_path / 'agendas').iterdir()) == [
+        f"jury-{prof_id}.ics" for prof_id in (1, 2, 3, 4)]
+
+    raw = (tmp_path / 'agendas' / 'jury-4.ics').read_bytes().decode('utf-8')
+    assert raw.endswith('END:VCALENDAR\r\n') and '\n' not in raw.replace('\r\n', '')
+    lines = raw.replace('\r\n ', '').split('\r\n')  # Lignes dépliées
+    assert all(len(line.encode('utf-8')) <= 75 for line in raw.split('\r\n'))
+    assert 'X-WR-CALNAME:Soutenances - Ndiaye Awa' in lines
+    assert lines.count('BEGIN:VEVENT') == 1
+    assert 'DTSTART:20250609T103000' in lines and 'DTEND:20250609T120000' in lines
+    assert f"SUMMARY:Soutenance de {students[1].name} (encadreur)" in lines
+    assert 'LOCATION:Salle 100' in lines and 'DESCRIPTION:Master Génie\\nlogiciel' in lines
+
+    # Président et examinateur des deux soutenances ; noms échappés
+    president = (tmp_path / 'agendas' / 'jury-2.ics').read_text(encoding='utf-8').replace('\n ', '')
+    assert president.count('BEGIN:VEVENT') == 2 and 'Benali\\; Amine' in president
+    assert 'LOCATION:Amphi\\, bâtiment B' in president
+
+
+def test_write_all_runs_every_job(tmp_path):
+    jobs = [(str(tmp_path / name), lambda name=name: (tmp_path / name).write_text(name))
+            for name in ('a.csv', 'b.jsonl', 'c.xlsx')]
+    assert sorted(write_all(jobs)) == sorted(path for path, _ in jobs)
+    assert all((tmp_path / name).read_text() == name for name in ('a.csv', 'b.jsonl', 'c.xlsx'))
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from optiplan import loading  # noqa: E402
+from optiplan.loading import load_professors, load_students, professors_from_frame  # noqa: E402
+from optiplan.parsing import AvailabilityFormatError  # noqa: E402
+from optiplan.specialties import SpecialtyIndex  # noqa: E402
+
+week = str([[True] * 2] * 2)
+
+
+def frame(specialities) -> 'pd.DataFrame':
+    return pd.DataFrame({
+        'Numéro': list(range(1, len(specialities) + 1)),
+        'Nom': ['Nom'] * len(specialities),
+        'Prénoms': ['Prénom'] * len(specialities),
+        'Grade': ['MC'] * len(specialities),
+        'Disponibilité': [week] * len(specialities),
+        'Speciality': specialities,
+    })
+
+
+def test_missing_speciality_is_empty():
+    professors = professors_from_frame(frame([float('nan'), None, 'Informatique', '']), 2, 2)
+    assert [prof.specialties for prof in professors] == [[], [], ['Informatique'], []]
+    index = SpecialtyIndex(professors)
+    assert index.specialists('nan') == []
+    assert [prof.id for prof in index.specialists('informatique')] == [3]
+
+
+def test_specialities_are_split_and_stripped():
+    professors = professors_from_frame(frame(['Informatique, Génie logiciel,', 'Mathématiques']), 2, 2)
+    assert professors[0].specialties == ['Informatique', 'Génie logiciel']
+    assert professors[1].specialties == ['Mathématiques']
+
+
+@pytest.fixture
+def workbooks(tmp_path):
+    professors = tmp_path / 'enseignants.xlsx'
+    frame(['Informatique', 'Mathématiques, Physique']).to_excel(professors, index=False)
+    students = tmp_path / 'students_data.xlsx'
+    pd.DataFrame({'Numéro': [1, 2], 'Nom': ['Étudiant 1', 'Étudiant 2'], 'Cycle': ['Licence', 'Master'],
+                  'Filière': ['Informatique', 'Physique'], 'MM': [1, 2], 'Campus': ['FSA', 'EPAC']}
+                 ).to_excel(students, index=False)
+    return str(professors), str(students)
+
+
+def test_snapshots_are_json_in_the_user_cache(tmp_path, monkeypatch, workbooks):
+    professors_path, students_path = workbooks
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    professors = load_professors(professors_path, 2, 2)
+    students = load_students(students_path)
+    cache_dir = tmp_path / 'cache' / 'optiplan'
+    assert sorted(os.listdir(tmp_path)) == ['cache', 'enseignants.xlsx', 'students_data.xlsx']
+    assert all(name.endswith('.json') for name in os.listdir(cache_dir)) and len(os.listdir(cache_dir)) == 2
+
+    def unread(*args, **kwargs):
+        raise AssertionError("fichier relu malgré l'instantané")
+    monkeypatch.setattr(loading, 'read_excel', unread)
+    assert load_professors(professors_path, 2, 2) == professors
+    assert load_students(students_path) == students
+
+
+def test_snapshot_depends_on_the_session_and_survives_a_touch(tmp_path, workbooks):
+    professors_path, _ = workbooks
+    cache_dir = str(tmp_path / 'cache')
+    professors = load_professors(professors_path, 2, 2, cache_dir=cache_dir)
+    with pytest.raises(AvailabilityFormatError):  # Autre grille : le fichier est relu, pas l'instantané
+        load_professors(professors_path, 1, 4, cache_dir=cache_dir)
+    os.utime(professors_path, ns=(0, 0))
+    assert load_professors(professors_path, 2, 2, cache_dir=cache_dir) == professors
+
+
+def test_corrupt_snapshot_is_rebuilt(tmp_path, workbooks):
+    _, students_path = workbooks
+    cache_dir = tmp_path / 'cache'
+    students = load_students(students_path, cache_dir=str(cache_dir))
+    for name in os.listdir(cache_dir):
+        (cache_dir / name).write_bytes(b'\x80\x04\x95 pickle')
+    assert load_students(students_path, cache_dir=str(cache_dir)) == students
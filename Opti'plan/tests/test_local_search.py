@@ -0,0 +1,117 @@
+import pytest
+
+from optiplan import Professor, Room, Scheduler, Student
+
+
+@pytest.fixture
+def scarce_scheduler() -> Scheduler:
+    # Une salle et 12 créneaux pour 40 étudiants : des étudiants restent en attente quoi que fasse la recherche
+    professors = [Professor(i, f"Enseignant {i}", 'MC', ['Informatique'], list(range(12))) for i in range(1, 5)]
+    students = [Student(i, f"Étudiant {i}", 'Licence', 'Informatique', i % 4 + 1) for i in range(1, 41)]
+    scheduler = Scheduler(professors, students, [Room(1, "Salle 100")], num_days=3, slots_per_day=4)
+    scheduler.schedule(local_search=False)
+    assert scheduler.search.pending
+    return scheduler
+
+
+def test_run_budget_counts_iterations_of_the_call(scarce_scheduler):
+    scarce_scheduler.search.run(30, time_limit=10, patience=10 ** 6)
+    assert scarce_scheduler.search.iteration == 30
+    scarce_scheduler.search.run(20, time_limit=10, patience=10 ** 6)
+    assert scarce_scheduler.search.iteration == 50
+
+
+def test_forked_search_iterates(scarce_scheduler):
+    base = scarce_scheduler
+    base.search.run(200, time_limit=10, patience=10 ** 6)
+    fork = base.fork()
+    start = fork.search.iteration
+    assert start == base.search.iteration
+    fork.search.run(50, time_limit=10, patience=10 ** 6)
+    assert fork.search.iteration - start == 50
+    assert base.search.iteration == start
+
+
+def empty_search(professors, students, rooms, num_days=2, slots_per_day=4):
+    # État vide : tous les étudiants en attente
+    return Scheduler(professors, students, rooms, num_days, slots_per_day).search
+
+
+def faculty(slots=range(8)):
+    # Encadreurs 'MC' 1 et 2, président possible 3, examinateurs spécialistes 4 ('Professeur') et 5 et 6
+    return [Professor(1, "Encadreur 1", 'MC', ['Informatique'], list(slots)),
+            Professor(2, "Encadreur 2", 'MC', ['Mathématiques'], list(slots)),
+            Professor(3, "Président", 'MC', ['Mathématiques'], list(slots)),
+            Professor(4, "Professeur", 'Professeur', ['Informatique'], list(slots)),
+            Professor(5, "Docteur 5", 'Docteur', ['Informatique'], list(slots)),
+            Professor(6, "Docteur 6", 'Docteur', ['Mathématiques'], list(slots))]
+
+
+def test_place_respects_the_jury_rules_and_tracks_the_defense():
+    students = [Student(1, "Étudiant 1", 'Master', 'Informatique', 1),
+                Student(2, "Étudiant 2", 'Licence', 'Informatique', 1)]
+    search = empty_search(faculty(), students, [Room(1, "Salle 100")])
+    defense = search.place(1, 3)
+    assert (defense.time_slot, defense.supervisor_id) == (3, 1)
+    assert search.professors[defense.president_id].rank == 'MC'
+    assert 'Informatique' in search.professors[defense.examiner_id].specialties
+    assert len({defense.supervisor_id, defense.president_id, defense.examiner_id}) == 3
+    assert search.placed[1] == defense
+    assert search.professor_slots[defense.president_id, 3] == defense
+    assert not search.index.is_free(defense.examiner_id, 3)
+    # Encadreur et salle déjà pris au créneau
+    assert search.place(2, 3) is None
+
+
+def test_insert_skips_the_excluded_slot():
+    search = empty_search(faculty(), [Student(1, "Étudiant 1", 'Licence', 'Informatique', 1)], [Room(1, "Salle 100")])
+    assert search.insert(1, exclude_slot=0).time_slot == 1
+
+
+def test_remove_and_repair():
+    search = empty_search(faculty(), [Student(1, "Étudiant 1", 'Licence', 'Informatique', 1)], [Room(1, "Salle 100")])
+    search.pending.remove(1)
+    defense = search.place(1, 0)
+    assert search.remove(1) == defense
+    assert 1 in search.pending and 1 not in search.placed
+    assert search.index.is_free(defense.president_id, 0) and search.index.is_room_free(defense.room_id, 0)
+    assert search.repair(1)
+    assert 1 in search.placed and 1 not in search.pending
+
+
+def test_ejection_chain_moves_the_blocking_defense():
+    # Une salle ; l'encadreur 2 n'est disponible qu'au créneau 0, déjà occupé par l'étudiant 1
+    professors = faculty()
+    professors[1].availability = [0]
+    students = [Student(1, "Étudiant 1", 'Licence', 'Informatique', 1),
+                Student(2, "Étudiant 2", 'Licence', 'Mathématiques', 2)]
+    search = empty_search(professors, students, [Room(1, "Salle 100")])
+    assert search.place(1, 0) is not None
+    assert search.insert(2) is None
+    assert search.eject(2)
+    assert search.placed[2].time_slot == 0
+    assert search.placed[1].time_slot != 0
+    assert search.tabu[1] > search.iteration
+
+
+def test_kick_moves_one_defense():
+    students = [Student(i, f"Étudiant {i}", 'Licence', 'Informatique', 1) for i in (1, 2, 3)]
+    search = empty_search(faculty(), students, [Room(1, "Salle 100"), Room(2, "Salle 101")])
+    search.run(time_limit=10)
+    before = dict(search.placed)
+    assert len(before) == 3
+    search.kick()
+    assert search.placed.keys() == before.keys()
+    moved = [student_id for student_id, defense in search.placed.items() if defense != before[student_id]]
+    assert len(moved) == 1
+    assert search.placed[moved[0]].time_slot != before[moved[0]].time_slot
+
+
+def test_run_stops_on_time_limit_and_patience(scarce_scheduler):
+    search = scarce_scheduler.search
+    search.run(10 ** 6, time_limit=0)
+    assert search.iteration == 0
+    search.run(10 ** 6, time_limit=10, patience=0)
+    assert search.iteration == 0
+    search.run(10 ** 6, time_limit=10, patience=2)
+    assert search.pending and search.iteration > 0
@@ -0,0 +1,52 @@
+import random
+
+from optiplan import Professor, Room, Scheduler, Student
+from optiplan.greedy import build_schedule_state, schedule_slot_matching
+from optiplan.matching import SlotMatching
+
+
+def test_failed_student_leaves_the_matching_unchanged():
+    matching = SlotMatching()
+    assert matching.add('B', [([1], None), ([0, 1, 2, 5], 1), ([2], 1)])
+    before = dict(matching.assigned), dict(matching.owner)
+    # L'encadreur de A préside B ; déplacer ce président vers 5 ne laisse aucun président à A
+    assert not matching.add('A', [([0], None), ([0, 1, 2, 5], 0), ([0, 1, 3, 4], 0)])
+    assert (matching.assigned, matching.owner) == before
+    assert matching.jury('B') == [1, 0, 2]
+
+
+def test_matching_schedules_what_student_major_misses():
+    # Un créneau, deux salles. B (seul examinateur possible : 3) passe en premier et prend l'encadreur de A
+    # comme président ; le couplage réaffecte ce président pour former aussi le jury de A
+    professors = [Professor(1, "Encadreur de A", 'MC', ['Informatique'], [0]),
+                  Professor(2, "Encadreur de B", 'MC', ['Informatique'], [0]),
+                  Professor(3, "Mathématicien", 'MC', ['Mathématiques'], [0]),
+                  Professor(4, "Informaticien", 'Docteur', ['Informatique'], [0]),
+                  Professor(5, "Physicien 5", 'MC', ['Physique'], [0]),
+                  Professor(6, "Physicien 6", 'MC', ['Physique'], [0])]
+    students = [Student(1, "A", 'Licence', 'Informatique', 1), Student(2, "B", 'Licence', 'Mathématiques', 2)]
+    rooms = [Room(1, "Salle 100"), Room(2, "Salle 101")]
+    coverage = {}
+    for engine in ('student_major', 'slot_matching'):
+        scheduler = Scheduler(professors, students, rooms, num_days=1, slots_per_day=1)
+        scheduler.schedule(engine, local_search=False)
+        assert scheduler.validate().valid
+        coverage[engine] = len(scheduler.defenses)
+    assert coverage == {'student_major': 1, 'slot_matching': 2}
+
+
+def test_choice_width_varies_the_jury_among_the_first_candidates():
+    professors = [Professor(i, f"Enseignant {i}", 'MC', ['Informatique'], [0]) for i in range(1, 9)]
+    students = [Student(1, "Étudiant 1", 'Licence', 'Informatique', 1)]
+    rooms = [Room(1, "Salle 100")]
+
+    def jury(rng=None, choice_width=1):
+        index, room_schedule = build_schedule_state(professors, rooms, 1, 1)
+        [defense] = schedule_slot_matching(professors, students, rooms, index, room_schedule, rng=rng,
+                                           choice_width=choice_width)
+        return defense.president_id, defense.examiner_id
+
+    assert {jury(random.Random(seed)) for seed in range(10)} == {jury()} == {(2, 3)}
+    presidents = {jury(random.Random(seed), choice_width=3)[0] for seed in range(20)}
+    # Trois premiers candidats : 1 (encadreur, exclu), 2 et 3
+    assert presidents == {2, 3}
@@ -0,0 +1,35 @@
+from optiplan import Professor, Room, Scheduler, Student
+from optiplan.multistart import load_stddev, multistart
+
+# Grades et spécialités mêlés, une salle : les départs perturbés ne donnent pas tous le même planning
+fields = ('Informatique', 'Mathématiques')
+professors = [Professor(i, f"Enseignant {i}", ('MC', 'Docteur', 'Professeur')[i % 3], [fields[i % 2]],
+                        list(range(8)))
+              for i in range(1, 10)]
+students = [Student(i, f"Étudiant {i}", ('Licence', 'Master')[i % 2], fields[i % 2], (3, 6, 9)[i % 3])
+            for i in range(1, 13)]
+session = dict(professors=professors, students=students, rooms=[Room(1, "Salle 100")], num_days=2,
+               slots_per_day=4)
+
+
+def test_same_seed_gives_the_same_schedule_whatever_the_workers():
+    serial = multistart('student_major', **session, starts=4, workers=1, seed=7)
+    parallel = multistart('student_major', **session, starts=4, workers=2, seed=7)
+    assert serial == parallel
+
+
+def test_single_start_is_the_deterministic_heuristic():
+    scheduler = Scheduler(professors, students, session['rooms'], 2, 4)
+    scheduler.schedule(local_search=False)
+    defenses, start = multistart('student_major', **session, starts=1, seed=3)
+    assert start == 0 and defenses == scheduler.defenses
+
+
+def test_best_start_is_kept():
+    deterministic, _ = multistart('student_major', **session, starts=1)
+    defenses, start = multistart('student_major', **session, starts=8, workers=1)
+    assert len(defenses) >= len(deterministic)
+    if start == 0:
+        assert defenses == deterministic
+    elif len(defenses) == len(deterministic):
+        assert load_stddev(defenses, professors) <= load_stddev(deterministic, professors)
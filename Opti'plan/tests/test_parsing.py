@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from optiplan.parsing import AvailabilityFormatError, availability_slots, parse_availability
+
+
+def test_parses_booleans_and_digits_and_ignores_extra_days():
+    column = ["[[True, False], [False, True]]", "[[1,0],[1,1],[0,0]]"]
+    matrix = parse_availability(column, num_days=2, slots_per_day=2)
+    assert matrix.dtype == bool
+    assert matrix.tolist() == [[True, False, False, True], [True, False, True, True]]
+    assert availability_slots(matrix) == [[0, 3], [0, 2, 3]]
+
+
+def test_empty_column():
+    assert parse_availability([], num_days=2, slots_per_day=3).shape == (0, 6)
+
+
+@pytest.mark.parametrize('cell, reason', [
+    (None, "valeur manquante ou non textuelle (None)"),
+    (np.nan, "valeur manquante ou non textuelle (nan)"),
+    ("[[True, False], [True", "syntaxe invalide"),
+    ("True", "une liste de jours est attendue"),
+    ("[[True, False]]", "1 jour(s) au lieu d'au moins 2"),
+    ("[[True, False], [True]]", "jour 2 : 1 créneau(x) au lieu de 2"),
+    ("[[True, False], [2, 0]]", "jour 2 : valeurs booléennes attendues"),
+])
+def test_malformed_cell_is_explained(cell, reason):
+    with pytest.raises(AvailabilityFormatError) as error:
+        parse_availability(["[[True, True], [True, True]]", cell], num_days=2, slots_per_day=2)
+    assert error.value.errors == [(1, reason)]
+
+
+def test_all_malformed_rows_are_reported_together():
+    column = ["[[True]]", "[[True, True], [True, True]]", "", "[[0, 1], [1, 0]]"]
+    with pytest.raises(AvailabilityFormatError) as error:
+        parse_availability(column, num_days=2, slots_per_day=2)
+    assert [row for row, _ in error.value.errors] == [0, 2]
+    assert str(error.value).startswith("2 disponibilité(s) mal formée(s)")
+    assert isinstance(error.value, ValueError)
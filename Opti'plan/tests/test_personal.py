@@ -0,0 +1,57 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from optiplan import Professor, Registry, Room, Scheduler, Student
+from optiplan.personal import group_defenses, render_personal_pdfs
+
+
+@pytest.fixture(scope='module')
+def scheduler():
+    professors = [Professor(i, f"Enseignant {i}", 'MC', ['Informatique'], list(range(8))) for i in range(1, 6)]
+    students = [Student(i, f"Étudiant {i}", 'Licence', 'Informatique', i % 5 + 1) for i in range(1, 9)]
+    rooms = [Room(1, "Salle 100"), Room(2, "Salle 200"), Room(3, "Salle 300")]
+    scheduler = Scheduler(professors, students, rooms, num_days=2, slots_per_day=4)
+    scheduler.schedule(local_search=False)
+    assert scheduler.defenses
+    return scheduler
+
+
+def expected_files(defenses):
+    jury = {prof_id for defense in defenses
+            for prof_id in (defense.president_id, defense.examiner_id, defense.supervisor_id)}
+    return ({f"enseignant-{prof_id}.pdf" for prof_id in jury}
+            | {f"salle-{defense.room_id}.pdf" for defense in defenses})
+
+
+def render(directory, scheduler, workers):
+    registry = Registry(scheduler.professors, scheduler.students, scheduler.rooms)
+    return render_personal_pdfs(str(directory), scheduler.defenses, registry, scheduler.slots_per_day, workers)
+
+
+def test_group_defenses_lists_every_role_in_slot_order(scheduler):
+    by_professor, by_room = group_defenses(scheduler.defenses)
+    assert sum(map(len, by_professor.values())) == 3 * len(scheduler.defenses)
+    assert sum(map(len, by_room.values())) == len(scheduler.defenses)
+    for entries in by_professor.values():
+        slots = [defense.time_slot for _, defense in entries]
+        assert slots == sorted(slots)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_one_pdf_per_jury_member_and_used_room(tmp_path, scheduler, workers):
+    paths = render(tmp_path, scheduler, workers)
+    expected = expected_files(scheduler.defenses)
+    assert sorted(map(os.path.basename, paths)) == sorted(expected)
+    assert set(os.listdir(tmp_path)) == expected  # Aucun fichier partiel laissé
+    for path in paths:
+        with open(path, 'rb') as document:
+            assert document.read(4) == b'%PDF'
+
+
+def test_process_pool_started_from_a_thread(tmp_path, scheduler):
+    # Cas de l'écriture en parallèle : le pool de processus part d'un thread
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        paths = executor.submit(render, tmp_path, scheduler, 2).result(timeout=120)
+    assert set(map(os.path.basename, paths)) == expected_files(scheduler.defenses)
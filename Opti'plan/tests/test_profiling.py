@@ -0,0 +1,40 @@
+import json
+
+from optiplan import Professor, Room, Scheduler, Student, profiling
+
+
+def scarce_scheduler() -> Scheduler:
+    # Une salle et 4 créneaux pour 6 étudiants : deux étudiants en attente, des créneaux rejetés
+    professors = [Professor(i, f"Enseignant {i}", 'MC', ['Informatique'], list(range(4))) for i in range(1, 5)]
+    students = [Student(i, f"Étudiant {i}", 'Licence', 'Informatique', i % 4 + 1) for i in range(1, 7)]
+    return Scheduler(professors, students, [Room(1, "Salle 100")], num_days=1, slots_per_day=4)
+
+
+def test_profile_records_phases_counters_and_trace(tmp_path):
+    with profiling.profile() as profiler:
+        scarce_scheduler().schedule(local_search=False)
+    assert profiling.active is profiling.null_profiler
+
+    report = profiler.report()
+    assert report['phases']['schedule.greedy']['calls'] == 1
+    assert {'student_major.slot_loop', 'schedule.load_state'} <= set(report['phases'])
+    assert report['counters']['schedule.scheduled'] == 4
+    assert sum(n for name, n in report['counters'].items() if name.startswith('student_major.rejected.')) > 0
+    stat = report['stats']['student_major.candidates_per_student']
+    assert stat['count'] == 6 and stat['min'] == 1 and stat['max'] == 4
+
+    path = tmp_path / 'profil.json'
+    profiler.write(str(path))
+    events = json.loads(path.read_text(encoding='utf-8'))['traceEvents']
+    assert [event['ts'] for event in events] == sorted(event['ts'] for event in events)
+    # La phase englobante est plus longue que les phases qu'elle contient
+    greedy = next(event for event in events if event['name'] == 'schedule.greedy')
+    loop = next(event for event in events if event['name'] == 'student_major.slot_loop')
+    assert greedy['ts'] <= loop['ts'] and loop['dur'] <= greedy['dur'] and loop['tid'] > greedy['tid']
+
+
+def test_disabled_profiler_records_nothing():
+    profiling.disable()
+    scarce_scheduler().schedule(local_search=False)
+    assert not profiling.active.enabled
+    assert profiling.active.report() == {'phases': {}, 'counters': {}, 'stats': {}, 'traceEvents': []}
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Flowable, Paragraph, Spacer
+
+from optiplan import Professor, Registry, Room, Scheduler, Student
+from optiplan.report import StreamingPDF, pdf_layouts
+
+
+class Logged(Flowable):
+    # Élément vide qui note son dessin dans le journal partagé avec le générateur
+    def __init__(self, log, number):
+        super().__init__()
+        self.log, self.number = log, number
+
+    def wrap(self, available_width, available_height):
+        return available_width, 400
+
+    def draw(self):
+        self.log.append(('drawn', self.number))
+
+
+def test_flowables_are_laid_out_as_they_are_produced(tmp_path):
+    log = []
+
+    def flowables():
+        for number in range(3):
+            log.append(('produced', number))
+            yield Logged(log, number)
+
+    path = tmp_path / 'planning.pdf'
+    StreamingPDF(str(path)).build(flowables())
+    # Un élément n'est produit qu'une fois le précédent dessiné, y compris après un saut de page
+    assert log == [(event, number) for number in range(3) for event in ('produced', 'drawn')]
+    assert path.read_bytes().startswith(b'%PDF')
+    assert os.listdir(tmp_path) == ['planning.pdf']
+
+
+def test_failed_build_leaves_no_file_and_keeps_the_previous_one(tmp_path):
+    styles = getSampleStyleSheet()
+
+    def failing():
+        yield Paragraph("Planning des soutenances", styles['Heading1'])
+        yield Spacer(1, 12)
+        raise RuntimeError("données invalides")
+
+    path = tmp_path / 'planning.pdf'
+    with pytest.raises(RuntimeError):
+        StreamingPDF(str(path)).build(failing())
+    assert not os.listdir(tmp_path)
+
+    path.write_bytes(b'ancien planning')
+    with pytest.raises(RuntimeError):
+        StreamingPDF(str(path)).build(failing())
+    assert os.listdir(tmp_path) == ['planning.pdf'] and path.read_bytes() == b'ancien planning'
+
+
+@pytest.mark.parametrize('layout', list(pdf_layouts))
+def test_layouts_write_a_pdf(tmp_path, layout):
+    professors = [Professor(i, f"Enseignant {i}", 'MC', ['Informatique'], list(range(4))) for i in range(1, 5)]
+    students = [Student(i, f"Étudiant {i}", 'Licence', 'Informatique', i % 4 + 1) for i in range(1, 7)]
+    rooms = [Room(1, "Salle 100")]
+    scheduler = Scheduler(professors, students, rooms, num_days=1, slots_per_day=4)
+    scheduler.schedule(local_search=False)
+    assert scheduler.unscheduled_students  # Diagnostic compris dans la mise en page détaillée
+    path = tmp_path / f"{layout}.pdf"
+    pdf_layouts[layout](str(path), scheduler, Registry(professors, students, rooms))
+    assert path.read_bytes().startswith(b'%PDF')
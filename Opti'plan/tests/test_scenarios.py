@@ -0,0 +1,68 @@
+import pytest
+
+from optiplan import Professor, Room, Scheduler, Student
+from optiplan.scenarios import Scenario, evaluate
+
+
+@pytest.fixture
+def scheduler():
+    # Deux jours de 4 créneaux, deux salles : 12 étudiants pour 16 places, tous programmés
+    professors = [Professor(i, f"Enseignant {i}", 'MC', ['Informatique'], list(range(8))) for i in range(1, 7)]
+    students = [Student(i, f"Étudiant {i}", 'Licence', 'Informatique', i % 6 + 1) for i in range(1, 13)]
+    rooms = [Room(1, "Salle 100"), Room(2, "Salle 200")]
+    scheduler = Scheduler(professors, students, rooms, num_days=2, slots_per_day=4)
+    scheduler.schedule(local_search=False)
+    return scheduler
+
+
+def scenarios():
+    return [
+        Scenario("Salle 200 fermée le jour 1", closed_rooms={"Salle 200": [1]}),
+        Scenario("Enseignant 1 absent", absences={1: None}),
+        Scenario("Troisième jour et nouveaux étudiants", extra_days=1,
+                 new_students=[Student(i, f"Étudiant {i}", 'Licence', 'Informatique', 2) for i in range(13, 17)]),
+    ]
+
+
+def test_scenarios_leave_the_reference_schedule_untouched(scheduler):
+    before = list(scheduler.defenses)
+    statistics = scheduler.statistics()
+    results = evaluate(scheduler, scenarios(), workers=1, local_search_time_limit=0)
+    assert [result.name for result in results] == [scenario.name for scenario in scenarios()]
+    assert scheduler.defenses == before and scheduler.statistics() == statistics
+    assert all(result.baseline == statistics for result in results)
+
+
+def test_each_scenario_is_applied_and_repaired(scheduler):
+    closed, absent, extended = evaluate(scheduler, scenarios(), workers=1, local_search_time_limit=0)
+    # Salle fermée : plus aucune soutenance en salle 200 le jour 1, les soutenances déplacées y étaient
+    day_one = set(scheduler.day_slots(1))
+    assert closed.diff.moved or closed.diff.removed
+    for before, after in closed.diff.moved:
+        assert before.room_id == 2 and before.time_slot in day_one
+        assert not (after.room_id == 2 and after.time_slot in day_one)
+    # Enseignant absent : ses étudiants encadrés perdent leur soutenance, les autres ne le mobilisent plus
+    assert {6, 12} <= {defense.student_id for defense in absent.diff.removed}
+    assert absent.coverage_change < 0
+    for _, after in absent.diff.moved:
+        assert 1 not in (after.president_id, after.examiner_id, after.supervisor_id)
+    assert all(1 not in (defense.president_id, defense.examiner_id, defense.supervisor_id)
+               for defense in absent.diff.added)
+    # Jour ajouté : les nouveaux étudiants sont programmés, la couverture reste complète
+    assert {defense.student_id for defense in extended.diff.added} == set(range(13, 17))
+    assert extended.statistics['total_students'] == 16
+    assert extended.coverage == 100.0 and extended.coverage_change == 0.0
+
+
+def test_process_pool_gives_the_sequential_results(scheduler):
+    sequential = evaluate(scheduler, scenarios(), workers=1, local_search_time_limit=0)
+    parallel = evaluate(scheduler, scenarios(), workers=2, local_search_time_limit=0)
+    assert [(result.name, result.statistics, result.diff) for result in parallel] == \
+        [(result.name, result.statistics, result.diff) for result in sequential]
+
+
+@pytest.mark.parametrize('scenario', [Scenario("Salle inconnue", closed_rooms={"Salle 900": None}),
+                                      Scenario("Enseignant inconnu", absences={99: None})])
+def test_unknown_room_or_professor(scheduler, scenario):
+    with pytest.raises(ValueError):
+        evaluate(scheduler, [scenario], workers=1)
@@ -0,0 +1,109 @@
+import pytest
+
+from optiplan import Defense, Professor, Room, ScheduleDiff, Scheduler, Student
+
+
+@pytest.fixture
+def scheduler() -> Scheduler:
+    # Deux salles sur 3 jours de 4 créneaux pour 8 étudiants : une salle fermée laisse de quoi replacer
+    professors = [Professor(i, f"Enseignant {i}", 'MC', ['Informatique'], list(range(12))) for i in range(1, 7)]
+    students = [Student(i, f"Étudiant {i}", 'Licence', 'Informatique', i % 6 + 1) for i in range(1, 9)]
+    scheduler = Scheduler(professors, students, [Room(1, "Salle 100"), Room(2, "Salle 101")], num_days=3,
+                          slots_per_day=4)
+    scheduler.schedule(local_search_time_limit=1)
+    assert len(scheduler.defenses) == len(students)
+    return scheduler
+
+
+def test_closed_room_stays_closed_after_reschedule(scheduler):
+    scheduler.close_room(1, scheduler.day_slots(0))
+    scheduler.schedule(local_search_time_limit=1)
+    assert not [defense for defense in scheduler.defenses
+                if defense.room_id == 1 and defense.time_slot in scheduler.day_slots(0)]
+    assert not scheduler.index.room_open[scheduler.index.room_row[1], scheduler.day_slots(0)].any()
+    assert scheduler.validate().valid
+
+
+def test_closed_room_survives_add_days_and_fork(scheduler):
+    scheduler.close_room(2)
+    closed = scheduler.index.total_slots
+    scheduler.add_days(1)
+    row = scheduler.index.room_row[2]
+    assert not scheduler.index.room_open[row, :closed].any()
+    assert scheduler.index.room_open[row, closed:].all()
+    fork = scheduler.fork()
+    fork.schedule(local_search_time_limit=1)
+    assert all(defense.room_id != 2 or defense.time_slot >= closed for defense in fork.defenses)
+    assert fork.validate().valid
+
+
+def test_schedule_diff_between():
+    kept, old, new = Defense(1, 0, 1, 2, 3, 1), Defense(2, 1, 1, 5, 6, 4), Defense(2, 2, 1, 5, 6, 4)
+    gone, added = Defense(3, 3, 1, 2, 3, 1), Defense(4, 4, 1, 2, 3, 1)
+    diff = ScheduleDiff.between([kept, old, gone], [kept, new, added])
+    assert diff.added == [added] and diff.removed == [gone] and diff.moved == [(old, new)]
+    assert not ScheduleDiff.between([kept], [kept])
+
+
+def test_add_student_is_placed(scheduler):
+    diff = scheduler.add_student(Student(100, "Nouvel étudiant", 'Licence', 'Informatique', 1))
+    assert [defense.student_id for defense in diff.added] == [100]
+    assert not diff.moved and not diff.removed
+    assert 100 in scheduler.scheduled_students
+    assert scheduler.validate().valid
+
+
+def test_remove_professor_slot_moves_the_defense(scheduler):
+    defense = scheduler.defenses[0]
+    diff = scheduler.remove_professor_slot(defense.president_id, defense.time_slot)
+    assert [before for before, _ in diff.moved] == [defense] and not diff.removed
+    assert defense.time_slot not in scheduler.professor_schedule[defense.president_id]
+    assert not scheduler.index.is_available(defense.president_id, defense.time_slot)
+    assert len(scheduler.defenses) == 8
+    assert scheduler.validate().valid
+
+
+def test_remove_professor_slots_unschedules_the_supervised_students(scheduler):
+    supervised = {student.id for student in scheduler.students if student.supervisor_id == 2}
+    diff = scheduler.remove_professor_slots(2)
+    assert {defense.student_id for defense in diff.removed} == supervised
+    assert all(2 not in (d.supervisor_id, d.president_id, d.examiner_id) for d in scheduler.defenses)
+    assert {student.id for student in scheduler.unscheduled_students} == supervised
+    assert scheduler.validate().valid
+
+
+@pytest.mark.parametrize('slot', [-1, 12])
+def test_slots_out_of_the_session_are_rejected(scheduler, slot):
+    before = scheduler.defenses
+    with pytest.raises(ValueError):
+        scheduler.remove_professor_slots(1, [0, slot])
+    with pytest.raises(ValueError):
+        scheduler.close_room(1, [slot])
+    assert scheduler.index.available.all() and scheduler.index.room_open.all()
+    assert scheduler.defenses == before
+
+
+def test_add_days_places_pending_students_on_the_new_days():
+    # Une salle, 12 créneaux pour 20 étudiants
+    professors = [Professor(i, f"Enseignant {i}", 'MC', ['Informatique'], list(range(12))) for i in range(1, 7)]
+    students = [Student(i, f"Étudiant {i}", 'Licence', 'Informatique', i % 6 + 1) for i in range(1, 21)]
+    scheduler = Scheduler(professors, students, [Room(1, "Salle 100")], num_days=3, slots_per_day=4)
+    scheduler.schedule(local_search_time_limit=1)
+    pending = len(scheduler.unscheduled_students)
+    first = scheduler.index.total_slots
+    diff = scheduler.add_days(1)
+    assert scheduler.num_days == 4
+    assert diff.added and all(defense.time_slot >= first for defense in diff.added)
+    assert len(scheduler.unscheduled_students) == pending - len(diff.added)
+    assert scheduler.validate().valid
+
+
+def test_close_room_reports_every_affected_defense(scheduler):
+    affected = [defense for defense in scheduler.defenses if defense.room_id == 1]
+    diff = scheduler.close_room(1)
+    previous = {before.student_id: before for before, _ in diff.moved}
+    previous.update((defense.student_id, defense) for defense in diff.removed)
+    assert previous == {defense.student_id: defense for defense in affected}
+    assert all(defense.room_id != 1 for defense in scheduler.defenses)
+    assert scheduler.index.first_free_room(0, scheduler.index.room_rows([1])) is None
+    assert scheduler.validate().valid
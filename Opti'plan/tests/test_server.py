@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+
+import pytest
+
+from optiplan import Session
+from optiplan.cli import options
+from optiplan.server import HTTPError, Service, _read_request, max_body_size
+
+
+def read(data: bytes):
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await _read_request(reader)
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize('name', ['multistart_runs', 'local_search_iterations', 'seed'])
+@pytest.mark.parametrize('value', [2.5, True, '3'])
+def test_integer_options_are_validated(name, value):
+    with pytest.raises(HTTPError) as error:
+        Service(options())._settings({name: value})
+    assert error.value.status == 400
+
+
+def test_valid_settings():
+    settings = Service(options())._settings({'multistart_runs': 2, 'local_search_time_limit': 0.5, 'seed': 7})
+    assert (settings['multistart_runs'], settings['local_search_time_limit'], settings['seed']) == (2, 0.5, 7)
+
+
+def test_request_body_is_read():
+    body = b'{"seed": 1}'
+    request = b'POST /schedule HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % len(body) + body
+    assert read(request) == ('POST', '/schedule', body)
+
+
+def test_oversized_body_is_rejected():
+    request = b'POST /schedule HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % (max_body_size + 1)
+    with pytest.raises(HTTPError) as error:
+        read(request)
+    assert error.value.status == 413
+
+
+def repairable_service(relaxed_rules):
+    service = Service(options())
+    service.instance = (Session(campuses={'': ['Salle 100']}), [], [])
+    service.current = []
+    service.current_summary = {'settings': {'relaxed_rules': relaxed_rules}, 'statistics': {}}
+    calls = []
+
+    async def run(function, *args):
+        calls.append(args)
+        return {}, []
+    service._run = run
+    return service, calls
+
+
+def test_repair_keeps_the_current_rules():
+    service, calls = repairable_service(['president_supervisor_rank'])
+    asyncio.run(service.what_if({}, {}))
+    settings = calls[0][0]
+    assert settings['relaxed_rules'] == ['president_supervisor_rank']
+
+
+def test_repair_under_other_rules_is_rejected():
+    service, calls = repairable_service(['president_supervisor_rank'])
+    with pytest.raises(HTTPError) as error:
+        asyncio.run(service.what_if({}, {'relaxed_rules': []}))
+    assert error.value.status == 409
+    assert not calls
+    asyncio.run(service.what_if({}, {'relaxed_rules': [], 'strategy': 'resolve'}))
+    assert calls[0][0]['relaxed_rules'] == []
+
+
+class Writer:
+    # Écrivain de flux minimal : garde la réponse en mémoire
+    def __init__(self):
+        self.data = b''
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def respond(service, request: bytes):
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_data(request)
+        reader.feed_eof()
+        writer = Writer()
+        await service.handle(reader, writer)
+        return writer.data
+    status_line, _, body = asyncio.run(main()).partition(b'\r\n\r\n')
+    return int(status_line.split()[1]), json.loads(body)
+
+
+def test_computation_errors_are_logged_as_server_errors(caplog):
+    service, _ = repairable_service([])
+
+    async def run(function, *args):
+        raise ValueError("index hors limites")
+    service._run = run
+    body = b'{"seed": 1}'
+    with caplog.at_level(logging.ERROR, logger='optiplan.server'):
+        status, content = respond(service, b'POST /schedule HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % len(body)
+                                  + body)
+    assert status == 500 and 'ValueError' in content['error']
+    assert caplog.records[-1].exc_info[0] is ValueError
+
+
+def test_invalid_parameters_are_rejected_before_dispatch():
+    service, calls = repairable_service([])
+    body = b'{"seed": "1"}'
+    status, content = respond(service, b'POST /schedule HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % len(body) + body)
+    assert status == 400 and 'seed' in content['error']
+    status, content = respond(service, b'GET /report.pdf?layout=poster HTTP/1.1\r\n\r\n')
+    assert status == 400 and 'poster' in content['error']
+    assert not calls
@@ -0,0 +1,53 @@
+import pytest
+
+from optiplan import Professor, Room, Scheduler, Student
+from optiplan.greedy import build_schedule_state, engines
+from optiplan.sharding import plan_shards, schedule_sharded
+
+# Un jour de 4 créneaux, une salle par campus. Seul X examine en mathématiques ; P et P2 n'encadrent personne
+# et leur spécialité n'est demandée nulle part. L'encadreur de a3 n'est disponible qu'au créneau 2, que le
+# partage des créneaux de X attribue au campus B
+full = [0, 1, 2, 3]
+professors = [Professor(1, "S1", 'MC', ['Informatique'], full), Professor(2, "S2", 'MC', ['Informatique'], full),
+              Professor(3, "S3", 'MC', ['Informatique'], [2]), Professor(4, "T", 'MC', ['Informatique'], full),
+              Professor(5, "P", 'MC', ['Physique'], full), Professor(6, "P2", 'MC', ['Physique'], full),
+              Professor(9, "X", 'Docteur', ['Mathématiques'], full)]
+students = [Student(i, name, 'Licence', 'Mathématiques', i, campus)
+            for i, name, campus in ((1, "a1", 'A'), (2, "a2", 'A'), (3, "a3", 'A'), (4, "b1", 'B'))]
+rooms = [Room(1, "A1", 'A'), Room(2, "B1", 'B')]
+
+
+def test_non_supervising_professors_are_split_across_campuses():
+    plan = plan_shards(professors, students, rooms, 1, 4)
+    # Spécialité demandée sur les deux campus : poids des étudiants concernés ; demandée nulle part : poids de
+    # tous les étudiants du campus
+    assert plan.homes[9] == plan.homes[5] == {'A': 3, 'B': 1}
+    assert plan.homes[3] == {'A': 1} and plan.homes[4] == {'B': 1}
+    assert plan.components == [['A', 'B']]
+    parts = {shard.campus: {prof.id: prof.availability for prof in shard.professors} for shard in plan.shards}
+    for prof_id in (5, 6, 9):
+        assert sorted(parts['A'][prof_id] + parts['B'][prof_id]) == full
+        caps = [shard.daily_caps[prof_id] for shard in plan.shards]
+        assert sum(cap[0] for cap in caps) == 4
+    assert 3 not in parts['B'] and 4 not in parts['A']
+
+
+def test_reconciliation_places_students_blocked_by_the_split():
+    shards_only, _ = schedule_sharded('student_major', professors, students, rooms, 1, 4, workers=1,
+                                      local_search_time_limit=0)
+    assert {defense.student_id for defense in shards_only} == {1, 2, 4}
+
+    scheduler = Scheduler(professors, students, rooms, num_days=1, slots_per_day=4)
+    scheduler.schedule(local_search_time_limit=2, shard_workers=1)
+    assert scheduler.scheduled_students == {1, 2, 3, 4}
+    assert scheduler.validate().valid  # Salles du campus de chaque étudiant comprises
+
+
+@pytest.mark.parametrize('engine', list(engines))
+def test_greedy_places_students_in_their_campus_rooms(engine):
+    # Deux étudiants du campus B, un seul créneau : la salle libre du campus A ne doit pas servir
+    campus_students = [Student(i, f"b{i}", 'Licence', 'Informatique', i, 'B') for i in (1, 2)]
+    campus_professors = [Professor(i, f"Enseignant {i}", 'MC', ['Informatique'], [0]) for i in range(1, 7)]
+    index, room_schedule = build_schedule_state(campus_professors, rooms, 1, 1)
+    defenses = engines[engine](campus_professors, campus_students, rooms, index, room_schedule)
+    assert [defense.room_id for defense in defenses] == [2]
@@ -0,0 +1,58 @@
+import os
+from dataclasses import replace
+
+import pytest
+
+from optiplan import Professor, Room, Scheduler, Student
+from optiplan.validation import validate
+
+pytest.importorskip('ortools')
+
+from optiplan.solver import solve_cpsat  # noqa: E402
+
+# Deux jours de 4 créneaux, deux salles, 6 étudiants : tous programmables
+professors = [Professor(i, f"Enseignant {i}", 'MC', ['Informatique'], list(range(8))) for i in range(1, 5)]
+students = [Student(i, f"Étudiant {i}", 'Licence', 'Informatique', i % 4 + 1) for i in range(1, 7)]
+rooms = [Room(1, "Salle 100"), Room(2, "Salle 101")]
+session = dict(professors=professors, students=students, rooms=rooms, num_days=2, slots_per_day=4)
+
+
+def greedy_defenses():
+    return Scheduler(**session).schedule(local_search=False)
+
+
+def is_valid(defenses) -> bool:
+    return validate(defenses, **session).valid
+
+
+def test_hint_meeting_the_bound_is_optimal_without_solving():
+    hint = greedy_defenses()
+    assert len(hint) == len(students)
+    result = solve_cpsat(**session, hint=hint, time_limit=5)
+    assert result.status == 'OPTIMAL'
+    assert result.hint_used
+    assert result.upper_bound == len(hint)
+    assert result.stats['wall_time'] == 0.0
+
+
+def test_partial_hint_is_improved():
+    hint = greedy_defenses()[2:]
+    result = solve_cpsat(**session, hint=hint, time_limit=20, num_workers=1)
+    assert result.status == 'OPTIMAL'
+    assert len(result.defenses) == len(students)
+    assert is_valid(result.defenses)
+
+
+def test_invalid_hint_is_not_returned():
+    hint = greedy_defenses()
+    # Deux soutenances dans la même salle au même créneau : l'indication est écartée
+    hint[1] = replace(hint[1], time_slot=hint[0].time_slot, room_id=hint[0].room_id)
+    result = solve_cpsat(**session, hint=hint, time_limit=20, num_workers=1)
+    assert not result.hint_used
+    assert is_valid(result.defenses)
+
+
+def test_search_workers_default_to_the_cores():
+    hint = greedy_defenses()[2:]
+    assert solve_cpsat(**session, hint=hint, time_limit=20, num_workers=2).stats['workers'] == 2
+    assert solve_cpsat(**session, hint=hint, time_limit=20).stats['workers'] == (os.cpu_count() or 1)
@@ -0,0 +1,36 @@
+from optiplan import Professor, Room, Scheduler, Student
+from optiplan.specialties import SpecialtyIndex, normalize
+
+professors = [Professor(1, "Enseignant 1", 'MC', ['Génie Logiciel', 'génie  logiciel'], [0]),
+              Professor(2, "Enseignant 2", 'MC', ['Réseaux'], [0]),
+              Professor(3, "Enseignant 3", 'Docteur', [' GENIE LOGICIEL', 'Réseaux'], [0])]
+
+
+def test_normalize_ignores_accents_case_and_spaces():
+    assert normalize('Génie  Logiciel ') == normalize(' GENIE logiciel') == 'genie logiciel'
+    assert normalize('Réseaux') != normalize('Réseau')
+
+
+def test_specialists_are_resolved_once_per_field():
+    specialties = SpecialtyIndex(professors)
+    # Ordre de `professors`, chacun une seule fois malgré les doublons de l'enseignant 1
+    assert [prof.id for prof in specialties.specialists('genie logiciel')] == [1, 3]
+    assert specialties.specialists('Génie Logiciel') is specialties.specialists('Génie Logiciel')
+    assert specialties.ids('RÉSEAUX') == {2, 3}
+    assert specialties.is_specialist(3, 'réseaux') and not specialties.is_specialist(1, 'Réseaux')
+    assert specialties.specialists('Chimie') == []
+
+
+def test_examiner_count_excludes_the_supervisor():
+    specialties = SpecialtyIndex(professors)
+    assert specialties.examiner_count(Student(1, "Étudiant 1", 'Licence', 'Génie logiciel', 1)) == 1
+    assert specialties.examiner_count(Student(2, "Étudiant 2", 'Licence', 'Génie logiciel', 2)) == 2
+
+
+def test_spelling_variants_get_a_specialist_examiner():
+    scheduler = Scheduler(professors, [Student(1, "Étudiant 1", 'Licence', 'genie LOGICIEL', 2)],
+                          [Room(1, "Salle 100")], num_days=1, slots_per_day=1)
+    [defense] = scheduler.schedule(local_search=False)
+    assert defense.examiner_id in (1, 3)
+    validation = scheduler.validate()
+    assert validation.valid and not validation.summary()['tolerated']
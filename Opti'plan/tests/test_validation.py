@@ -0,0 +1,138 @@
+from dataclasses import replace
+
+import pytest
+
+from optiplan import Defense, Professor, Room, Student, constraints
+from optiplan.constraints import MaxConsecutive, register, rules
+from optiplan.validation import checks, label, validate
+
+
+def make_session(slots_per_day=4):
+    """Trois jours, deux salles ; 12 enseignants de grades ('MC', 'Docteur', 'Professeur') et de spécialités
+    en alternance, disponibles à tous les créneaux ; 24 étudiants Licence/Master encadrés par les 'MC'."""
+    fields = ('Informatique', 'Mathématiques')
+    professors = [Professor(i, f"Enseignant {i}", ('MC', 'Docteur', 'Professeur')[(i - 1) % 3], [fields[(i - 1) % 2]],
+                            list(range(3 * slots_per_day)))
+                  for i in range(1, 13)]
+    students = [Student(i, f"Étudiant {i}", ('Licence', 'Master')[(i - 1) % 2], fields[(i - 1) % 2],
+                        (1, 4, 7, 10)[(i - 1) % 4])
+                for i in range(1, 25)]
+    return dict(professors=professors, students=students, rooms=[Room(1, "Salle 100"), Room(2, "Salle 101")],
+                num_days=3, slots_per_day=slots_per_day)
+
+
+session = make_session()
+# Soutenances valides : étudiant 1 (Licence, Informatique, encadreur 1, 'MC') et étudiant 2 (Master,
+# Mathématiques, encadreur 4, 'MC') ; présidents 'MC', examinateurs spécialistes
+base = [Defense(1, 0, 1, 7, 5, 1), Defense(2, 1, 1, 10, 6, 4)]
+
+
+def test_score_does_not_grow_with_the_session():
+    # Enseignants 1 et 3 aux créneaux 0 et 2, dans deux salles : un trou et un changement de salle chacun
+    professors = [Professor(i, f"Enseignant {i}", 'MC', ['Informatique'], list(range(4))) for i in range(1, 5)]
+    students = [Student(i, f"Étudiant {i}", 'Licence', 'Informatique', 1) for i in (1, 2)]
+    rooms = [Room(1, "Salle 100"), Room(2, "Salle 101")]
+    defenses = [Defense(1, 0, 1, 2, 3, 1), Defense(2, 2, 2, 4, 3, 1)]
+    single = validate(defenses, professors, students, rooms, 1, 4)
+    assert single.valid and single.metrics['gaps'] == single.metrics['room_changes'] == 2
+
+    # Deux copies disjointes de la session validées ensemble : indicateurs par enseignant et écart-type des
+    # charges inchangés, seul le nombre de soutenances double
+    offset = 1000
+    professors += [replace(prof, id=prof.id + offset) for prof in professors]
+    students += [replace(student, id=student.id + offset, supervisor_id=student.supervisor_id + offset)
+                 for student in students]
+    rooms += [replace(room, id=room.id + offset) for room in rooms]
+    defenses = defenses + [
+        Defense(d.student_id + offset, d.time_slot, d.room_id + offset, d.president_id + offset,
+                d.examiner_id + offset, d.supervisor_id + offset)
+        for d in defenses]
+    double = validate(defenses, professors, students, rooms, 1, 4)
+
+    assert double.valid and double.metrics['scheduled'] == 2 * single.metrics['scheduled']
+    assert double.metrics['scheduled'] - double.score == pytest.approx(single.metrics['scheduled'] - single.score)
+
+
+def test_base_schedule_is_valid():
+    validation = validate(base, **session)
+    assert validation.valid and not validation.counts and not validation.summary()['tolerated']
+    assert set(checks) <= set(validation.violations)
+    assert validation.metrics['scheduled'] == 2
+
+
+def _violating():
+    # Contrôle -> (planning, arguments de `validate` modifiés, positions fautives attendues)
+    other_campus = [replace(student, campus='B' if student.id == 1 else 'A') for student in session['students']]
+    unavailable = [replace(prof, availability=prof.availability[1:]) if prof.id == 5 else prof
+                   for prof in session['professors']]
+    return {
+        'unknown_reference': (base + [Defense(99, 2, 1, 7, 5, 1)], {}, [2]),
+        'slot_out_of_range': (base + [Defense(3, 12, 1, 4, 5, 7)], {}, [2]),
+        'student_twice': (base + [Defense(1, 5, 1, 7, 5, 1)], {}, [0, 2]),
+        'wrong_supervisor': ([Defense(1, 0, 1, 4, 5, 7), base[1]], {}, [0]),
+        'jury_overlap': ([Defense(1, 0, 1, 7, 1, 1), base[1]], {}, [0]),
+        'room_double_booking': ([base[0], Defense(2, 0, 1, 10, 6, 4)], {}, [0, 1]),
+        'room_closed': (base, {'closed_rooms': {1: [1]}}, [1]),
+        'professor_double_booking': ([base[0], Defense(2, 0, 2, 7, 6, 4)], {}, [0, 1]),
+        'unavailable': (base, {'professors': unavailable}, [0]),
+        'wrong_campus': (base, {'students': other_campus,
+                                'rooms': [Room(1, "Salle 100", 'A'), Room(2, "Salle 101", 'B')]}, [0]),
+    }
+
+
+@pytest.mark.parametrize('name', list(checks))
+def test_each_check_reports_its_violation(name):
+    defenses, overrides, positions = _violating()[name]
+    validation = validate(defenses, **{**session, **overrides})
+    assert not validation.valid
+    assert validation.violations[name].tolist() == positions
+    assert dict(validation.describe())[label(name)] == len(positions)
+
+
+@pytest.mark.parametrize('defense, name', [
+    (Defense(1, 0, 1, 3, 5, 1), 'president_not_professor'),  # Président 'Professeur'
+    (Defense(1, 0, 1, 11, 5, 1), 'president_supervisor_rank'),  # 'Docteur' sous un encadreur 'MC'
+])
+def test_president_rules(defense, name):
+    validation = validate([defense, base[1]], **session)
+    assert validation.violations[name].tolist() == [0]
+
+
+def test_president_level_rank():
+    # Master encadré par un 'Docteur', présidé par un 'Docteur' : seul le grade requis au Master manque
+    students = session['students'] + [Student(50, "Étudiant 50", 'Master', 'Informatique', 5)]
+    validation = validate(base + [Defense(50, 2, 1, 11, 3, 5)], **{**session, 'students': students})
+    assert validation.counts == {'president_level_rank': 1}
+    assert validation.violations['president_level_rank'].tolist() == [2]
+
+
+def test_non_specialist_examiner_is_tolerated_and_penalized():
+    defenses = [Defense(1, 0, 1, 7, 2, 1), base[1]]
+    validation = validate(defenses, **session)
+    assert validation.valid
+    assert validation.tolerated['examiner_specialist'].tolist() == [0]
+    assert validation.penalties['examiner_specialist'] == rules['examiner_specialist'].weight
+    relaxed = validate(defenses, **session, relaxed=['examiner_specialist'])
+    assert 'examiner_specialist' not in relaxed.tolerated and relaxed.score > validation.score
+
+
+def test_daily_cap():
+    # Cinq soutenances de l'encadreur 1 le premier jour, pour un plafond de 4
+    wide = make_session(slots_per_day=6)
+    supervised = [student.id for student in wide['students'] if student.supervisor_id == 1][:5]
+    defenses = [Defense(student_id, slot, 1, 7, (3, 5, 9, 11, 3)[slot], 1)
+                for slot, student_id in enumerate(supervised)]
+    assert validate(defenses, **wide).counts == {'daily_cap': 5}
+    assert validate(defenses[:4], **wide).valid
+
+
+def test_registered_slot_rule_is_checked():
+    consecutive = [base[0], Defense(2, 1, 1, 7, 6, 4)]  # Président 7 aux créneaux 0 et 1
+    assert validate(consecutive, **session).valid
+    registry = dict(rules)
+    register(MaxConsecutive(limit=1))
+    try:
+        validation = validate(consecutive, **session)
+    finally:
+        constraints.install(registry)
+    assert validation.counts == {'max_consecutive': 2}